@@ -13,6 +13,11 @@ def create_app(config_name=None):
     app = Flask(__name__)
     app.config.from_object(config[config_name])
 
+    # 使用orjson作为JSON提供器
+    from app.utils.json_provider import init_json_provider
+
+    init_json_provider(app)
+
     # 初始化扩展
     init_extensions(app)
 
@@ -22,6 +27,24 @@ def create_app(config_name=None):
     # 注册错误处理器
     register_error_handlers(app)
 
+    # 注册请求钩子
+    register_request_hooks(app)
+
+    # 初始化JWT解码缓存
+    from app.utils.jwt_cache import init_jwt_cache
+
+    init_jwt_cache(app)
+
+    # 初始化查询检测
+    from app.utils.query_detector import init_query_detector
+
+    init_query_detector(app)
+
+    # 检查文件哈希所用的SHA-256实现
+    from app.utils.helpers import check_sha256_backend
+
+    check_sha256_backend(app)
+
     # 创建上传目录
     create_upload_directories(app)
 
@@ -45,6 +68,15 @@ def register_blueprints(app):
     app.register_blueprint(user_bp, url_prefix="/api/user")
 
 
+def register_request_hooks(app):
+    """注册请求钩子"""
+    from app.models.audit import AuditLog
+
+    @app.teardown_request
+    def flush_audit_logs(exception=None):
+        AuditLog.flush_buffer()
+
+
 def register_error_handlers(app):
     """注册错误处理器"""
     from app.utils.exceptions import APIException
@@ -1,5 +1,6 @@
 # ./gpt-sovits-backend/app/api/admin.py
 from flask import Blueprint, request, jsonify, current_app
+from sqlalchemy.orm import raiseload
 from app.extensions import db
 from app.models.user import User
 from app.models.model import VoiceModel, Tag
@@ -11,7 +12,10 @@ from app.utils.helpers import (
     save_uploaded_file,
     create_response,
     paginate_query,
+    keyset_paginate,
+    encode_cursor,
     log_user_action,
+    stream_json_rows,
 )
 from app.utils.exceptions import ValidationError, ResourceNotFoundError
 import os
@@ -225,8 +229,8 @@ def get_all_users():
 
         page, per_page = validate_pagination(page, per_page)
 
-        # 构建查询
-        query = User.query
+        # 构建查询；列表只序列化列字段，禁止隐式加载关联
+        query = User.query.options(raiseload("*"))
 
         if role is not None:
             query = query.filter_by(role=role)
@@ -405,12 +409,45 @@ def get_audit_logs():
         if user_id:
             query = query.filter_by(user_id=user_id)
 
-        # 按创建时间倒序排列
-        query = query.order_by(AuditLog.created_at.desc())
+        # 传入after参数时使用游标分页，深翻页不做OFFSET扫描也不执行COUNT
+        after = request.args.get("after")
+        if after is not None:
+            pagination = keyset_paginate(
+                query,
+                AuditLog.created_at,
+                AuditLog.id,
+                per_page,
+                after=after,
+                include_total=request.args.get("include_total") == "true",
+            )
+            return jsonify(
+                create_response(
+                    success=True,
+                    message="Audit logs retrieved successfully",
+                    data={
+                        "logs": [log.to_dict() for log in pagination["items"]],
+                        "pagination": {
+                            "per_page": pagination["per_page"],
+                            "has_next": pagination["has_next"],
+                            "next_cursor": pagination["next_cursor"],
+                            "total": pagination["total"],
+                        },
+                    },
+                )
+            )
+
+        # 按创建时间倒序排列（与游标分页使用相同的排序键）
+        query = query.order_by(AuditLog.created_at.desc(), AuditLog.id.desc())
 
         # 分页
         pagination = paginate_query(query, page, per_page)
 
+        # 返回游标，客户端可从任一页切换到游标分页
+        next_cursor = None
+        if pagination["has_next"] and pagination["items"]:
+            last = pagination["items"][-1]
+            next_cursor = encode_cursor([last.created_at, last.id])
+
         return jsonify(
             create_response(
                 success=True,
@@ -424,6 +461,7 @@ def get_audit_logs():
                         "pages": pagination["pages"],
                         "has_prev": pagination["has_prev"],
                         "has_next": pagination["has_next"],
+                        "next_cursor": next_cursor,
                     },
                 },
             )
@@ -436,6 +474,37 @@ def get_audit_logs():
         return jsonify(create_response(False, "Failed to retrieve audit logs")), 500
 
 
+@admin_bp.route("/audit-logs/export", methods=["GET"])
+@admin_required
+@rate_limit(requests_per_minute=5)
+def export_audit_logs():
+    """流式导出审计日志"""
+    try:
+        action = request.args.get("action")
+        resource_type = request.args.get("resource_type")
+        user_id = request.args.get("user_id")
+
+        # 构建查询
+        query = AuditLog.query
+
+        if action:
+            query = query.filter_by(action=action)
+
+        if resource_type:
+            query = query.filter_by(resource_type=resource_type)
+
+        if user_id:
+            query = query.filter_by(user_id=user_id)
+
+        query = query.order_by(AuditLog.created_at.desc())
+
+        return stream_json_rows(query)
+
+    except Exception as e:
+        current_app.logger.error(f"Export audit logs error: {e}")
+        return jsonify(create_response(False, "Failed to export audit logs")), 500
+
+
 @admin_bp.route("/statistics", methods=["GET"])
 @admin_required
 @rate_limit(requests_per_minute=30)
@@ -529,8 +598,8 @@ def system_cleanup():
         if "temp_files" in cleanup_types:
             from app.utils.helpers import clean_temp_files
 
-            clean_temp_files()
-            results["temp_files"] = "Cleaned"
+            count = clean_temp_files()
+            results["temp_files"] = f"Cleaned {count} files"
 
         if "expired_tokens" in cleanup_types:
             from app.auth.utils import clean_expired_tokens
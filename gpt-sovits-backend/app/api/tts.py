@@ -1,5 +1,6 @@
 # ./gpt-sovits-backend/app/api/tts.py
 from flask import Blueprint, request, jsonify, current_app, send_file
+from sqlalchemy.orm import selectinload, load_only
 from app.extensions import db
 from app.models.task import TTSTask
 from app.models.model import VoiceModel
@@ -15,6 +16,7 @@ from app.utils.helpers import (
     paginate_query,
     calculate_estimated_time,
     log_user_action,
+    stream_json_rows,
 )
 from app.utils.exceptions import (
     ValidationError,
@@ -99,10 +101,10 @@ def generate_speech():
         # 启动异步生成任务
         celery_task = generate_speech_task.delay(task.id)
         task.celery_task_id = celery_task.id
-        db.session.commit()
 
-        # 增加模型使用次数
-        model.increment_usage()
+        # 增加模型使用次数（与任务ID一并提交）
+        model.increment_usage(commit=False)
+        db.session.commit()
 
         return (
             jsonify(
@@ -141,11 +143,21 @@ def get_tts_tasks():
         page = request.args.get("page", 1, type=int)
         per_page = request.args.get("per_page", 20, type=int)
         status = request.args.get("status")
+        summary = request.args.get("summary", "false").lower() == "true"
 
         page, per_page = validate_pagination(page, per_page)
 
         # 构建查询
-        query = TTSTask.query.filter_by(user_id=user.id)
+        if summary:
+            # 摘要模式只加载展示列，全文不经过网络
+            query = TTSTask.query.options(
+                load_only(*[getattr(TTSTask, c) for c in TTSTask.SUMMARY_COLUMNS])
+            ).filter_by(user_id=user.id)
+        else:
+            # 批量预加载关联模型，避免to_dict中逐行查询
+            query = TTSTask.query.options(selectinload(TTSTask.model)).filter_by(
+                user_id=user.id
+            )
 
         if status:
             query = query.filter_by(status=status)
@@ -161,7 +173,10 @@ def get_tts_tasks():
                 success=True,
                 message="TTS tasks retrieved successfully",
                 data={
-                    "tasks": [task.to_dict() for task in pagination["items"]],
+                    "tasks": [
+                        task.to_summary_dict() if summary else task.to_dict()
+                        for task in pagination["items"]
+                    ],
                     "pagination": {
                         "page": pagination["page"],
                         "per_page": pagination["per_page"],
@@ -181,6 +196,31 @@ def get_tts_tasks():
         return jsonify(create_response(False, "Failed to retrieve TTS tasks")), 500
 
 
+@tts_bp.route("/tasks/export", methods=["GET"])
+@auth_required
+@rate_limit(requests_per_minute=5)
+def export_tts_tasks():
+    """流式导出用户的全部TTS任务"""
+    try:
+        user = request.current_user
+        status = request.args.get("status")
+
+        query = TTSTask.query.options(selectinload(TTSTask.model)).filter_by(
+            user_id=user.id
+        )
+
+        if status:
+            query = query.filter_by(status=status)
+
+        query = query.order_by(TTSTask.created_at.desc())
+
+        return stream_json_rows(query)
+
+    except Exception as e:
+        current_app.logger.error(f"Export TTS tasks error: {e}")
+        return jsonify(create_response(False, "Failed to export TTS tasks")), 500
+
+
 @tts_bp.route("/tasks/<task_id>", methods=["GET"])
 @auth_required
 @rate_limit(requests_per_minute=60)
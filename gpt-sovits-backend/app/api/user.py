@@ -1,5 +1,6 @@
 # ./gpt-sovits-backend/app/api/user.py
 from flask import Blueprint, request, jsonify, current_app
+from sqlalchemy.orm import selectinload
 from app.extensions import db
 from app.models.user import User
 from app.models.task import VoiceCloneTask, TTSTask
@@ -8,6 +9,7 @@ from app.models.audit import UserUpload
 from app.auth.decorators import auth_required, rate_limit, log_action
 from app.utils.validators import validate_email, validate_username, validate_pagination
 from app.utils.helpers import create_response, paginate_query, log_user_action
+from app.services.voice_clone_service import get_live_progress
 from app.utils.exceptions import (
     ValidationError,
     ResourceNotFoundError,
@@ -26,18 +28,8 @@ def get_profile():
         user = request.current_user
 
         # 获取用户统计信息
-        voice_clone_tasks = VoiceCloneTask.query.filter_by(user_id=user.id).count()
-        tts_tasks = TTSTask.query.filter_by(user_id=user.id).count()
-        voice_models = VoiceModel.query.filter_by(owner_id=user.id).count()
-        uploads = UserUpload.query.filter_by(user_id=user.id, is_deleted=False).count()
-
         profile_data = user.to_dict(include_sensitive=True)
-        profile_data["statistics"] = {
-            "voice_clone_tasks": voice_clone_tasks,
-            "tts_tasks": tts_tasks,
-            "voice_models": voice_models,
-            "uploads": uploads,
-        }
+        profile_data["statistics"] = user.get_resource_counts()
 
         return jsonify(
             create_response(
@@ -165,14 +157,19 @@ def get_task_history():
                 vc_query = vc_query.filter_by(status=status)
 
             vc_tasks = vc_query.order_by(VoiceCloneTask.created_at.desc()).all()
+            # 处理中任务的进度只写入Redis，批量读取实时值
+            live_progress = get_live_progress(vc_tasks)
             for task in vc_tasks:
                 task_data = task.to_dict()
+                task_data["progress"] = live_progress[task.id]
                 task_data["task_type"] = "voice_clone"
                 tasks.append(task_data)
 
         if not task_type or task_type == "tts":
             # 获取TTS任务
-            tts_query = TTSTask.query.filter_by(user_id=user.id)
+            tts_query = TTSTask.query.options(selectinload(TTSTask.model)).filter_by(
+                user_id=user.id
+            )
             if status:
                 tts_query = tts_query.filter_by(status=status)
 
@@ -473,7 +470,7 @@ def delete_account():
         # 1. 标记上传文件为已删除
         uploads = UserUpload.query.filter_by(user_id=user.id).all()
         for upload in uploads:
-            upload.mark_deleted()
+            upload.mark_deleted(commit=False)
 
         # 2. 将用户模型设为非活跃
         models = VoiceModel.query.filter_by(owner_id=user.id).all()
@@ -23,7 +23,7 @@ from app.utils.exceptions import (
     ResourceNotFoundError,
     ServiceUnavailableError,
 )
-from app.services.voice_clone_service import start_voice_clone_task
+from app.services.voice_clone_service import start_voice_clone_task, get_live_progress
 import os
 
 voice_clone_bp = Blueprint("voice_clone", __name__)
@@ -69,6 +69,7 @@ def upload_audio_sample():
             file_size=file_info["size"],
             file_type="audio",
             mime_type=file.content_type,
+            file_content_id=file_info["content_id"],
         )
         upload_record.set_metadata(audio_info)
 
@@ -239,12 +240,20 @@ def get_user_tasks():
         # 分页
         pagination = paginate_query(query, page, per_page)
 
+        # 处理中任务的进度从Redis读取
+        tasks = []
+        live_progress = get_live_progress(pagination["items"])
+        for task in pagination["items"]:
+            task_data = task.to_dict()
+            task_data["progress"] = live_progress[task.id]
+            tasks.append(task_data)
+
         return jsonify(
             create_response(
                 success=True,
                 message="Tasks retrieved successfully",
                 data={
-                    "tasks": [task.to_dict() for task in pagination["items"]],
+                    "tasks": tasks,
                     "pagination": {
                         "page": pagination["page"],
                         "per_page": pagination["per_page"],
@@ -277,11 +286,14 @@ def get_task_detail(task_id):
         if not task:
             raise ResourceNotFoundError("Task")
 
+        task_data = task.to_dict()
+        task_data["progress"] = get_live_progress([task])[task.id]
+
         return jsonify(
             create_response(
                 success=True,
                 message="Task details retrieved successfully",
-                data={"task": task.to_dict()},
+                data={"task": task_data},
             )
         )
 
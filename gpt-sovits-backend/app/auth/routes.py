@@ -1,5 +1,5 @@
 # ./gpt-sovits-backend/app/auth/routes.py
-from flask import Blueprint, request, jsonify, current_app, url_for
+from flask import Blueprint, request, current_app, url_for
 from flask_jwt_extended import (
     create_access_token,
     create_refresh_token,
@@ -19,13 +19,19 @@ from app.auth.utils import (
     send_welcome_email,
 )
 from app.auth.decorators import rate_limit
+from app.services.activity_service import enqueue_last_login
 from app.utils.validators import validate_email, validate_username, validate_password
 from app.utils.exceptions import (
     ValidationError,
     AuthenticationError,
     ResourceConflictError,
 )
-from app.utils.helpers import create_response, get_client_ip, log_user_action
+from app.utils.helpers import (
+    create_response,
+    get_client_ip,
+    log_user_action,
+    jsonify_fast,
+)
 
 auth_bp = Blueprint("auth", __name__)
 
@@ -91,7 +97,7 @@ def register():
         access_token, refresh_token = user.generate_tokens()
 
         return (
-            jsonify(
+            jsonify_fast(
                 create_response(
                     success=True,
                     message=message,
@@ -106,10 +112,10 @@ def register():
         )
 
     except (ValidationError, ResourceConflictError) as e:
-        return jsonify(create_response(False, str(e))), e.status_code
+        return jsonify_fast(create_response(False, str(e))), e.status_code
     except Exception as e:
         current_app.logger.error(f"Registration error: {e}")
-        return jsonify(create_response(False, "Registration failed")), 500
+        return jsonify_fast(create_response(False, "Registration failed")), 500
 
 
 @auth_bp.route("/login", methods=["POST"])
@@ -137,9 +143,7 @@ def login():
             )
 
         # 查找用户
-        user = User.query.filter(
-            (User.username == identifier) | (User.email == identifier)
-        ).first()
+        user = User.find_by_identifier(identifier)
 
         if not user or not user.check_password(password):
             # 记录失败的登录尝试
@@ -151,26 +155,31 @@ def login():
 
         # 登录成功
         record_login_attempt(client_ip, success=True)
-        user.update_last_login()
 
         # 生成令牌
         access_token, refresh_token = user.generate_tokens()
 
-        # 记录登录日志
+        # 记录登录时间（异步模式下由后台批量写入）和登录日志，统一提交
+        login_time = enqueue_last_login(user)
         log_user_action(
             user_id=user.id,
             action="user_login",
             resource_type="user",
             resource_id=user.id,
             details="User logged in successfully",
+            commit=False,
         )
+        db.session.commit()
+
+        user_data = user.to_dict(include_sensitive=True)
+        user_data["last_login_at"] = login_time.isoformat()
 
-        return jsonify(
+        return jsonify_fast(
             create_response(
                 success=True,
                 message="Login successful",
                 data={
-                    "user": user.to_dict(include_sensitive=True),
+                    "user": user_data,
                     "access_token": access_token,
                     "refresh_token": refresh_token,
                 },
@@ -178,10 +187,10 @@ def login():
         )
 
     except (ValidationError, AuthenticationError) as e:
-        return jsonify(create_response(False, str(e))), e.status_code
+        return jsonify_fast(create_response(False, str(e))), e.status_code
     except Exception as e:
         current_app.logger.error(f"Login error: {e}")
-        return jsonify(create_response(False, "Login failed")), 500
+        return jsonify_fast(create_response(False, "Login failed")), 500
 
 
 @auth_bp.route("/logout", methods=["POST"])
@@ -203,11 +212,11 @@ def logout():
         # 这里可以添加令牌黑名单逻辑
         # 简化处理：客户端删除令牌即可
 
-        return jsonify(create_response(success=True, message="Logout successful"))
+        return jsonify_fast(create_response(success=True, message="Logout successful"))
 
     except Exception as e:
         current_app.logger.error(f"Logout error: {e}")
-        return jsonify(create_response(False, "Logout failed")), 500
+        return jsonify_fast(create_response(False, "Logout failed")), 500
 
 
 @auth_bp.route("/refresh", methods=["POST"])
@@ -227,7 +236,7 @@ def refresh():
             additional_claims={"role": user.role, "username": user.username},
         )
 
-        return jsonify(
+        return jsonify_fast(
             create_response(
                 success=True,
                 message="Token refreshed",
@@ -236,10 +245,10 @@ def refresh():
         )
 
     except AuthenticationError as e:
-        return jsonify(create_response(False, str(e))), e.status_code
+        return jsonify_fast(create_response(False, str(e))), e.status_code
     except Exception as e:
         current_app.logger.error(f"Token refresh error: {e}")
-        return jsonify(create_response(False, "Token refresh failed")), 500
+        return jsonify_fast(create_response(False, "Token refresh failed")), 500
 
 
 @auth_bp.route("/verify-email/<token>")
@@ -250,14 +259,14 @@ def verify_email(token):
 
         if not user:
             return (
-                jsonify(
+                jsonify_fast(
                     create_response(False, "Invalid or expired verification token")
                 ),
                 400,
             )
 
         if user.is_verified:
-            return jsonify(create_response(True, "Email already verified"))
+            return jsonify_fast(create_response(True, "Email already verified"))
 
         # 标记邮箱为已验证
         user.is_verified = True
@@ -275,13 +284,13 @@ def verify_email(token):
             details="Email verification completed",
         )
 
-        return jsonify(
+        return jsonify_fast(
             create_response(success=True, message="Email verified successfully")
         )
 
     except Exception as e:
         current_app.logger.error(f"Email verification error: {e}")
-        return jsonify(create_response(False, "Email verification failed")), 500
+        return jsonify_fast(create_response(False, "Email verification failed")), 500
 
 
 @auth_bp.route("/forgot-password", methods=["POST"])
@@ -323,7 +332,7 @@ def forgot_password():
             )
 
         # 无论用户是否存在都返回相同消息，防止邮箱枚举
-        return jsonify(
+        return jsonify_fast(
             create_response(
                 success=True,
                 message="If the email exists, a password reset link has been sent",
@@ -331,10 +340,13 @@ def forgot_password():
         )
 
     except ValidationError as e:
-        return jsonify(create_response(False, str(e))), e.status_code
+        return jsonify_fast(create_response(False, str(e))), e.status_code
     except Exception as e:
         current_app.logger.error(f"Forgot password error: {e}")
-        return jsonify(create_response(False, "Password reset request failed")), 500
+        return (
+            jsonify_fast(create_response(False, "Password reset request failed")),
+            500,
+        )
 
 
 @auth_bp.route("/reset-password/<token>", methods=["POST"])
@@ -381,15 +393,15 @@ def reset_password(token):
             details="Password reset completed successfully",
         )
 
-        return jsonify(
+        return jsonify_fast(
             create_response(success=True, message="Password reset successful")
         )
 
     except (ValidationError, AuthenticationError) as e:
-        return jsonify(create_response(False, str(e))), e.status_code
+        return jsonify_fast(create_response(False, str(e))), e.status_code
     except Exception as e:
         current_app.logger.error(f"Password reset error: {e}")
-        return jsonify(create_response(False, "Password reset failed")), 500
+        return jsonify_fast(create_response(False, "Password reset failed")), 500
 
 
 @auth_bp.route("/change-password", methods=["POST"])
@@ -436,12 +448,12 @@ def change_password():
             details="Password changed successfully",
         )
 
-        return jsonify(
+        return jsonify_fast(
             create_response(success=True, message="Password changed successfully")
         )
 
     except (ValidationError, AuthenticationError) as e:
-        return jsonify(create_response(False, str(e))), e.status_code
+        return jsonify_fast(create_response(False, str(e))), e.status_code
     except Exception as e:
         current_app.logger.error(f"Change password error: {e}")
-        return jsonify(create_response(False, "Password change failed")), 500
+        return jsonify_fast(create_response(False, "Password change failed")), 500
@@ -8,19 +8,35 @@ from app.extensions import mail
 from app.models.user import User, AuthToken
 from app.utils.exceptions import AuthenticationError
 
+# 复用的JWT实例与签名密钥缓存
+_JWT = jwt.PyJWT()
+_JWT_ALGORITHM = "HS256"
+_signing_key_cache = {}
+
+
+def _get_signing_key():
+    """获取缓存的签名密钥（配置变更时自动失效）"""
+    secret = current_app.config["SECRET_KEY"]
+    key = _signing_key_cache.get(secret)
+    if key is None:
+        _signing_key_cache.clear()
+        key = _signing_key_cache[secret] = secret.encode("utf-8")
+    return key
+
 
 def generate_verification_token(
     user_id, token_type="email_verification", expires_in_hours=24
 ):
     """生成验证令牌"""
+    now = datetime.utcnow()
     payload = {
         "user_id": user_id,
         "token_type": token_type,
-        "exp": datetime.utcnow() + timedelta(hours=expires_in_hours),
-        "iat": datetime.utcnow(),
+        "exp": now + timedelta(hours=expires_in_hours),
+        "iat": now,
     }
 
-    token = jwt.encode(payload, current_app.config["SECRET_KEY"], algorithm="HS256")
+    token = _JWT.encode(payload, _get_signing_key(), algorithm=_JWT_ALGORITHM)
 
     return token
 
@@ -28,9 +44,7 @@ def generate_verification_token(
 def verify_token(token, token_type="email_verification"):
     """验证令牌"""
     try:
-        payload = jwt.decode(
-            token, current_app.config["SECRET_KEY"], algorithms=["HS256"]
-        )
+        payload = _JWT.decode(token, _get_signing_key(), algorithms=[_JWT_ALGORITHM])
 
         if payload.get("token_type") != token_type:
             return None
@@ -266,21 +280,25 @@ def create_audit_log_entry(
     )
 
 
-def clean_expired_tokens():
-    """清理过期的令牌"""
+def clean_expired_tokens(purge_after_days=7):
+    """清理过期的令牌：撤销已过期令牌，并删除过期超过指定天数的记录"""
     from app.extensions import db
 
     try:
-        # 删除过期的认证令牌
-        expired_tokens = AuthToken.query.filter(
-            AuthToken.expires_at < datetime.utcnow(), AuthToken.is_revoked == False
-        ).all()
+        now = datetime.utcnow()
+
+        # 批量撤销过期的认证令牌
+        revoked_count = AuthToken.query.filter(
+            AuthToken.expires_at < now, AuthToken.is_revoked == False
+        ).update({AuthToken.is_revoked: True}, synchronize_session=False)
 
-        for token in expired_tokens:
-            token.revoke()
+        # 删除早已过期的记录，控制表与索引大小
+        AuthToken.query.filter(
+            AuthToken.expires_at < now - timedelta(days=purge_after_days)
+        ).delete(synchronize_session=False)
 
         db.session.commit()
-        return len(expired_tokens)
+        return revoked_count
 
     except Exception as e:
         current_app.logger.error(f"Failed to clean expired tokens: {e}")
@@ -1,6 +1,7 @@
 # ./gpt-sovits-backend/app/config.py
 import os
 from datetime import timedelta
+from app.utils.json_utils import json_dumps, json_loads
 
 
 class Config:
@@ -14,24 +15,41 @@ class Config:
     )
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     SQLALCHEMY_ECHO = False
+    # JSON列在加载行时解析一次（结果挂在实例属性上），解析/序列化使用orjson
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        "json_serializer": json_dumps,
+        "json_deserializer": json_loads,
+    }
 
     # JWT配置
     JWT_SECRET_KEY = os.environ.get("JWT_SECRET_KEY") or "jwt-secret-string"
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=24)
     JWT_REFRESH_TOKEN_EXPIRES = timedelta(days=30)
+    JWT_DECODE_CACHE_TTL = 30  # 已验证令牌的缓存秒数，0为关闭
+    JWT_TOKEN_REUSE_SECONDS = 5  # 重复登录复用令牌的秒数，0为关闭
 
     # 文件上传配置
     UPLOAD_FOLDER = os.path.join(
         os.path.dirname(os.path.abspath(__file__)), "..", "uploads"
     )
     MAX_CONTENT_LENGTH = 10 * 1024 * 1024  # 10MB
-    ALLOWED_AUDIO_EXTENSIONS = {"wav", "mp3", "flac", "m4a"}
-    ALLOWED_MODEL_EXTENSIONS = {"pth", "index", "json"}
+    ALLOWED_AUDIO_EXTENSIONS = frozenset({"wav", "mp3", "flac", "m4a"})
+    ALLOWED_MODEL_EXTENSIONS = frozenset({"pth", "index", "json"})
 
     # 音频处理配置
     AUDIO_SAMPLE_RATE = 16000
     AUDIO_MIN_DURATION = 3  # 最小3秒
     AUDIO_MAX_DURATION = 60  # 最大60秒
+    # 预处理音频与特征的磁盘缓存目录（按内容指纹命名，任务重试时复用）
+    AUDIO_CACHE_FOLDER = os.environ.get("AUDIO_CACHE_FOLDER") or os.path.join(
+        UPLOAD_FOLDER, "cache"
+    )
+    # 缓存淘汰：超过保留天数或总大小上限时由io_cleanup队列的任务清理
+    AUDIO_CACHE_MAX_AGE_DAYS = int(os.environ.get("AUDIO_CACHE_MAX_AGE_DAYS") or 30)
+    AUDIO_CACHE_MAX_BYTES = int(
+        os.environ.get("AUDIO_CACHE_MAX_BYTES") or 5 * 1024 * 1024 * 1024
+    )
+    AUDIO_CACHE_PRUNE_INTERVAL = 3600  # 两次清理之间的最短间隔（秒）
 
     # Celery配置
     CELERY_BROKER_URL = (
@@ -54,6 +72,8 @@ class Config:
     # GPT-SoVITS模型配置
     SOVITS_MODEL_PATH = os.environ.get("SOVITS_MODEL_PATH") or "models/sovits"
     GPT_MODEL_PATH = os.environ.get("GPT_MODEL_PATH") or "models/gpt"
+    # 进程内训练入口所在模块（需提供train_run(config)），不可导入时使用模拟训练
+    SOVITS_TRAIN_MODULE = os.environ.get("SOVITS_TRAIN_MODULE") or "gpt_sovits.train"
 
     # 业务配置
     MAX_CONCURRENT_TASKS = int(os.environ.get("MAX_CONCURRENT_TASKS") or 5)
@@ -65,10 +85,33 @@ class Config:
     # 日志配置
     LOG_LEVEL = os.environ.get("LOG_LEVEL") or "INFO"
 
+    # 审计日志由Celery后台任务写入（需要消费默认队列的worker）
+    AUDIT_LOG_ASYNC = os.environ.get("AUDIT_LOG_ASYNC", "false").lower() in [
+        "true",
+        "on",
+        "1",
+    ]
+
+    # 最后登录时间经Redis缓冲后由Celery后台任务批量写入（需要消费默认队列的worker）
+    LAST_LOGIN_ASYNC = os.environ.get("LAST_LOGIN_ASYNC", "false").lower() in [
+        "true",
+        "on",
+        "1",
+    ]
+
+    # 查询检测配置（按请求统计重复SQL，检测N+1）
+    QUERY_DETECTOR_ENABLED = False
+    QUERY_DETECTOR_THRESHOLD = 3
+
 
 class DevelopmentConfig(Config):
     DEBUG = True
-    SQLALCHEMY_ECHO = True
+    SQLALCHEMY_ECHO = os.environ.get("SQLALCHEMY_ECHO", "false").lower() in [
+        "true",
+        "on",
+        "1",
+    ]
+    QUERY_DETECTOR_ENABLED = True
 
 
 class ProductionConfig(Config):
@@ -80,6 +123,9 @@ class TestingConfig(Config):
     TESTING = True
     SQLALCHEMY_DATABASE_URI = "sqlite:///:memory:"
     WTF_CSRF_ENABLED = False
+    QUERY_DETECTOR_ENABLED = True
+    JWT_TOKEN_REUSE_SECONDS = 0
+    AUDIT_LOG_ASYNC = False
 
 
 config = {
@@ -1,4 +1,5 @@
 # ./gpt-sovits-backend/app/extensions.py
+from contextlib import contextmanager
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 from flask_jwt_extended import JWTManager
@@ -27,6 +28,18 @@ redis_client = None
 celery = Celery()
 
 
+@contextmanager
+def unit_of_work():
+    """工作单元：块内的模型变更在退出时统一提交，异常时回滚"""
+    session = db.session
+    try:
+        yield session
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+
+
 def init_extensions(app):
     """初始化所有扩展"""
     global redis_client
@@ -66,6 +79,12 @@ def init_celery(app):
                 "queue": "voice_clone"
             },
             "app.services.tts_service.generate_speech_task": {"queue": "tts"},
+            "app.services.voice_clone_service.remove_work_dir_task": {
+                "queue": "io_cleanup"
+            },
+            "app.services.voice_clone_service.prune_audio_cache_task": {
+                "queue": "io_cleanup"
+            },
         },
     )
 
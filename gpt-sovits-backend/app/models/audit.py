@@ -1,16 +1,25 @@
 # ./gpt-sovits-backend/app/models/audit.py
 from datetime import datetime
+from operator import attrgetter
+from flask import g, current_app, has_request_context
 from app.extensions import db
-import uuid
-import json
+from app.models.types import GUID, JSONType, generate_uuid
+
+_utcnow = datetime.utcnow
 
 
 class AuditLog(db.Model):
     """审计日志模型"""
 
     __tablename__ = "audit_logs"
+    __table_args__ = (
+        db.Index("ix_audit_user_time", "user_id", "created_at"),
+        db.Index("ix_audit_resource", "resource_type", "resource_id"),
+        # 审计日志游标分页按(created_at, id)降序
+        db.Index("ix_audit_time_id", "created_at", "id"),
+    )
 
-    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = db.Column(GUID(), primary_key=True, default=generate_uuid)
 
     # 操作信息
     action = db.Column(db.String(50), nullable=False)  # 操作类型
@@ -18,13 +27,13 @@ class AuditLog(db.Model):
     resource_id = db.Column(db.String(36))  # 资源ID
 
     # 用户信息
-    user_id = db.Column(db.String(36), db.ForeignKey("users.id"))
+    user_id = db.Column(GUID(), db.ForeignKey("users.id"))
     ip_address = db.Column(db.String(45))  # 支持IPv6
     user_agent = db.Column(db.String(500))
 
     # 操作详情
-    old_values = db.Column(db.Text)  # JSON格式存储修改前的值
-    new_values = db.Column(db.Text)  # JSON格式存储修改后的值
+    old_values = db.Column(JSONType)  # JSON格式存储修改前的值
+    new_values = db.Column(JSONType)  # JSON格式存储修改后的值
     description = db.Column(db.Text)  # 操作描述
 
     # 结果信息
@@ -51,54 +60,103 @@ class AuditLog(db.Model):
         user_agent=None,
         status="success",
         error_message=None,
+        commit=True,
     ):
-        """记录操作日志"""
-        log = cls(
+        """记录操作日志（请求上下文中写入缓冲区，此时返回None）"""
+        values = dict(
             action=action,
             resource_type=resource_type,
             user_id=user_id,
             resource_id=resource_id,
-            old_values=json.dumps(old_values) if old_values else None,
-            new_values=json.dumps(new_values) if new_values else None,
+            old_values=old_values or None,
+            new_values=new_values or None,
             description=description,
             ip_address=ip_address,
             user_agent=user_agent,
             status=status,
             error_message=error_message,
         )
+
+        # 请求上下文中先写入缓冲区，请求结束时批量插入
+        if commit and has_request_context():
+            values["id"] = generate_uuid()
+            values["created_at"] = _utcnow()
+            if "audit_buffer" not in g:
+                g.audit_buffer = []
+            g.audit_buffer.append(values)
+            return None
+
+        log = cls(**values)
         db.session.add(log)
-        db.session.commit()
+        if commit:
+            db.session.commit()
         return log
 
+    @classmethod
+    def flush_buffer(cls):
+        """批量写入请求内缓冲的审计日志"""
+        buffer = g.pop("audit_buffer", None)
+        if not buffer:
+            return 0
+
+        # 异步模式下交给后台任务写入，不占用请求时间
+        if current_app.config.get("AUDIT_LOG_ASYNC"):
+            from app.services.activity_service import write_audit_logs
+
+            try:
+                write_audit_logs.delay(
+                    [
+                        dict(entry, created_at=entry["created_at"].isoformat())
+                        for entry in buffer
+                    ]
+                )
+                return len(buffer)
+            except Exception as e:
+                current_app.logger.warning(f"Failed to enqueue audit logs: {e}")
+
+        # 使用独立连接写入，不影响请求会话中的事务
+        try:
+            with db.engine.begin() as conn:
+                conn.execute(cls.__table__.insert(), buffer)
+            return len(buffer)
+        except Exception as e:
+            current_app.logger.error(f"Failed to flush audit logs: {e}")
+            return 0
+
     def get_old_values(self):
         """获取修改前的值"""
         if self.old_values:
-            return json.loads(self.old_values)
+            return self.old_values
         return {}
 
     def get_new_values(self):
         """获取修改后的值"""
         if self.new_values:
-            return json.loads(self.new_values)
+            return self.new_values
         return {}
 
+    # to_dict中直接取值的字段
+    _SIMPLE_FIELDS = (
+        "id",
+        "action",
+        "resource_type",
+        "resource_id",
+        "user_id",
+        "ip_address",
+        "user_agent",
+        "description",
+        "status",
+        "error_message",
+    )
+    _simple_getter = attrgetter(*_SIMPLE_FIELDS)
+
     def to_dict(self):
         """转换为字典"""
-        return {
-            "id": self.id,
-            "action": self.action,
-            "resource_type": self.resource_type,
-            "resource_id": self.resource_id,
-            "user_id": self.user_id,
-            "ip_address": self.ip_address,
-            "user_agent": self.user_agent,
-            "old_values": self.get_old_values(),
-            "new_values": self.get_new_values(),
-            "description": self.description,
-            "status": self.status,
-            "error_message": self.error_message,
-            "created_at": self.created_at.isoformat(),
-        }
+        data = dict(zip(self._SIMPLE_FIELDS, self._simple_getter(self)))
+        data["old_values"] = self.old_values or {}
+        data["new_values"] = self.new_values or {}
+        data["created_at"] = self.created_at.isoformat()
+        return data
 
     def __repr__(self):
         return f"<AuditLog {self.action} on {self.resource_type}>"
@@ -108,9 +166,17 @@ class UserUpload(db.Model):
     """用户上传文件记录"""
 
     __tablename__ = "user_uploads"
+    __table_args__ = (
+        # 按类型统计；包含file_size，SUM可直接走覆盖索引
+        db.Index(
+            "ix_upload_user_type", "user_id", "is_deleted", "file_type", "file_size"
+        ),
+        # 去重查询按用户+内容ID+删除标记（MySQL不支持部分索引，改为复合列）
+        db.Index("ix_upload_user_content", "user_id", "file_content_id", "is_deleted"),
+    )
 
-    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    user_id = db.Column(db.String(36), db.ForeignKey("users.id"), nullable=False)
+    id = db.Column(GUID(), primary_key=True, default=generate_uuid)
+    user_id = db.Column(GUID(), db.ForeignKey("users.id"), nullable=False)
 
     # 文件信息
     filename = db.Column(db.String(255), nullable=False)
@@ -119,7 +185,8 @@ class UserUpload(db.Model):
     file_size = db.Column(db.BigInteger, nullable=False)  # 文件大小(字节)
     file_type = db.Column(db.String(50), nullable=False)  # audio, model, image等
     mime_type = db.Column(db.String(100))
-    file_hash = db.Column(db.String(64))  # SHA256哈希值，用于去重
+    file_hash = db.Column(db.String(64))  # SHA256哈希值，仅模型文件用于完整性校验
+    file_content_id = db.Column(db.String(32))  # xxh3_128内容指纹，用于去重
 
     # 文件状态
     status = db.Column(
@@ -132,7 +199,7 @@ class UserUpload(db.Model):
     related_model_id = db.Column(db.String(36))  # 关联的模型ID
 
     # 元数据
-    file_metadata = db.Column(db.Text)  # JSON格式存储文件元数据
+    file_metadata = db.Column(JSONType)  # JSON格式存储文件元数据
 
     # 时间戳
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
@@ -142,36 +209,42 @@ class UserUpload(db.Model):
 
     def set_metadata(self, metadata):
         """设置元数据"""
-        self.file_metadata = json.dumps(metadata)
+        self.file_metadata = metadata
 
     def get_metadata(self):
         """获取元数据"""
         if self.file_metadata:
-            return json.loads(self.file_metadata)
+            return self.file_metadata
         return {}
 
-    def mark_deleted(self):
+    def mark_deleted(self, commit=True):
         """标记为已删除"""
         self.is_deleted = True
-        self.updated_at = datetime.utcnow()
-        db.session.commit()
+        self.updated_at = _utcnow()
+        if commit:
+            db.session.commit()
+
+    # to_dict中直接取值的字段
+    _SIMPLE_FIELDS = (
+        "id",
+        "filename",
+        "original_filename",
+        "file_size",
+        "file_type",
+        "mime_type",
+        "status",
+        "related_task_id",
+        "related_model_id",
+    )
+    _simple_getter = attrgetter(*_SIMPLE_FIELDS)
 
     def to_dict(self):
         """转换为字典"""
-        return {
-            "id": self.id,
-            "filename": self.filename,
-            "original_filename": self.original_filename,
-            "file_size": self.file_size,
-            "file_type": self.file_type,
-            "mime_type": self.mime_type,
-            "status": self.status,
-            "related_task_id": self.related_task_id,
-            "related_model_id": self.related_model_id,
-            "file_metadata": self.get_metadata(),
-            "created_at": self.created_at.isoformat(),
-            "updated_at": self.updated_at.isoformat(),
-        }
+        data = dict(zip(self._SIMPLE_FIELDS, self._simple_getter(self)))
+        data["file_metadata"] = self.file_metadata or {}
+        data["created_at"] = self.created_at.isoformat()
+        data["updated_at"] = self.updated_at.isoformat()
+        return data
 
     def __repr__(self):
         return f"<UserUpload {self.filename}>"
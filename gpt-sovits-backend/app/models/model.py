@@ -1,16 +1,18 @@
 # ./gpt-sovits-backend/app/models/model.py
 from datetime import datetime
+from operator import attrgetter
+from sqlalchemy import DDL, event
 from app.extensions import db
-import uuid
-import json
+from app.models.types import GUID, JSONType, generate_uuid
+from app.utils.validators import validate_string_list
+
+_utcnow = datetime.utcnow
 
 # 多对多关系表：模型-标签
 model_tags = db.Table(
     "model_tags",
-    db.Column(
-        "model_id", db.String(36), db.ForeignKey("voice_models.id"), primary_key=True
-    ),
-    db.Column("tag_id", db.String(36), db.ForeignKey("tags.id"), primary_key=True),
+    db.Column("model_id", GUID(), db.ForeignKey("voice_models.id"), primary_key=True),
+    db.Column("tag_id", GUID(), db.ForeignKey("tags.id"), primary_key=True),
 )
 
 
@@ -18,8 +20,19 @@ class VoiceModel(db.Model):
     """语音模型"""
 
     __tablename__ = "voice_models"
+    __table_args__ = (
+        # 文件占用检查按路径逐列等值查找
+        db.Index("ix_voice_model_model_path", "model_path"),
+        db.Index("ix_voice_model_config_path", "config_path"),
+        db.Index("ix_voice_model_index_path", "index_path"),
+        # 公开模型列表的默认排序
+        db.Index("ix_voice_model_public_usage", "is_public", "status", "usage_count"),
+    )
+
+    # 全文搜索覆盖的文本列
+    SEARCH_COLUMNS = ("name", "description", "voice_characteristics")
 
-    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = db.Column(GUID(), primary_key=True, default=generate_uuid)
 
     # 基本信息
     name = db.Column(db.String(100), nullable=False)
@@ -29,7 +42,7 @@ class VoiceModel(db.Model):
     model_type = db.Column(db.String(20), default="user_trained", nullable=False)
 
     # 所有者信息
-    owner_id = db.Column(db.String(36), db.ForeignKey("users.id"))
+    owner_id = db.Column(GUID(), db.ForeignKey("users.id"))
 
     # 模型文件路径
     model_path = db.Column(db.String(255), nullable=False)  # 主模型文件路径
@@ -37,8 +50,8 @@ class VoiceModel(db.Model):
     index_path = db.Column(db.String(255))  # 索引文件路径
 
     # 模型特性
-    supported_emotions = db.Column(db.Text)  # JSON格式存储支持的情感列表
-    supported_languages = db.Column(db.Text)  # JSON格式存储支持的语言列表
+    supported_emotions = db.Column(JSONType)  # JSON格式存储支持的情感列表
+    supported_languages = db.Column(JSONType)  # JSON格式存储支持的语言列表
     voice_characteristics = db.Column(db.Text)  # 音色特征描述
 
     # 质量评分
@@ -58,7 +71,7 @@ class VoiceModel(db.Model):
         db.String(20), default="pending"
     )  # pending, approved, rejected
     review_message = db.Column(db.Text)  # 审核意见
-    reviewed_by = db.Column(db.String(36), db.ForeignKey("users.id"))
+    reviewed_by = db.Column(GUID(), db.ForeignKey("users.id"))
     reviewed_at = db.Column(db.DateTime)
 
     # 时间戳
@@ -71,99 +84,161 @@ class VoiceModel(db.Model):
     tags = db.relationship(
         "Tag",
         secondary=model_tags,
-        lazy="subquery",
+        lazy="selectin",
         backref=db.backref("models", lazy=True),
     )
     reviewer = db.relationship("User", foreign_keys=[reviewed_by])
 
     def set_supported_emotions(self, emotions):
         """设置支持的情感列表"""
-        self.supported_emotions = json.dumps(emotions)
+        self.supported_emotions = validate_string_list(emotions, "supported_emotions")
 
     def get_supported_emotions(self):
         """获取支持的情感列表"""
         if self.supported_emotions:
-            return json.loads(self.supported_emotions)
+            return self.supported_emotions
         return ["neutral"]
 
     def set_supported_languages(self, languages):
         """设置支持的语言列表"""
-        self.supported_languages = json.dumps(languages)
+        self.supported_languages = validate_string_list(
+            languages, "supported_languages"
+        )
 
     def get_supported_languages(self):
         """获取支持的语言列表"""
         if self.supported_languages:
-            return json.loads(self.supported_languages)
+            return self.supported_languages
         return ["zh-CN"]
 
-    def increment_usage(self):
-        """增加使用次数"""
-        self.usage_count += 1
-        db.session.commit()
+    def increment_usage(self, commit=True):
+        """增加使用次数（数据库端原子自增）"""
+        VoiceModel.query.filter_by(id=self.id).update(
+            {VoiceModel.usage_count: VoiceModel.usage_count + 1},
+            synchronize_session=False,
+        )
+        if commit:
+            db.session.commit()
 
-    def increment_download(self):
-        """增加下载次数"""
-        self.download_count += 1
-        db.session.commit()
+    def increment_download(self, commit=True):
+        """增加下载次数（数据库端原子自增）"""
+        VoiceModel.query.filter_by(id=self.id).update(
+            {VoiceModel.download_count: VoiceModel.download_count + 1},
+            synchronize_session=False,
+        )
+        if commit:
+            db.session.commit()
 
-    def set_review_result(self, status, message, reviewer_id):
+    def set_review_result(self, status, message, reviewer_id, commit=True):
         """设置审核结果"""
         self.review_status = status
         self.review_message = message
         self.reviewed_by = reviewer_id
-        self.reviewed_at = datetime.utcnow()
+        self.reviewed_at = _utcnow()
 
         if status == "approved":
             self.status = "active"
         elif status == "rejected":
             self.status = "inactive"
 
-        db.session.commit()
+        if commit:
+            db.session.commit()
+
+    # to_dict中直接取值的字段
+    _SIMPLE_FIELDS = (
+        "id",
+        "name",
+        "description",
+        "model_type",
+        "owner_id",
+        "voice_characteristics",
+        "quality_score",
+        "download_count",
+        "usage_count",
+        "status",
+        "is_public",
+        "is_featured",
+        "review_status",
+    )
+    _simple_getter = attrgetter(*_SIMPLE_FIELDS)
+    _PATH_FIELDS = ("model_path", "config_path", "index_path")
+    _path_getter = attrgetter(*_PATH_FIELDS)
 
     def to_dict(self, include_paths=False):
         """转换为字典"""
-        data = {
-            "id": self.id,
-            "name": self.name,
-            "description": self.description,
-            "model_type": self.model_type,
-            "owner_id": self.owner_id,
-            "supported_emotions": self.get_supported_emotions(),
-            "supported_languages": self.get_supported_languages(),
-            "voice_characteristics": self.voice_characteristics,
-            "quality_score": self.quality_score,
-            "download_count": self.download_count,
-            "usage_count": self.usage_count,
-            "status": self.status,
-            "is_public": self.is_public,
-            "is_featured": self.is_featured,
-            "review_status": self.review_status,
-            "created_at": self.created_at.isoformat(),
-            "updated_at": self.updated_at.isoformat(),
-            "tags": [tag.to_dict() for tag in self.tags],
-        }
+        data = dict(zip(self._SIMPLE_FIELDS, self._simple_getter(self)))
+        data.update(
+            {
+                "supported_emotions": self.get_supported_emotions(),
+                "supported_languages": self.get_supported_languages(),
+                "created_at": self.created_at.isoformat(),
+                "updated_at": self.updated_at.isoformat(),
+                "tags": [tag.to_dict() for tag in self.tags],
+            }
+        )
 
         if include_paths:
-            data.update(
-                {
-                    "model_path": self.model_path,
-                    "config_path": self.config_path,
-                    "index_path": self.index_path,
-                }
-            )
+            data.update(zip(self._PATH_FIELDS, self._path_getter(self)))
 
         return data
 
+    @classmethod
+    def text_search_filter(cls, query_text):
+        """构建按数据库方言使用全文/三元组索引的文本搜索条件"""
+        dialect = db.session.get_bind().dialect.name
+        columns = [getattr(cls, name) for name in cls.SEARCH_COLUMNS]
+
+        # MySQL：ngram全文索引，短语匹配（ngram最小词元为2个字符）
+        if dialect == "mysql" and len(query_text.strip()) >= 2:
+            phrase = '"{}"'.format(query_text.replace('"', " ").strip())
+            return db.text(
+                "MATCH (voice_models.name, voice_models.description, "
+                "voice_models.voice_characteristics) "
+                "AGAINST (:search_phrase IN BOOLEAN MODE)"
+            ).bindparams(search_phrase=phrase)
+
+        # PostgreSQL：ILIKE可直接使用pg_trgm的GIN索引
+        if dialect == "postgresql":
+            pattern = f"%{query_text}%"
+            return db.or_(*(column.ilike(pattern) for column in columns))
+
+        return db.or_(*(column.contains(query_text) for column in columns))
+
     def __repr__(self):
         return f"<VoiceModel {self.name}>"
 
 
+# 文本搜索索引（按数据库方言创建）
+event.listen(
+    VoiceModel.__table__,
+    "after_create",
+    DDL(
+        "CREATE FULLTEXT INDEX ix_voice_model_fulltext ON voice_models "
+        "(name, description, voice_characteristics) WITH PARSER ngram"
+    ).execute_if(dialect="mysql"),
+)
+event.listen(
+    VoiceModel.__table__,
+    "after_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
+for _column in VoiceModel.SEARCH_COLUMNS:
+    event.listen(
+        VoiceModel.__table__,
+        "after_create",
+        DDL(
+            f"CREATE INDEX ix_voice_model_{_column}_trgm ON voice_models "
+            f"USING gin ({_column} gin_trgm_ops)"
+        ).execute_if(dialect="postgresql"),
+    )
+
+
 class Tag(db.Model):
     """标签模型"""
 
     __tablename__ = "tags"
 
-    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = db.Column(GUID(), primary_key=True, default=generate_uuid)
     name = db.Column(db.String(50), unique=True, nullable=False)
     description = db.Column(db.String(200))
     color = db.Column(db.String(7), default="#007bff")  # 十六进制颜色代码
@@ -174,17 +249,63 @@ class Tag(db.Model):
     @classmethod
     def get_or_create(cls, name, description=None):
         """获取或创建标签"""
-        tag = cls.query.filter_by(name=name).first()
-        if not tag:
-            tag = cls(name=name, description=description)
-            db.session.add(tag)
-            db.session.commit()
-        return tag
+        stmt = cls._build_insert_ignore(name=name, description=description)
+        if stmt is None:
+            # 不支持忽略冲突的数据库：先查询，不存在再插入
+            tag = cls.query.filter_by(name=name).first()
+            if tag:
+                return tag
+            stmt = db.insert(cls.__table__).values(
+                id=generate_uuid(),
+                name=name,
+                description=description,
+                created_at=_utcnow(),
+            )
+
+        # 标签已存在时插入为空操作，之后只需查询一次；由调用方提交事务
+        db.session.execute(stmt)
+        return cls.query.filter_by(name=name).first()
+
+    @classmethod
+    def _build_insert_ignore(cls, **values):
+        """构建按数据库方言忽略唯一冲突的INSERT语句，不支持的方言返回None"""
+        values.setdefault("id", generate_uuid())
+        values.setdefault("created_at", _utcnow())
+        dialect = db.session.get_bind().dialect.name
+
+        if dialect == "mysql":
+            from sqlalchemy.dialects.mysql import insert
 
-    def increment_usage(self):
-        """增加使用次数"""
-        self.usage_count += 1
-        db.session.commit()
+            stmt = insert(cls.__table__).values(**values)
+            return stmt.on_duplicate_key_update(name=stmt.inserted.name)
+
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+
+            return (
+                insert(cls.__table__)
+                .values(**values)
+                .on_conflict_do_nothing(index_elements=["name"])
+            )
+
+        if dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert
+
+            return (
+                insert(cls.__table__)
+                .values(**values)
+                .on_conflict_do_nothing(index_elements=["name"])
+            )
+
+        return None
+
+    def increment_usage(self, commit=True):
+        """增加使用次数（数据库端原子自增）"""
+        Tag.query.filter_by(id=self.id).update(
+            {Tag.usage_count: Tag.usage_count + 1}, synchronize_session=False
+        )
+        if commit:
+            db.session.commit()
 
     def to_dict(self):
         """转换为字典"""
@@ -1,17 +1,58 @@
 # ./gpt-sovits-backend/app/models/task.py
 from datetime import datetime
+from operator import attrgetter
+from sqlalchemy import event
+from sqlalchemy.orm import Session, validates
 from app.extensions import db
-import uuid
-import json
+import re
+from app.models.types import GUID, JSONType, generate_uuid
+from app.utils.validators import validate_string_list, validate_json_object
+
+_utcnow = datetime.utcnow
+
+# 中文字符匹配
+_CJK_RE = re.compile(r"[\u4e00-\u9fff]")
+
+# 任务状态集合
+_ACTIVE_STATUSES = frozenset(("pending", "processing"))
+_FINISHED_STATUSES = frozenset(("completed", "failed", "cancelled"))
+
+# 会话info中的标记：事务提交后需要使任务统计缓存失效
+_STATS_DIRTY_KEY = "task_stats_dirty"
+
+
+def _invalidate_stats_on_commit():
+    """标记当前事务提交后使任务统计缓存失效（提交前失效会被旧数据重新填充）"""
+    db.session.info[_STATS_DIRTY_KEY] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_stats_after_commit(session):
+    """事务提交后按标记使任务统计缓存失效"""
+    if session.info.pop(_STATS_DIRTY_KEY, False):
+        from app.services.task_service import invalidate_task_stats_cache
+
+        invalidate_task_stats_cache()
+
+
+@event.listens_for(Session, "after_rollback")
+def _clear_stats_flag_after_rollback(session):
+    """事务回滚后修改未生效，清除失效标记"""
+    session.info.pop(_STATS_DIRTY_KEY, None)
 
 
 class VoiceCloneTask(db.Model):
     """音色克隆任务模型"""
 
     __tablename__ = "voice_clone_tasks"
+    __table_args__ = (
+        # 按用户+状态过滤并按创建时间限定范围（统计、取消、配额检查）
+        db.Index("ix_vctask_user_status_time", "user_id", "status", "created_at"),
+        db.Index("ix_vctask_status_time", "status", "created_at"),
+    )
 
-    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    user_id = db.Column(db.String(36), db.ForeignKey("users.id"), nullable=False)
+    id = db.Column(GUID(), primary_key=True, default=generate_uuid)
+    user_id = db.Column(GUID(), db.ForeignKey("users.id"), nullable=False)
 
     # 任务信息
     task_name = db.Column(db.String(100), nullable=False)
@@ -21,7 +62,7 @@ class VoiceCloneTask(db.Model):
     progress = db.Column(db.Integer, default=0)  # 0-100
 
     # 音频样本信息
-    audio_samples = db.Column(db.Text)  # JSON格式存储样本文件路径列表
+    audio_samples = db.Column(JSONType)  # JSON格式存储样本文件路径列表
     total_duration = db.Column(db.Float)  # 总时长(秒)
     sample_count = db.Column(db.Integer, default=0)
 
@@ -30,10 +71,10 @@ class VoiceCloneTask(db.Model):
     model_path = db.Column(db.String(255))
 
     # 任务配置
-    config = db.Column(db.Text)  # JSON格式存储训练配置
+    config = db.Column(JSONType)  # JSON格式存储训练配置
 
     # 结果信息
-    result_model_id = db.Column(db.String(36), db.ForeignKey("voice_models.id"))
+    result_model_id = db.Column(GUID(), db.ForeignKey("voice_models.id"))
     error_message = db.Column(db.Text)
 
     # 时间信息
@@ -52,26 +93,27 @@ class VoiceCloneTask(db.Model):
 
     def set_audio_samples(self, samples):
         """设置音频样本列表"""
-        self.audio_samples = json.dumps(samples)
+        self.audio_samples = validate_string_list(samples, "audio_samples")
 
     def get_audio_samples(self):
         """获取音频样本列表"""
         if self.audio_samples:
-            return json.loads(self.audio_samples)
+            return self.audio_samples
         return []
 
     def set_config(self, config):
         """设置任务配置"""
-        self.config = json.dumps(config)
+        self.config = validate_json_object(config, "config")
 
     def get_config(self):
         """获取任务配置"""
         if self.config:
-            return json.loads(self.config)
+            return self.config
         return {}
 
-    def update_status(self, status, progress=None, error_message=None):
+    def update_status(self, status, progress=None, error_message=None, commit=True):
         """更新任务状态"""
+        status_changed = status != self.status
         self.status = status
         if progress is not None:
             self.progress = progress
@@ -79,61 +121,75 @@ class VoiceCloneTask(db.Model):
             self.error_message = error_message
 
         if status == "processing" and not self.started_at:
-            self.started_at = datetime.utcnow()
-        elif status in ["completed", "failed", "cancelled"]:
-            self.completed_at = datetime.utcnow()
+            self.started_at = _utcnow()
+        elif status in _FINISHED_STATUSES:
+            self.completed_at = _utcnow()
 
-        db.session.commit()
+        # 状态变化后使任务统计缓存失效（在事务提交之后执行）
+        if status_changed:
+            _invalidate_stats_on_commit()
+
+        if commit:
+            db.session.commit()
 
     def get_duration(self):
         """获取任务执行时长"""
         if self.started_at and self.completed_at:
             return (self.completed_at - self.started_at).total_seconds()
         elif self.started_at:
-            return (datetime.utcnow() - self.started_at).total_seconds()
+            return (_utcnow() - self.started_at).total_seconds()
         return 0
 
     def is_active(self):
         """检查任务是否为活跃状态"""
-        return self.status in ["pending", "processing"]
+        return self.status in _ACTIVE_STATUSES
 
     def can_be_cancelled(self):
         """检查任务是否可以被取消"""
-        return self.status in ["pending", "processing"]
+        return self.status in _ACTIVE_STATUSES
 
     def can_be_retried(self):
         """检查任务是否可以重试"""
         return self.status == "failed"
 
+    # to_dict中直接取值的字段
+    _SIMPLE_FIELDS = (
+        "id",
+        "user_id",
+        "task_name",
+        "status",
+        "progress",
+        "sample_count",
+        "total_duration",
+        "model_name",
+        "model_path",
+        "result_model_id",
+        "error_message",
+    )
+    _simple_getter = attrgetter(*_SIMPLE_FIELDS)
+
     def to_dict(self, include_config=False):
         """转换为字典"""
-        data = {
-            "id": self.id,
-            "user_id": self.user_id,
-            "task_name": self.task_name,
-            "status": self.status,
-            "progress": self.progress,
-            "sample_count": self.sample_count,
-            "total_duration": self.total_duration,
-            "model_name": self.model_name,
-            "model_path": self.model_path,
-            "result_model_id": self.result_model_id,
-            "error_message": self.error_message,
-            "created_at": self.created_at.isoformat(),
-            "started_at": self.started_at.isoformat() if self.started_at else None,
-            "completed_at": (
-                self.completed_at.isoformat() if self.completed_at else None
-            ),
-            "estimated_completion": (
-                self.estimated_completion.isoformat()
-                if self.estimated_completion
-                else None
-            ),
-            "duration_seconds": self.get_duration(),
-            "is_active": self.is_active(),
-            "can_be_cancelled": self.can_be_cancelled(),
-            "can_be_retried": self.can_be_retried(),
-        }
+        is_active = self.status in _ACTIVE_STATUSES
+        data = dict(zip(self._SIMPLE_FIELDS, self._simple_getter(self)))
+        data.update(
+            {
+                "created_at": self.created_at.isoformat(),
+                "started_at": self.started_at.isoformat() if self.started_at else None,
+                "completed_at": (
+                    self.completed_at.isoformat() if self.completed_at else None
+                ),
+                "estimated_completion": (
+                    self.estimated_completion.isoformat()
+                    if self.estimated_completion
+                    else None
+                ),
+                "duration_seconds": self.get_duration(),
+                "is_active": is_active,
+                "can_be_cancelled": is_active,
+                "can_be_retried": self.status == "failed",
+            }
+        )
 
         if include_config:
             data["config"] = self.get_config()
@@ -149,9 +205,15 @@ class TTSTask(db.Model):
     """文本转语音任务模型"""
 
     __tablename__ = "tts_tasks"
+    __table_args__ = (
+        # 按用户+状态过滤并按创建时间限定范围（统计、取消、配额检查）
+        db.Index("ix_ttstask_user_status_time", "user_id", "status", "created_at"),
+        db.Index("ix_ttstask_status_time", "status", "created_at"),
+        db.Index("ix_ttstask_model_status_time", "model_id", "status", "created_at"),
+    )
 
-    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    user_id = db.Column(db.String(36), db.ForeignKey("users.id"), nullable=False)
+    id = db.Column(GUID(), primary_key=True, default=generate_uuid)
+    user_id = db.Column(GUID(), db.ForeignKey("users.id"), nullable=False)
 
     # 任务信息
     status = db.Column(
@@ -160,9 +222,8 @@ class TTSTask(db.Model):
 
     # 输入信息
     text = db.Column(db.Text, nullable=False)
-    model_id = db.Column(
-        db.String(36), db.ForeignKey("voice_models.id"), nullable=False
-    )
+    text_length = db.Column(db.Integer)  # 文本长度（写入时计算）
+    model_id = db.Column(GUID(), db.ForeignKey("voice_models.id"), nullable=False)
     emotion = db.Column(
         db.String(20), default="neutral"
     )  # 情感: neutral, happy, sad, angry, etc.
@@ -198,64 +259,73 @@ class TTSTask(db.Model):
     # 关联关系
     model = db.relationship("VoiceModel", backref="tts_tasks")
 
-    def update_status(self, status, error_message=None):
+    def update_status(self, status, error_message=None, commit=True):
         """更新任务状态"""
+        status_changed = status != self.status
         self.status = status
         if error_message:
             self.error_message = error_message
 
         if status == "processing" and not self.started_at:
-            self.started_at = datetime.utcnow()
-        elif status in ["completed", "failed", "cancelled"]:
-            self.completed_at = datetime.utcnow()
+            self.started_at = _utcnow()
+        elif status in _FINISHED_STATUSES:
+            self.completed_at = _utcnow()
 
-        db.session.commit()
+        # 状态变化后使任务统计缓存失效（在事务提交之后执行）
+        if status_changed:
+            _invalidate_stats_on_commit()
 
-    def set_result(self, audio_path, audio_url, duration, file_size=None):
+        if commit:
+            db.session.commit()
+
+    def set_result(self, audio_path, audio_url, duration, file_size, commit=True):
         """设置生成结果"""
         self.audio_path = audio_path
         self.audio_url = audio_url
         self.audio_duration = duration
+        self.audio_size = file_size
 
-        if file_size:
-            self.audio_size = file_size
-        elif audio_path:
-            try:
-                import os
-
-                self.audio_size = os.path.getsize(audio_path)
-            except:
-                pass
-
-        self.update_status("completed")
+        self.update_status("completed", commit=commit)
 
     def get_duration(self):
         """获取任务执行时长"""
         if self.started_at and self.completed_at:
             return (self.completed_at - self.started_at).total_seconds()
         elif self.started_at:
-            return (datetime.utcnow() - self.started_at).total_seconds()
+            return (_utcnow() - self.started_at).total_seconds()
         return 0
 
     def is_active(self):
         """检查任务是否为活跃状态"""
-        return self.status in ["pending", "processing"]
+        return self.status in _ACTIVE_STATUSES
 
     def can_be_cancelled(self):
         """检查任务是否可以被取消"""
-        return self.status in ["pending", "processing"]
+        return self.status in _ACTIVE_STATUSES
 
     def can_be_retried(self):
         """检查任务是否可以重试"""
         return self.status == "failed"
 
-    def increment_download(self):
-        """增加下载次数"""
-        self.download_count += 1
-        db.session.commit()
+    def increment_download(self, commit=True):
+        """增加下载次数（数据库端原子自增）"""
+        TTSTask.query.filter_by(id=self.id).update(
+            {TTSTask.download_count: TTSTask.download_count + 1},
+            synchronize_session=False,
+        )
+        if commit:
+            db.session.commit()
+
+    @validates("text")
+    def _update_text_length(self, key, text):
+        """写入文本时同步文本长度"""
+        self.text_length = len(text) if text else 0
+        return text
 
     def get_text_length(self):
         """获取文本长度"""
+        if self.text_length is not None:
+            return self.text_length
         return len(self.text) if self.text else 0
 
     def get_estimated_audio_duration(self):
@@ -265,47 +335,71 @@ class TTSTask(db.Model):
 
         # 简单估算：中文每字符约0.15秒，英文每字符约0.1秒
         char_count = len(self.text)
-        chinese_chars = len([c for c in self.text if "\u4e00" <= c <= "\u9fff"])
+        chinese_chars = len(_CJK_RE.findall(self.text))
         english_chars = char_count - chinese_chars
 
         estimated_duration = (chinese_chars * 0.15 + english_chars * 0.1) / self.speed
         return round(estimated_duration, 2)
 
-    def to_dict(self, include_full_text=True):
-        """转换为字典"""
-        data = {
+    # 列表摘要所需的列（配合load_only使用，避免加载全文）
+    SUMMARY_COLUMNS = ("id", "status", "model_id", "text_length", "created_at")
+
+    def to_summary_dict(self):
+        """转换为列表摘要字典"""
+        return {
             "id": self.id,
-            "user_id": self.user_id,
-            "text": (
-                self.text
-                if include_full_text
-                else (self.text[:50] + "..." if len(self.text) > 50 else self.text)
-            ),
-            "text_length": self.get_text_length(),
-            "model_id": self.model_id,
-            "emotion": self.emotion,
-            "speed": self.speed,
-            "pitch": self.pitch,
-            "volume": self.volume,
             "status": self.status,
-            "audio_url": self.audio_url,
-            "audio_duration": self.audio_duration,
-            "audio_size": self.audio_size,
-            "quality_score": self.quality_score,
-            "download_count": self.download_count,
-            "error_message": self.error_message,
+            "model_id": self.model_id,
+            # 不回退到len(text)：load_only未加载全文，访问会逐行触发查询
+            # 旧数据的文本长度由backfill-text-length命令回填
+            "text_length": self.text_length,
             "created_at": self.created_at.isoformat(),
-            "started_at": self.started_at.isoformat() if self.started_at else None,
-            "completed_at": (
-                self.completed_at.isoformat() if self.completed_at else None
-            ),
-            "duration_seconds": self.get_duration(),
-            "estimated_audio_duration": self.get_estimated_audio_duration(),
-            "is_active": self.is_active(),
-            "can_be_cancelled": self.can_be_cancelled(),
-            "can_be_retried": self.can_be_retried(),
         }
 
+    # to_dict中直接取值的字段
+    _SIMPLE_FIELDS = (
+        "id",
+        "user_id",
+        "model_id",
+        "emotion",
+        "speed",
+        "pitch",
+        "volume",
+        "status",
+        "audio_url",
+        "audio_duration",
+        "audio_size",
+        "quality_score",
+        "download_count",
+        "error_message",
+    )
+    _simple_getter = attrgetter(*_SIMPLE_FIELDS)
+
+    def to_dict(self, include_full_text=True):
+        """转换为字典"""
+        is_active = self.status in _ACTIVE_STATUSES
+        data = dict(zip(self._SIMPLE_FIELDS, self._simple_getter(self)))
+        data.update(
+            {
+                "text": (
+                    self.text
+                    if include_full_text
+                    else (self.text[:50] + "..." if len(self.text) > 50 else self.text)
+                ),
+                "text_length": self.get_text_length(),
+                "created_at": self.created_at.isoformat(),
+                "started_at": self.started_at.isoformat() if self.started_at else None,
+                "completed_at": (
+                    self.completed_at.isoformat() if self.completed_at else None
+                ),
+                "duration_seconds": self.get_duration(),
+                "estimated_audio_duration": self.get_estimated_audio_duration(),
+                "is_active": is_active,
+                "can_be_cancelled": is_active,
+                "can_be_retried": self.status == "failed",
+            }
+        )
+
         # 添加模型信息（如果已加载）
         if hasattr(self, "model") and self.model:
             data["model_name"] = self.model.name
@@ -321,13 +415,16 @@ class TaskQueue(db.Model):
     """任务队列模型（用于优先级调度）"""
 
     __tablename__ = "task_queue"
+    __table_args__ = (
+        db.Index("ix_taskqueue_schedule", "status", "priority", "created_at"),
+    )
 
-    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = db.Column(GUID(), primary_key=True, default=generate_uuid)
 
     # 任务信息
     task_type = db.Column(db.String(20), nullable=False)  # voice_clone, tts
     task_id = db.Column(db.String(36), nullable=False)
-    user_id = db.Column(db.String(36), db.ForeignKey("users.id"), nullable=False)
+    user_id = db.Column(GUID(), db.ForeignKey("users.id"), nullable=False)
 
     # 调度信息
     priority = db.Column(db.Integer, default=0)  # 优先级，数值越高优先级越高
@@ -337,7 +434,7 @@ class TaskQueue(db.Model):
 
     # 资源需求
     estimated_duration = db.Column(db.Integer)  # 预估执行时间(秒)
-    resource_requirements = db.Column(db.Text)  # JSON格式存储资源需求
+    resource_requirements = db.Column(JSONType)  # JSON格式存储资源需求
 
     # 时间信息
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
@@ -351,22 +448,25 @@ class TaskQueue(db.Model):
 
     def set_resource_requirements(self, requirements):
         """设置资源需求"""
-        self.resource_requirements = json.dumps(requirements)
+        self.resource_requirements = validate_json_object(
+            requirements, "resource_requirements"
+        )
 
     def get_resource_requirements(self):
         """获取资源需求"""
         if self.resource_requirements:
-            return json.loads(self.resource_requirements)
+            return self.resource_requirements
         return {}
 
     def can_retry(self):
         """检查是否可以重试"""
         return self.retry_count < self.max_retries and self.status == "failed"
 
-    def increment_retry(self):
+    def increment_retry(self, commit=True):
         """增加重试次数"""
         self.retry_count += 1
-        db.session.commit()
+        if commit:
+            db.session.commit()
 
     def to_dict(self):
         """转换为字典"""
@@ -401,7 +501,7 @@ class TaskDependency(db.Model):
 
     __tablename__ = "task_dependencies"
 
-    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = db.Column(GUID(), primary_key=True, default=generate_uuid)
 
     # 任务关系
     parent_task_type = db.Column(db.String(20), nullable=False)
@@ -419,11 +519,12 @@ class TaskDependency(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     satisfied_at = db.Column(db.DateTime)
 
-    def mark_satisfied(self):
+    def mark_satisfied(self, commit=True):
         """标记依赖已满足"""
         self.is_satisfied = True
-        self.satisfied_at = datetime.utcnow()
-        db.session.commit()
+        self.satisfied_at = _utcnow()
+        if commit:
+            db.session.commit()
 
     def to_dict(self):
         """转换为字典"""
@@ -0,0 +1,92 @@
+# ./gpt-sovits-backend/app/models/types.py
+import os
+import uuid
+import threading
+import time
+from sqlalchemy.types import TypeDecorator, CHAR, BINARY, JSON
+from sqlalchemy.dialects.postgresql import JSONB
+
+_UUID_BATCH_SIZE = 256
+_uuid_local = threading.local()
+
+
+def _reset_uuid_pool():
+    """子进程中丢弃继承的随机字节池，避免与父进程生成重复主键"""
+    global _uuid_local
+    _uuid_local = threading.local()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_uuid_pool)
+
+
+def _random_bytes(n):
+    """从按线程缓存的随机字节池中取出n字节（一次os.urandom供多次使用）"""
+    buf = getattr(_uuid_local, "buf", None)
+    pos = getattr(_uuid_local, "pos", 0)
+    if buf is None or pos + n > len(buf):
+        buf = _uuid_local.buf = os.urandom(16 * _UUID_BATCH_SIZE)
+        pos = 0
+    _uuid_local.pos = pos + n
+    return buf[pos : pos + n]
+
+
+def uuid7():
+    """生成按时间排序的UUIDv7（RFC 9562）"""
+    unix_ts_ms = time.time_ns() // 1_000_000
+    value = (unix_ts_ms & 0xFFFFFFFFFFFF) << 80
+    value |= int.from_bytes(_random_bytes(10), "big")
+    # 版本位(7)与变体位(10)
+    value = (value & ~(0xF << 76)) | (0x7 << 76)
+    value = (value & ~(0x3 << 62)) | (0x2 << 62)
+    return uuid.UUID(int=value)
+
+
+def generate_uuid():
+    """生成UUID字符串主键（时间有序，插入时B树只在末尾追加）"""
+    return str(uuid7())
+
+
+class GUID(TypeDecorator):
+    """UUID列类型
+
+    PostgreSQL使用原生UUID，MySQL使用BINARY(16)，其他数据库使用CHAR(36)；
+    Python侧始终以字符串形式读写，对上层代码透明。
+    """
+
+    impl = CHAR(36)
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "postgresql":
+            from sqlalchemy.dialects.postgresql import UUID
+
+            return dialect.type_descriptor(UUID(as_uuid=False))
+        if dialect.name == "mysql":
+            return dialect.type_descriptor(BINARY(16))
+        return dialect.type_descriptor(CHAR(36))
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+
+        try:
+            value = value if isinstance(value, uuid.UUID) else uuid.UUID(str(value))
+        except ValueError:
+            # 非法UUID无法匹配任何记录
+            return None
+
+        if dialect.name == "mysql":
+            return value.bytes
+        return str(value)
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        if isinstance(value, bytes):
+            return str(uuid.UUID(bytes=value))
+        return str(value)
+
+
+# JSON列类型：PostgreSQL使用JSONB，其余数据库使用原生JSON
+JSONType = JSON().with_variant(JSONB(), "postgresql")
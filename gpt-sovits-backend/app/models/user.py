@@ -3,18 +3,32 @@ from datetime import datetime, timedelta
 from werkzeug.security import generate_password_hash, check_password_hash
 from flask_jwt_extended import create_access_token, create_refresh_token
 from app.extensions import db
-import uuid
+from app.models.types import GUID, generate_uuid
 import secrets
 
+try:
+    from argon2 import PasswordHasher
+    from argon2.exceptions import VerificationError, InvalidHashError
+
+    _ph = PasswordHasher()
+except ImportError:
+    _ph = None
+
+_utcnow = datetime.utcnow
+
 
 class User(db.Model):
     """用户模型"""
 
     __tablename__ = "users"
+    __table_args__ = (
+        db.Index("ux_users_username", "username", unique=True),
+        db.Index("ux_users_email", "email", unique=True),
+    )
 
-    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    username = db.Column(db.String(50), unique=True, nullable=False, index=True)
-    email = db.Column(db.String(120), unique=True, nullable=False, index=True)
+    id = db.Column(GUID(), primary_key=True, default=generate_uuid)
+    username = db.Column(db.String(50), nullable=False)
+    email = db.Column(db.String(120), nullable=False)
     password_hash = db.Column(db.String(255), nullable=False)
 
     # 用户信息
@@ -43,20 +57,42 @@ class User(db.Model):
 
     def set_password(self, password):
         """设置密码"""
-        self.password_hash = generate_password_hash(password)
+        if _ph is not None:
+            self.password_hash = _ph.hash(password)
+        else:
+            self.password_hash = generate_password_hash(password)
 
     def check_password(self, password):
         """验证密码"""
-        return check_password_hash(self.password_hash, password)
+        if _ph is not None and self.password_hash.startswith("$argon2"):
+            try:
+                _ph.verify(self.password_hash, password)
+            except (VerificationError, InvalidHashError):
+                return False
+            if _ph.check_needs_rehash(self.password_hash):
+                self.password_hash = _ph.hash(password)
+        else:
+            if not check_password_hash(self.password_hash, password):
+                return False
+            # 旧的Werkzeug哈希在验证成功后升级为Argon2id，由调用方提交
+            if _ph is not None:
+                self.password_hash = _ph.hash(password)
+
+        return True
 
     def generate_tokens(self):
-        """生成JWT令牌"""
-        access_token = create_access_token(
-            identity=self.id,
-            additional_claims={"role": self.role, "username": self.username},
-        )
-        refresh_token = create_refresh_token(identity=self.id)
-        return access_token, refresh_token
+        """生成JWT令牌（短时间内重复登录复用同一组令牌）"""
+        from app.utils.jwt_cache import get_or_issue_tokens
+
+        def issue():
+            access_token = create_access_token(
+                identity=self.id,
+                additional_claims={"role": self.role, "username": self.username},
+            )
+            refresh_token = create_refresh_token(identity=self.id)
+            return access_token, refresh_token
+
+        return get_or_issue_tokens((self.id, self.role, self.username), issue)
 
     def is_admin(self):
         """检查是否为管理员"""
@@ -66,10 +102,11 @@ class User(db.Model):
         """检查是否为审核员"""
         return self.role >= 1
 
-    def update_last_login(self):
+    def update_last_login(self, commit=True):
         """更新最后登录时间"""
-        self.last_login_at = datetime.utcnow()
-        db.session.commit()
+        self.last_login_at = _utcnow()
+        if commit:
+            db.session.commit()
 
     def to_dict(self, include_sensitive=False):
         """转换为字典"""
@@ -88,6 +125,46 @@ class User(db.Model):
         }
         return data
 
+    def get_resource_counts(self):
+        """单次查询统计用户的任务、模型与上传数量"""
+        from app.models.task import VoiceCloneTask, TTSTask
+        from app.models.model import VoiceModel
+        from app.models.audit import UserUpload
+
+        def count_of(model, *criteria):
+            return (
+                db.session.query(db.func.count(model.id))
+                .filter(*criteria)
+                .scalar_subquery()
+            )
+
+        row = db.session.query(
+            count_of(VoiceCloneTask, VoiceCloneTask.user_id == self.id),
+            count_of(TTSTask, TTSTask.user_id == self.id),
+            count_of(VoiceModel, VoiceModel.owner_id == self.id),
+            count_of(
+                UserUpload,
+                UserUpload.user_id == self.id,
+                UserUpload.is_deleted == False,
+            ),
+        ).one()
+
+        return {
+            "voice_clone_tasks": row[0],
+            "tts_tasks": row[1],
+            "voice_models": row[2],
+            "uploads": row[3],
+        }
+
+    @classmethod
+    def find_by_identifier(cls, identifier):
+        """按用户名或邮箱查找用户（分别走唯一索引，避免OR导致全表扫描）"""
+        if "@" in identifier:
+            user = cls.query.filter_by(email=identifier).first()
+            if user:
+                return user
+        return cls.query.filter_by(username=identifier).first()
+
     def __repr__(self):
         return f"<User {self.username}>"
 
@@ -96,10 +173,22 @@ class AuthToken(db.Model):
     """认证令牌模型"""
 
     __tablename__ = "auth_tokens"
+    __table_args__ = (
+        db.Index("ux_authtoken_token", "token", unique=True),
+        db.Index(
+            "ix_authtoken_user_type_active",
+            "user_id",
+            "token_type",
+            "is_revoked",
+            "expires_at",
+        ),
+        # 过期令牌清理按过期时间范围扫描
+        db.Index("ix_authtoken_expires", "expires_at"),
+    )
 
-    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    user_id = db.Column(db.String(36), db.ForeignKey("users.id"), nullable=False)
-    token = db.Column(db.String(255), unique=True, nullable=False, index=True)
+    id = db.Column(GUID(), primary_key=True, default=generate_uuid)
+    user_id = db.Column(GUID(), db.ForeignKey("users.id"), nullable=False)
+    token = db.Column(db.String(255), nullable=False)
     token_type = db.Column(
         db.String(20), nullable=False
     )  # access, refresh, reset_password
@@ -111,7 +200,7 @@ class AuthToken(db.Model):
     def create_reset_token(cls, user_id, expires_in_hours=24):
         """创建密码重置令牌"""
         token = secrets.token_urlsafe(32)
-        expires_at = datetime.utcnow() + timedelta(hours=expires_in_hours)
+        expires_at = _utcnow() + timedelta(hours=expires_in_hours)
 
         auth_token = cls(
             user_id=user_id,
@@ -126,13 +215,14 @@ class AuthToken(db.Model):
     @classmethod
     def verify_reset_token(cls, token):
         """验证密码重置令牌"""
-        auth_token = cls.query.filter_by(
-            token=token, token_type="reset_password", is_revoked=False
+        auth_token = cls.query.filter(
+            cls.token == token,
+            cls.token_type == "reset_password",
+            cls.is_revoked == False,
+            cls.expires_at > _utcnow(),
         ).first()
 
-        if auth_token and auth_token.expires_at > datetime.utcnow():
-            return auth_token.user
-        return None
+        return auth_token.user if auth_token else None
 
     def revoke(self):
         """撤销令牌"""
@@ -0,0 +1,105 @@
+# ./gpt-sovits-backend/app/services/activity_service.py
+from datetime import datetime
+from flask import current_app
+from app.extensions import celery, db
+
+# 待写入的最后登录时间（Redis哈希：user_id -> ISO时间），同一用户多次登录只保留最新一次
+_LAST_LOGIN_PENDING_KEY = "last_login:pending"
+_LAST_LOGIN_SCHEDULED_KEY = "last_login:scheduled"
+
+# 批量写入延迟（秒）
+LAST_LOGIN_FLUSH_DELAY = 5
+
+
+def enqueue_last_login(user, login_time=None):
+    """记录最后登录时间（同步模式下只修改会话中的用户，由调用方统一提交）"""
+    from app.extensions import redis_client
+
+    login_time = login_time or datetime.utcnow()
+
+    # 未开启异步模式时随登录请求的事务一起写入
+    if not current_app.config.get("LAST_LOGIN_ASYNC"):
+        user.last_login_at = login_time
+        return login_time
+
+    try:
+        pipe = redis_client.pipeline()
+        pipe.hset(_LAST_LOGIN_PENDING_KEY, user.id, login_time.isoformat())
+        pipe.set(_LAST_LOGIN_SCHEDULED_KEY, 1, nx=True, ex=LAST_LOGIN_FLUSH_DELAY * 4)
+        _, newly_scheduled = pipe.execute()
+
+        # 每个批次只调度一次刷新任务
+        if newly_scheduled:
+            flush_last_logins.apply_async(countdown=LAST_LOGIN_FLUSH_DELAY)
+
+    except Exception as e:
+        # Redis或消息队列不可用时退回到请求事务中写入
+        current_app.logger.warning(f"Failed to enqueue last login update: {e}")
+        user.last_login_at = login_time
+
+    return login_time
+
+
+@celery.task(name="app.services.activity_service.flush_last_logins")
+def flush_last_logins():
+    """批量写入缓冲的最后登录时间（Celery任务）"""
+    from app.extensions import redis_client
+
+    # 原子地取出并清空缓冲区，之后的登录会调度新的批次
+    pipe = redis_client.pipeline()
+    pipe.hgetall(_LAST_LOGIN_PENDING_KEY)
+    pipe.delete(_LAST_LOGIN_PENDING_KEY)
+    pipe.delete(_LAST_LOGIN_SCHEDULED_KEY)
+    pending, _, _ = pipe.execute()
+
+    if not pending:
+        return 0
+
+    login_times = {
+        _to_str(user_id): datetime.fromisoformat(_to_str(value))
+        for user_id, value in pending.items()
+    }
+    return _write_last_logins(login_times)
+
+
+def _write_last_logins(login_times):
+    """在单个事务中批量更新用户最后登录时间"""
+    from app.models.user import User
+
+    try:
+        db.session.bulk_update_mappings(
+            User,
+            [
+                {"id": user_id, "last_login_at": login_time}
+                for user_id, login_time in login_times.items()
+            ],
+        )
+        db.session.commit()
+        return len(login_times)
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f"Failed to write last login times: {e}")
+        return 0
+
+
+@celery.task(name="app.services.activity_service.write_audit_logs")
+def write_audit_logs(entries):
+    """批量写入审计日志（Celery任务）"""
+    from app.models.audit import AuditLog
+
+    for entry in entries:
+        entry["created_at"] = datetime.fromisoformat(entry["created_at"])
+
+    try:
+        db.session.bulk_insert_mappings(AuditLog, entries)
+        db.session.commit()
+        return len(entries)
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f"Failed to write audit logs: {e}")
+        raise
+
+
+def _to_str(value):
+    """Redis返回值转为字符串"""
+    return value.decode() if isinstance(value, bytes) else value
@@ -1,15 +1,33 @@
 # ./gpt-sovits-backend/app/services/file_service.py
 import os
+import shutil
 import hashlib
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 import magic
 from datetime import datetime
 from flask import current_app
+from sqlalchemy import select, union_all
 from app.extensions import db
 from app.models.audit import UserUpload
 from app.utils.exceptions import ValidationError, FileUploadError
-from app.utils.helpers import generate_unique_filename, generate_file_hash
+from app.utils.helpers import (
+    generate_unique_filename,
+    new_content_hasher,
+    HASH_CHUNK_SIZE,
+)
 from app.utils.audio_utils import validate_audio_content, get_audio_info
 
+# MIME类型嗅探所需的文件头长度
+MIME_SNIFF_SIZE = 2048
+
+# 上传内容在内存中缓冲的上限，超出后转存临时文件
+UPLOAD_SPOOL_SIZE = 8 << 20
+
+# 批量删除物理文件的线程数
+FILE_REMOVE_WORKERS = 8
+
 
 def process_file_upload(file, user_id, file_type="general", metadata=None):
     """处理文件上传"""
@@ -17,46 +35,45 @@ def process_file_upload(file, user_id, file_type="general", metadata=None):
         if not file or not file.filename:
             raise ValidationError("No file provided")
 
-        # 验证文件大小
-        file.seek(0, os.SEEK_END)
-        file_size = file.tell()
-        file.seek(0)
-
         max_size = current_app.config.get("MAX_CONTENT_LENGTH", 10 * 1024 * 1024)
-        if file_size > max_size:
-            raise ValidationError(
-                f"File size exceeds {max_size // (1024*1024)}MB limit"
-            )
 
         # 生成唯一文件名
         original_filename = file.filename
         safe_filename = generate_unique_filename(original_filename, f"user_{user_id}")
 
-        # 确定保存目录
-        upload_dir = get_upload_directory(file_type)
-        os.makedirs(upload_dir, exist_ok=True)
+        # 先写入临时文件（小文件留在内存），同时计算大小与哈希
+        # 去重只需快速内容哈希；模型文件额外保留SHA256用于完整性校验
+        with tempfile.SpooledTemporaryFile(max_size=UPLOAD_SPOOL_SIZE) as spool:
+            file_size, content_id, file_hash, head = _copy_stream(
+                file.stream, spool, max_size, with_sha256=(file_type == "model")
+            )
 
-        # 保存文件
-        file_path = os.path.join(upload_dir, safe_filename)
-        file.save(file_path)
+            # 检查重复文件，命中时无需落盘
+            existing_upload = (
+                db.session.query(UserUpload.id)
+                .filter_by(
+                    user_id=user_id, file_content_id=content_id, is_deleted=False
+                )
+                .first()
+            )
 
-        # 验证文件内容
-        mime_type = get_file_mime_type(file_path)
-        file_hash = generate_file_hash(file_path)
+            if existing_upload:
+                return {
+                    "upload_id": existing_upload.id,
+                    "is_duplicate": True,
+                    "message": "File already exists",
+                }
 
-        # 检查重复文件
-        existing_upload = UserUpload.query.filter_by(
-            user_id=user_id, file_hash=file_hash, is_deleted=False
-        ).first()
+            # 确定保存目录并保存文件
+            upload_dir = get_upload_directory(file_type)
+            os.makedirs(upload_dir, exist_ok=True)
+            file_path = os.path.join(upload_dir, safe_filename)
+            spool.seek(0)
+            with open(file_path, "wb") as out:
+                shutil.copyfileobj(spool, out, HASH_CHUNK_SIZE)
 
-        if existing_upload:
-            # 删除新上传的文件
-            os.remove(file_path)
-            return {
-                "upload_id": existing_upload.id,
-                "is_duplicate": True,
-                "message": "File already exists",
-            }
+        # 验证文件内容（使用首块数据嗅探类型，无需重新读取文件）
+        mime_type = get_buffer_mime_type(head, file_path)
 
         # 处理特定文件类型
         file_metadata = metadata or {}
@@ -83,6 +100,7 @@ def process_file_upload(file, user_id, file_type="general", metadata=None):
             file_type=file_type,
             mime_type=mime_type,
             file_hash=file_hash,
+            file_content_id=content_id,
         )
 
         upload_record.set_metadata(file_metadata)
@@ -127,28 +145,85 @@ def get_upload_directory(file_type):
     return os.path.join(base_dir, subdir)
 
 
+def _copy_stream(stream, out, max_size, with_sha256=False):
+    """流式复制上传内容，返回(文件大小, 内容ID, SHA256或None, 首块数据)"""
+    content_hasher = new_content_hasher()
+    hash_sha256 = hashlib.sha256() if with_sha256 else None
+    file_size = 0
+    head = b""
+
+    for chunk in iter(lambda: stream.read(HASH_CHUNK_SIZE), b""):
+        if not head:
+            head = chunk[:MIME_SNIFF_SIZE]
+        file_size += len(chunk)
+        if file_size > max_size:
+            raise ValidationError(
+                f"File size exceeds {max_size // (1024*1024)}MB limit"
+            )
+        content_hasher.update(chunk)
+        if hash_sha256 is not None:
+            hash_sha256.update(chunk)
+        out.write(chunk)
+
+    file_hash = hash_sha256.hexdigest() if hash_sha256 is not None else None
+    return file_size, content_hasher.hexdigest(), file_hash, head
+
+
+# 基于扩展名的MIME类型回退表
+_MIME_MAP = {
+    ".wav": "audio/wav",
+    ".mp3": "audio/mpeg",
+    ".flac": "audio/flac",
+    ".m4a": "audio/mp4",
+    ".pth": "application/octet-stream",
+    ".json": "application/json",
+    ".txt": "text/plain",
+    ".pdf": "application/pdf",
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".png": "image/png",
+}
+
+
+def _guess_mime_by_extension(file_path):
+    """根据扩展名推断MIME类型"""
+    ext = os.path.splitext(file_path)[1].lower()
+    return _MIME_MAP.get(ext, "application/octet-stream")
+
+
+_magic_instance = None
+
+
+def _get_magic():
+    """获取复用的libmagic实例（避免每次重新加载数据库）"""
+    global _magic_instance
+    if _magic_instance is None:
+        _magic_instance = magic.Magic(mime=True)
+    return _magic_instance
+
+
+@lru_cache(maxsize=4096)
+def _detect_file_mime_type(file_path, mtime_ns, size):
+    """按(路径, 修改时间, 大小)缓存的MIME类型检测"""
+    return _get_magic().from_file(file_path)
+
+
 def get_file_mime_type(file_path):
     """获取文件MIME类型"""
     try:
-        mime = magic.Magic(mime=True)
-        return mime.from_file(file_path)
+        stat = os.stat(file_path)
+        return _detect_file_mime_type(file_path, stat.st_mtime_ns, stat.st_size)
     except Exception:
         # 回退到基于扩展名的检测
-        ext = os.path.splitext(file_path)[1].lower()
-        mime_map = {
-            ".wav": "audio/wav",
-            ".mp3": "audio/mpeg",
-            ".flac": "audio/flac",
-            ".m4a": "audio/mp4",
-            ".pth": "application/octet-stream",
-            ".json": "application/json",
-            ".txt": "text/plain",
-            ".pdf": "application/pdf",
-            ".jpg": "image/jpeg",
-            ".jpeg": "image/jpeg",
-            ".png": "image/png",
-        }
-        return mime_map.get(ext, "application/octet-stream")
+        return _guess_mime_by_extension(file_path)
+
+
+def get_buffer_mime_type(buffer, file_path):
+    """根据文件头部数据获取MIME类型"""
+    try:
+        return _get_magic().from_buffer(buffer)
+    except Exception:
+        return _guess_mime_by_extension(file_path)
 
 
 def validate_file_type(file_path, expected_type):
@@ -208,69 +283,86 @@ def delete_file(upload_id, user_id, force_delete=False):
 
 def is_file_in_use(upload):
     """检查文件是否正在使用"""
+    return upload.file_path in get_files_in_use([upload], upload.user_id)
+
+
+def get_files_in_use(uploads, user_id):
+    """批量获取正在使用的文件路径集合"""
+    in_use_paths = set()
     try:
-        if upload.file_type == "audio":
+        audio_paths = {u.file_path for u in uploads if u.file_type == "audio"}
+        model_paths = {u.file_path for u in uploads if u.file_type == "model"}
+
+        if audio_paths:
             # 检查是否在进行中的语音克隆任务中
             from app.models.task import VoiceCloneTask
 
-            active_tasks = VoiceCloneTask.query.filter(
-                VoiceCloneTask.user_id == upload.user_id,
+            active_samples = db.session.query(VoiceCloneTask.audio_samples).filter(
+                VoiceCloneTask.user_id == user_id,
                 VoiceCloneTask.status.in_(["pending", "processing"]),
-            ).all()
-
-            for task in active_tasks:
-                sample_paths = task.get_audio_samples()
-                if upload.file_path in sample_paths:
-                    return True
+            )
+            for (samples,) in active_samples:
+                in_use_paths.update(audio_paths.intersection(samples or ()))
 
-        elif upload.file_type == "model":
-            # 检查是否有关联的语音模型
+        if model_paths:
+            # 检查是否有关联的活跃语音模型
             from app.models.model import VoiceModel
 
-            model = VoiceModel.query.filter(
-                (VoiceModel.model_path == upload.file_path)
-                | (VoiceModel.config_path == upload.file_path)
-                | (VoiceModel.index_path == upload.file_path)
-            ).first()
-
-            if model and model.status == "active":
-                return True
+            # 三列分别等值查找再UNION ALL，每个分支都能走单列索引
+            path_columns = (
+                VoiceModel.model_path,
+                VoiceModel.config_path,
+                VoiceModel.index_path,
+            )
+            rows = db.session.execute(
+                union_all(
+                    *(
+                        select(column).where(
+                            column.in_(model_paths), VoiceModel.status == "active"
+                        )
+                        for column in path_columns
+                    )
+                )
+            )
+            in_use_paths.update(path for (path,) in rows)
 
-        return False
+        return in_use_paths
 
     except Exception:
-        return False  # 如果检查失败，假设没有在使用
+        return set()  # 如果检查失败，假设没有在使用
 
 
 def get_file_statistics(user_id=None):
     """获取文件统计信息"""
     try:
-        query = UserUpload.query.filter_by(is_deleted=False)
+        # 单次GROUP BY查询按类型聚合数量与大小
+        query = db.session.query(
+            UserUpload.file_type,
+            db.func.count(UserUpload.id),
+            db.func.coalesce(db.func.sum(UserUpload.file_size), 0),
+        ).filter(UserUpload.is_deleted == False)
 
         if user_id:
-            query = query.filter_by(user_id=user_id)
+            query = query.filter(UserUpload.user_id == user_id)
 
-        # 总体统计
-        total_files = query.count()
-        total_size = (
-            query.with_entities(db.func.sum(UserUpload.file_size)).scalar() or 0
-        )
+        rows = {
+            file_type: (count, int(size))
+            for file_type, count, size in query.group_by(UserUpload.file_type)
+        }
+
+        # 总体统计（包含未列出的类型）
+        total_files = sum(count for count, _ in rows.values())
+        total_size = sum(size for _, size in rows.values())
 
         # 按类型统计
         type_stats = {}
         file_types = ["audio", "model", "image", "document", "general"]
 
         for file_type in file_types:
-            type_query = query.filter_by(file_type=file_type)
-            count = type_query.count()
-            size = (
-                type_query.with_entities(db.func.sum(UserUpload.file_size)).scalar()
-                or 0
-            )
-
+            count, size = rows.get(file_type, (0, 0))
             type_stats[file_type] = {
                 "count": count,
-                "size_bytes": int(size),
+                "size_bytes": size,
                 "size_mb": round(size / (1024 * 1024), 2),
             }
 
@@ -285,35 +377,51 @@ def get_file_statistics(user_id=None):
         raise e
 
 
+def _iter_files(directory):
+    """递归遍历目录下的普通文件（跳过隐藏文件）"""
+    try:
+        entries = list(os.scandir(directory))
+    except OSError:
+        return
+
+    for entry in entries:
+        if entry.name.startswith("."):
+            continue
+        if entry.is_dir(follow_symlinks=False):
+            yield from _iter_files(entry.path)
+        elif entry.is_file(follow_symlinks=False):
+            yield entry.path
+
+
 def cleanup_orphaned_files():
     """清理孤立文件"""
     try:
         cleaned_count = 0
 
-        # 查找数据库中的文件记录
-        uploads = UserUpload.query.all()
-        db_file_paths = {upload.file_path for upload in uploads}
+        # 查找数据库中的文件记录（仅流式读取路径列）
+        db_file_paths = {
+            path for (path,) in db.session.query(UserUpload.file_path).yield_per(10000)
+        }
 
-        # 扫描上传目录
+        # 扫描上传目录，找出不在数据库中的文件
         base_dir = current_app.config["UPLOAD_FOLDER"]
-
-        for root, dirs, files in os.walk(base_dir):
-            for file in files:
-                file_path = os.path.join(root, file)
-
-                # 跳过系统文件
-                if file.startswith("."):
-                    continue
-
-                # 如果文件不在数据库中，删除它
-                if file_path not in db_file_paths:
-                    try:
-                        os.remove(file_path)
-                        cleaned_count += 1
-                    except Exception as e:
-                        current_app.logger.warning(
-                            f"Failed to delete orphaned file {file_path}: {e}"
-                        )
+        orphaned_paths = [
+            file_path
+            for file_path in _iter_files(base_dir)
+            if file_path not in db_file_paths
+        ]
+
+        # 并行删除孤立文件
+        with ThreadPoolExecutor(max_workers=FILE_REMOVE_WORKERS) as executor:
+            for file_path, error in zip(
+                orphaned_paths, executor.map(_safe_remove, orphaned_paths)
+            ):
+                if error:
+                    current_app.logger.warning(
+                        f"Failed to delete orphaned file {file_path}: {error}"
+                    )
+                else:
+                    cleaned_count += 1
 
         # 清理空目录
         for root, dirs, files in os.walk(base_dir, topdown=False):
@@ -332,6 +440,16 @@ def cleanup_orphaned_files():
         raise e
 
 
+def _safe_remove(file_path):
+    """删除文件，返回错误信息（成功时为None）"""
+    try:
+        if os.path.exists(file_path):
+            os.remove(file_path)
+        return None
+    except Exception as e:
+        return str(e)
+
+
 def batch_delete_files(upload_ids, user_id):
     """批量删除文件"""
     try:
@@ -344,25 +462,38 @@ def batch_delete_files(upload_ids, user_id):
         deleted_count = 0
         errors = []
 
-        for upload in uploads:
-            try:
-                # 检查是否正在使用
-                if is_file_in_use(upload):
-                    errors.append(f"File {upload.original_filename} is in use")
-                    continue
-
-                # 删除文件
-                upload.mark_deleted()
-
-                if os.path.exists(upload.file_path):
-                    os.remove(upload.file_path)
+        # 一次性查询所有正在使用的文件
+        in_use_paths = get_files_in_use(uploads, user_id)
 
-                deleted_count += 1
-
-            except Exception as e:
-                errors.append(f"Failed to delete {upload.original_filename}: {str(e)}")
-
-        db.session.commit()
+        deletable = []
+        for upload in uploads:
+            if upload.file_path in in_use_paths:
+                errors.append(f"File {upload.original_filename} is in use")
+            else:
+                deletable.append(upload)
+
+        if deletable:
+            # 提交后实例会过期，先取出需要的字段
+            deletable_ids = [upload.id for upload in deletable]
+            targets = [
+                (upload.file_path, upload.original_filename) for upload in deletable
+            ]
+
+            # 单条UPDATE批量标记删除
+            UserUpload.query.filter(UserUpload.id.in_(deletable_ids)).update(
+                {UserUpload.is_deleted: True, UserUpload.updated_at: datetime.utcnow()},
+                synchronize_session=False,
+            )
+            db.session.commit()
+
+            # 并行删除物理文件
+            with ThreadPoolExecutor(max_workers=FILE_REMOVE_WORKERS) as executor:
+                results = executor.map(_safe_remove, [path for path, _ in targets])
+                for (_, filename), error in zip(targets, results):
+                    if error:
+                        errors.append(f"Failed to delete {filename}: {error}")
+                    else:
+                        deleted_count += 1
 
         return {"deleted_count": deleted_count, "errors": errors}
 
@@ -1,11 +1,26 @@
 # ./gpt-sovits-backend/app/services/model_service.py
 import os
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 from flask import current_app
 from app.extensions import db
-from app.models.model import VoiceModel, Tag
+from app.models.model import VoiceModel, Tag, model_tags
+from app.utils.cache import (
+    bump_cache_version,
+    get_cache_version,
+    redis_cache_get,
+    redis_cache_set,
+)
 from app.utils.exceptions import ValidationError, ResourceNotFoundError
-from app.utils.helpers import log_user_action
+from app.utils.helpers import log_user_action, fast_copy
+from app.utils.json_utils import json_dumps_bytes, json_loads
+
+# 热门模型缓存
+POPULAR_MODELS_CACHE_TTL = 60
+_POPULAR_MODELS_VERSION_KEY = "popular_models:version"
+
+# 清理模型目录的线程数
+MODEL_CLEANUP_WORKERS = 4
 
 
 def create_official_model(model_data, file_paths, creator_id):
@@ -37,7 +52,7 @@ def create_official_model(model_data, file_paths, creator_id):
             if src_path and os.path.exists(src_path):
                 filename = os.path.basename(src_path)
                 dst_path = os.path.join(model_dir, filename)
-                shutil.copy2(src_path, dst_path)
+                fast_copy(src_path, dst_path)
                 stored_paths[file_type] = dst_path
 
         # 创建模型记录
@@ -72,6 +87,7 @@ def create_official_model(model_data, file_paths, creator_id):
 
         db.session.add(model)
         db.session.commit()
+        invalidate_popular_models_cache()
 
         # 记录日志
         log_user_action(
@@ -104,6 +120,7 @@ def update_model_quality_score(model_id, quality_score, reviewer_id):
         old_score = model.quality_score
         model.quality_score = quality_score
         db.session.commit()
+        invalidate_popular_models_cache()
 
         # 记录日志
         log_user_action(
@@ -136,6 +153,7 @@ def toggle_model_featured(model_id, is_featured, admin_id):
         old_featured = model.is_featured
         model.is_featured = is_featured
         db.session.commit()
+        invalidate_popular_models_cache()
 
         action = "featured" if is_featured else "unfeatured"
 
@@ -168,17 +186,19 @@ def get_model_usage_statistics(model_id):
         total_usage = model.usage_count
         total_downloads = model.download_count
 
-        # 最近30天使用次数
+        # 单次聚合查询：最近30天使用次数、总任务数、成功任务数
         thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-        recent_usage = TTSTask.query.filter(
-            TTSTask.model_id == model.id, TTSTask.created_at >= thirty_days_ago
-        ).count()
+        recent_usage, total_tasks, successful_tasks = (
+            db.session.query(
+                db.func.count(db.case((TTSTask.created_at >= thirty_days_ago, 1))),
+                db.func.count(TTSTask.id),
+                db.func.count(db.case((TTSTask.status == "completed", 1))),
+            )
+            .filter(TTSTask.model_id == model.id)
+            .one()
+        )
 
         # 成功率
-        total_tasks = TTSTask.query.filter_by(model_id=model.id).count()
-        successful_tasks = TTSTask.query.filter_by(
-            model_id=model.id, status="completed"
-        ).count()
 
         success_rate = (successful_tasks / total_tasks * 100) if total_tasks > 0 else 0
 
@@ -199,49 +219,94 @@ def get_model_usage_statistics(model_id):
         raise e
 
 
+def _remove_model_file(file_path):
+    """删除模型文件，返回错误信息（成功或文件不存在时为None）"""
+    try:
+        os.remove(file_path)
+        return None
+    except FileNotFoundError:
+        return None
+    except OSError as e:
+        return str(e)
+
+
+def _referenced_model_paths(paths):
+    """返回仍被任一语音模型引用的文件路径集合"""
+    from sqlalchemy import select, union_all
+
+    # 三列分别等值查找再UNION ALL，每个分支都能走单列索引
+    path_columns = (
+        VoiceModel.model_path,
+        VoiceModel.config_path,
+        VoiceModel.index_path,
+    )
+    rows = db.session.execute(
+        union_all(*(select(column).where(column.in_(paths)) for column in path_columns))
+    )
+    return {path for (path,) in rows}
+
+
 def cleanup_inactive_models(days_threshold=90):
     """清理长期未使用的非活跃模型"""
     try:
         from datetime import datetime, timedelta
+        from app.models.task import TTSTask, VoiceCloneTask
 
         cutoff_date = datetime.utcnow() - timedelta(days=days_threshold)
 
-        # 查找需要清理的模型
-        inactive_models = VoiceModel.query.filter(
-            VoiceModel.status == "inactive",
-            VoiceModel.updated_at < cutoff_date,
-            VoiceModel.model_type == "user_trained",  # 只清理用户训练的模型
-        ).all()
-
-        cleaned_count = 0
-
-        for model in inactive_models:
-            try:
-                # 删除物理文件
-                files_to_delete = [
-                    model.model_path,
-                    model.config_path,
-                    model.index_path,
-                ]
-                for file_path in files_to_delete:
-                    if file_path and os.path.exists(file_path):
-                        os.remove(file_path)
-
-                # 删除模型目录
-                if model.model_path:
-                    model_dir = os.path.dirname(model.model_path)
-                    if os.path.exists(model_dir) and not os.listdir(model_dir):
-                        os.rmdir(model_dir)
-
-                # 删除数据库记录
-                db.session.delete(model)
-                cleaned_count += 1
-
-            except Exception as e:
-                current_app.logger.warning(f"Failed to cleanup model {model.id}: {e}")
-                continue
+        # 查找需要清理的模型（仍被TTS任务引用的模型无法删除，直接跳过）
+        inactive_models = (
+            db.session.query(
+                VoiceModel.id,
+                VoiceModel.model_path,
+                VoiceModel.config_path,
+                VoiceModel.index_path,
+            )
+            .filter(
+                VoiceModel.status == "inactive",
+                VoiceModel.updated_at < cutoff_date,
+                VoiceModel.model_type == "user_trained",  # 只清理用户训练的模型
+                ~db.exists().where(TTSTask.model_id == VoiceModel.id),
+            )
+            .all()
+        )
 
-        db.session.commit()
+        model_ids = [row[0] for row in inactive_models]
+        cleaned_count = len(model_ids)
+
+        if model_ids:
+            # 批量删除数据库记录及关联
+            db.session.execute(
+                model_tags.delete().where(model_tags.c.model_id.in_(model_ids))
+            )
+            VoiceCloneTask.query.filter(
+                VoiceCloneTask.result_model_id.in_(model_ids)
+            ).update({VoiceCloneTask.result_model_id: None}, synchronize_session=False)
+            VoiceModel.query.filter(VoiceModel.id.in_(model_ids)).delete(
+                synchronize_session=False
+            )
+            db.session.commit()
+
+            # 同名模型共用存储目录，只删除各模型自己的文件，且跳过仍被其他模型引用的文件
+            file_paths = {path for row in inactive_models for path in row[1:] if path}
+            if file_paths:
+                file_paths -= _referenced_model_paths(file_paths)
+
+            file_paths = sorted(file_paths)
+            with ThreadPoolExecutor(max_workers=MODEL_CLEANUP_WORKERS) as executor:
+                errors = executor.map(_remove_model_file, file_paths)
+                for file_path, error in zip(file_paths, errors):
+                    if error:
+                        current_app.logger.warning(
+                            f"Failed to delete model file {file_path}: {error}"
+                        )
+
+            # 目录已空时一并删除
+            for model_dir in {os.path.dirname(path) for path in file_paths}:
+                try:
+                    os.rmdir(model_dir)
+                except OSError:
+                    pass
 
         return {"cleaned_models": cleaned_count, "cutoff_date": cutoff_date.isoformat()}
 
@@ -251,10 +316,13 @@ def cleanup_inactive_models(days_threshold=90):
 
 
 def get_popular_models(limit=10, time_period_days=30):
-    """获取热门模型"""
-    try:
-        from datetime import datetime, timedelta
+    """获取热门模型（Redis短时缓存）"""
+    cache_key = _popular_models_cache_key(limit, time_period_days)
+    cached = redis_cache_get(cache_key)
+    if cached is not None:
+        return json_loads(cached)
 
+    try:
         # 查询公开且活跃的模型
         query = VoiceModel.query.filter(
             VoiceModel.is_public == True, VoiceModel.status == "active"
@@ -269,17 +337,33 @@ def get_popular_models(limit=10, time_period_days=30):
             .all()
         )
 
-        return [model.to_dict() for model in models]
+        result = [model.to_dict() for model in models]
 
     except Exception as e:
         raise e
 
+    redis_cache_set(cache_key, json_dumps_bytes(result), POPULAR_MODELS_CACHE_TTL)
+    return result
 
-def search_models(query_text, filters=None, page=1, per_page=20):
-    """搜索模型"""
-    try:
-        from sqlalchemy import or_
 
+def _popular_models_cache_key(limit, time_period_days):
+    """生成热门模型缓存键（带版本号，失效时只需递增版本）"""
+    version = get_cache_version(_POPULAR_MODELS_VERSION_KEY)
+    if version is None:
+        return None
+    return f"popular_models:{version}:{limit}:{time_period_days}"
+
+
+def invalidate_popular_models_cache():
+    """使热门模型缓存失效"""
+    bump_cache_version(_POPULAR_MODELS_VERSION_KEY)
+
+
+def search_models(
+    query_text, filters=None, per_page=20, after=None, include_total=False
+):
+    """搜索模型（游标分页，after为上一页返回的next_cursor）"""
+    try:
         # 构建基础查询
         query = VoiceModel.query.filter(
             VoiceModel.is_public == True, VoiceModel.status == "active"
@@ -287,12 +371,7 @@ def search_models(query_text, filters=None, page=1, per_page=20):
 
         # 文本搜索
         if query_text:
-            search_filter = or_(
-                VoiceModel.name.contains(query_text),
-                VoiceModel.description.contains(query_text),
-                VoiceModel.voice_characteristics.contains(query_text),
-            )
-            query = query.filter(search_filter)
+            query = query.filter(VoiceModel.text_search_filter(query_text))
 
         # 应用过滤器
         if filters:
@@ -313,26 +392,31 @@ def search_models(query_text, filters=None, page=1, per_page=20):
         # 排序
         sort_by = filters.get("sort_by", "usage") if filters else "usage"
         if sort_by == "quality":
-            query = query.order_by(VoiceModel.quality_score.desc())
+            sort_column = VoiceModel.quality_score
         elif sort_by == "newest":
-            query = query.order_by(VoiceModel.created_at.desc())
+            sort_column = VoiceModel.created_at
         else:  # usage
-            query = query.order_by(VoiceModel.usage_count.desc())
+            sort_column = VoiceModel.usage_count
 
         # 分页
-        from app.utils.helpers import paginate_query
-
-        pagination = paginate_query(query, page, per_page)
+        from app.utils.helpers import keyset_paginate
+
+        pagination = keyset_paginate(
+            query,
+            sort_column,
+            VoiceModel.id,
+            per_page,
+            after=after,
+            include_total=include_total,
+        )
 
         return {
             "models": [model.to_dict() for model in pagination["items"]],
             "pagination": {
-                "page": pagination["page"],
                 "per_page": pagination["per_page"],
-                "total": pagination["total"],
-                "pages": pagination["pages"],
-                "has_prev": pagination["has_prev"],
                 "has_next": pagination["has_next"],
+                "next_cursor": pagination["next_cursor"],
+                "total": pagination["total"],
             },
         }
 
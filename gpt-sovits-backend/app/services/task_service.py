@@ -1,13 +1,46 @@
 # ./gpt-sovits-backend/app/services/task_service.py
 import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from flask import current_app
+from sqlalchemy import literal, select, union_all
 from app.extensions import db, celery
 from app.models.task import VoiceCloneTask, TTSTask
 from app.models.user import User
 from app.models.model import VoiceModel
+from app.models.types import generate_uuid
+from app.utils.cache import (
+    TTLCache,
+    bump_cache_version,
+    get_cache_version,
+    redis_cache_get,
+    redis_cache_set,
+)
 from app.utils.exceptions import TaskProcessingError, ResourceNotFoundError
 from app.utils.helpers import log_user_action
+from app.utils.json_utils import json_dumps_bytes, json_loads
+
+# 统计中分别计数的任务状态
+_STAT_STATUSES = ("completed", "failed", "processing", "pending")
+# 进行中任务状态
+_ACTIVE_STATUSES = ("pending", "processing")
+# 任务类型与模型
+_TASK_MODELS = (("voice_clone", VoiceCloneTask), ("tts", TTSTask))
+
+# 任务统计/系统负载缓存（仪表盘高频轮询）
+TASK_STATS_CACHE_TTL = 15
+_TASK_STATS_VERSION_KEY = "task_stats:version"
+
+# 批量DELETE/UPDATE时每条语句的ID数量上限
+_BULK_CHUNK_SIZE = 1000
+
+# 清理任务文件的线程数
+TASK_CLEANUP_WORKERS = 8
+
+# Celery Worker状态查询的回复超时（秒）与缓存
+CELERY_INSPECT_TIMEOUT = 0.5
+_celery_inspect_cache = TTLCache(maxsize=1, ttl=5)
 
 
 class TaskService:
@@ -15,129 +48,104 @@ class TaskService:
 
     @staticmethod
     def get_task_statistics(user_id=None, time_period_days=30):
-        """获取任务统计信息"""
-        try:
-            from datetime import datetime, timedelta
+        """获取任务统计信息（Redis短时缓存）"""
+        cache_key = _task_stats_cache_key("stats", user_id, time_period_days)
+        cached = redis_cache_get(cache_key)
+        if cached is not None:
+            return json_loads(cached)
 
+        try:
             # 设置时间范围
             if time_period_days:
                 start_date = datetime.utcnow() - timedelta(days=time_period_days)
             else:
                 start_date = None
 
-            # 构建查询条件
-            vc_query = VoiceCloneTask.query
-            tts_query = TTSTask.query
-
-            if user_id:
-                vc_query = vc_query.filter_by(user_id=user_id)
-                tts_query = tts_query.filter_by(user_id=user_id)
-
-            if start_date:
-                vc_query = vc_query.filter(VoiceCloneTask.created_at >= start_date)
-                tts_query = tts_query.filter(TTSTask.created_at >= start_date)
-
-            # 统计语音克隆任务
-            vc_total = vc_query.count()
-            vc_completed = vc_query.filter_by(status="completed").count()
-            vc_failed = vc_query.filter_by(status="failed").count()
-            vc_processing = vc_query.filter_by(status="processing").count()
-            vc_pending = vc_query.filter_by(status="pending").count()
-
-            # 统计TTS任务
-            tts_total = tts_query.count()
-            tts_completed = tts_query.filter_by(status="completed").count()
-            tts_failed = tts_query.filter_by(status="failed").count()
-            tts_processing = tts_query.filter_by(status="processing").count()
-            tts_pending = tts_query.filter_by(status="pending").count()
+            # 每种任务类型一次查询汇总状态计数与平均处理时间
+            vc_stats = TaskService._aggregate_task_stats(
+                VoiceCloneTask, user_id, start_date
+            )
+            tts_stats = TaskService._aggregate_task_stats(TTSTask, user_id, start_date)
 
             # 计算成功率
-            vc_success_rate = (vc_completed / vc_total * 100) if vc_total > 0 else 0
-            tts_success_rate = (tts_completed / tts_total * 100) if tts_total > 0 else 0
-
-            # 计算平均处理时间
-            vc_avg_time = TaskService._calculate_average_processing_time(
-                vc_query.filter_by(status="completed")
-            )
-            tts_avg_time = TaskService._calculate_average_processing_time(
-                tts_query.filter_by(status="completed")
-            )
+            for stats in (vc_stats, tts_stats):
+                success_rate = (
+                    stats["completed"] / stats["total"] * 100 if stats["total"] else 0
+                )
+                stats["success_rate"] = round(success_rate, 2)
+                stats["avg_processing_time_seconds"] = stats.pop("avg_seconds")
 
-            return {
-                "voice_clone": {
-                    "total": vc_total,
-                    "completed": vc_completed,
-                    "failed": vc_failed,
-                    "processing": vc_processing,
-                    "pending": vc_pending,
-                    "success_rate": round(vc_success_rate, 2),
-                    "avg_processing_time_seconds": vc_avg_time,
-                },
-                "tts": {
-                    "total": tts_total,
-                    "completed": tts_completed,
-                    "failed": tts_failed,
-                    "processing": tts_processing,
-                    "pending": tts_pending,
-                    "success_rate": round(tts_success_rate, 2),
-                    "avg_processing_time_seconds": tts_avg_time,
-                },
+            result = {
+                "voice_clone": vc_stats,
+                "tts": tts_stats,
                 "period_days": time_period_days,
-                "total_tasks": vc_total + tts_total,
+                "total_tasks": vc_stats["total"] + tts_stats["total"],
             }
 
         except Exception as e:
             current_app.logger.error(f"Get task statistics error: {e}")
             raise TaskProcessingError(f"Failed to get task statistics: {str(e)}")
 
+        redis_cache_set(cache_key, json_dumps_bytes(result), TASK_STATS_CACHE_TTL)
+        return result
+
     @staticmethod
-    def _calculate_average_processing_time(query):
-        """计算平均处理时间"""
-        try:
-            tasks = (
-                query.filter(
-                    VoiceCloneTask.started_at.isnot(None),
-                    VoiceCloneTask.completed_at.isnot(None),
-                ).all()
-                if hasattr(query.column_descriptions[0]["type"], "started_at")
-                else query.filter(
-                    TTSTask.started_at.isnot(None), TTSTask.completed_at.isnot(None)
-                ).all()
-            )
+    def _processing_seconds(model):
+        """构建按数据库方言计算处理耗时（秒）的表达式"""
+        dialect = db.session.get_bind().dialect.name
 
-            if not tasks:
-                return 0
+        if dialect == "mysql":
+            return db.func.timestampdiff(
+                db.text("SECOND"), model.started_at, model.completed_at
+            )
 
-            total_time = 0
-            for task in tasks:
-                if task.started_at and task.completed_at:
-                    processing_time = (
-                        task.completed_at - task.started_at
-                    ).total_seconds()
-                    total_time += processing_time
+        if dialect == "postgresql":
+            return db.func.extract("epoch", model.completed_at - model.started_at)
 
-            return round(total_time / len(tasks), 2) if tasks else 0
+        # SQLite等：儒略日差值换算为秒
+        return (
+            db.func.julianday(model.completed_at) - db.func.julianday(model.started_at)
+        ) * 86400
 
-        except Exception:
-            return 0
+    @staticmethod
+    def _aggregate_task_stats(model, user_id=None, start_date=None):
+        """单次查询汇总任务状态计数与平均处理时间"""
+        finished = db.and_(
+            model.status == "completed",
+            model.started_at.isnot(None),
+            model.completed_at.isnot(None),
+        )
+        query = db.session.query(
+            db.func.count(model.id),
+            *(
+                db.func.count(db.case((model.status == status, 1)))
+                for status in _STAT_STATUSES
+            ),
+            db.func.avg(db.case((finished, TaskService._processing_seconds(model)))),
+        )
+
+        if user_id:
+            query = query.filter(model.user_id == user_id)
+
+        if start_date:
+            query = query.filter(model.created_at >= start_date)
+
+        total, *counts, avg_seconds = query.one()
+
+        stats = {"total": total or 0}
+        stats.update(zip(_STAT_STATUSES, (count or 0 for count in counts)))
+        stats["avg_seconds"] = round(float(avg_seconds), 2) if avg_seconds else 0
+        return stats
 
     @staticmethod
-    def get_active_tasks_count(user_id=None):
+    def get_active_tasks_count(user_id=None, active_stats=None):
         """获取活跃任务数量"""
         try:
-            active_statuses = ["pending", "processing"]
-
-            vc_query = VoiceCloneTask.query.filter(
-                VoiceCloneTask.status.in_(active_statuses)
+            vc_stats, tts_stats = active_stats or TaskService._get_active_task_stats(
+                user_id
             )
-            tts_query = TTSTask.query.filter(TTSTask.status.in_(active_statuses))
-
-            if user_id:
-                vc_query = vc_query.filter_by(user_id=user_id)
-                tts_query = tts_query.filter_by(user_id=user_id)
-
-            vc_count = vc_query.count()
-            tts_count = tts_query.count()
+            vc_count = vc_stats["pending"] + vc_stats["processing"]
+            tts_count = tts_stats["pending"] + tts_stats["processing"]
 
             return {
                 "voice_clone_active": vc_count,
@@ -149,14 +157,50 @@ class TaskService:
             current_app.logger.error(f"Get active tasks count error: {e}")
             return {"voice_clone_active": 0, "tts_active": 0, "total_active": 0}
 
+    @staticmethod
+    def _get_active_task_stats(user_id=None):
+        """汇总进行中任务的状态计数（两类任务UNION ALL单次查询）"""
+        selects = []
+        for name, model in _TASK_MODELS:
+            stmt = select(
+                literal(name),
+                db.func.count(db.case((model.status == "pending", 1))),
+                db.func.count(db.case((model.status == "processing", 1))),
+            ).where(model.status.in_(_ACTIVE_STATUSES))
+            if user_id:
+                stmt = stmt.where(model.user_id == user_id)
+            selects.append(stmt)
+
+        stats = {
+            name: {"pending": pending or 0, "processing": processing or 0}
+            for name, pending, processing in db.session.execute(union_all(*selects))
+        }
+        return stats["voice_clone"], stats["tts"]
+
+    @staticmethod
+    def _get_user_usage_counts(user_id, since):
+        """单次查询用户各类任务的进行中数量和指定时间以来的创建数量"""
+        selects = [
+            select(
+                literal(name),
+                db.func.count(db.case((model.status.in_(_ACTIVE_STATUSES), 1))),
+                db.func.count(db.case((model.created_at >= since, 1))),
+            ).where(model.user_id == user_id)
+            for name, model in _TASK_MODELS
+        ]
+        return {
+            name: (active or 0, created or 0)
+            for name, active, created in db.session.execute(union_all(*selects))
+        }
+
     @staticmethod
     def cleanup_old_tasks(days_threshold=30, keep_completed=True):
         """清理旧任务"""
         try:
             cutoff_date = datetime.utcnow() - timedelta(days=days_threshold)
 
-            # 清理语音克隆任务
-            vc_query = VoiceCloneTask.query.filter(
+            # 清理语音克隆任务：只查询ID
+            vc_query = db.session.query(VoiceCloneTask.id).filter(
                 VoiceCloneTask.created_at < cutoff_date
             )
 
@@ -165,44 +209,54 @@ class TaskService:
                     VoiceCloneTask.status.in_(["failed", "cancelled"])
                 )
 
-            vc_tasks_to_delete = vc_query.all()
-            vc_deleted_count = 0
-
-            for task in vc_tasks_to_delete:
-                try:
-                    # 清理相关文件
-                    TaskService._cleanup_task_files(task)
-                    db.session.delete(task)
-                    vc_deleted_count += 1
-                except Exception as e:
-                    current_app.logger.warning(
-                        f"Failed to delete VC task {task.id}: {e}"
-                    )
+            vc_ids = [task_id for (task_id,) in vc_query]
 
-            # 清理TTS任务
-            tts_query = TTSTask.query.filter(TTSTask.created_at < cutoff_date)
+            # 清理TTS任务：只查询ID和音频路径
+            tts_query = db.session.query(TTSTask.id, TTSTask.audio_path).filter(
+                TTSTask.created_at < cutoff_date
+            )
 
             if keep_completed:
                 tts_query = tts_query.filter(
                     TTSTask.status.in_(["failed", "cancelled"])
                 )
 
-            tts_tasks_to_delete = tts_query.all()
-            tts_deleted_count = 0
-
-            for task in tts_tasks_to_delete:
-                try:
-                    # 清理音频文件
-                    if task.audio_path and os.path.exists(task.audio_path):
-                        os.remove(task.audio_path)
-                    db.session.delete(task)
-                    tts_deleted_count += 1
-                except Exception as e:
-                    current_app.logger.warning(
-                        f"Failed to delete TTS task {task.id}: {e}"
-                    )
+            tts_rows = tts_query.all()
+
+            # 工作目录和音频文件在线程池中并发删除
+            # 语音克隆任务的样本文件通常不删除，因为可能被其他任务使用
+            work_dirs = [TaskService._task_work_dir(task_id) for task_id in vc_ids]
+            removed_vc_ids = []
+            tts_ids = []
+            with ThreadPoolExecutor(max_workers=TASK_CLEANUP_WORKERS) as executor:
+                dir_errors = executor.map(_remove_dir, work_dirs)
+                errors = executor.map(
+                    _remove_file, [audio_path for _, audio_path in tts_rows]
+                )
+                for (task_id, _), error in zip(tts_rows, errors):
+                    # 音频删除失败的任务保留记录
+                    if error:
+                        current_app.logger.warning(
+                            f"Failed to delete TTS task {task_id}: {error}"
+                        )
+                    else:
+                        tts_ids.append(task_id)
+                for task_id, error in zip(vc_ids, dir_errors):
+                    # 工作目录删除失败的任务保留记录
+                    if error:
+                        current_app.logger.warning(
+                            f"Failed to delete voice clone task {task_id}: {error}"
+                        )
+                    else:
+                        removed_vc_ids.append(task_id)
+
+            vc_deleted_count = TaskService._bulk_delete_by_ids(
+                VoiceCloneTask, removed_vc_ids
+            )
+            tts_deleted_count = TaskService._bulk_delete_by_ids(TTSTask, tts_ids)
 
             db.session.commit()
+            invalidate_task_stats_cache()
 
             return {
                 "voice_clone_deleted": vc_deleted_count,
@@ -216,74 +270,56 @@ class TaskService:
             raise TaskProcessingError(f"Failed to cleanup old tasks: {str(e)}")
 
     @staticmethod
-    def _cleanup_task_files(task):
-        """清理任务相关文件"""
-        try:
-            if hasattr(task, "get_audio_samples"):
-                # 语音克隆任务的样本文件通常不删除，因为可能被其他任务使用
-                pass
-
-            # 清理工作目录
-            work_dir = os.path.join(
-                current_app.config["UPLOAD_FOLDER"], "temp", f"voice_clone_{task.id}"
+    def _bulk_delete_by_ids(model, ids):
+        """按ID分批执行批量DELETE，由调用方提交事务"""
+        deleted = 0
+        # synchronize_session=False：会话中已加载的同一批对象不会被同步移除，
+        # 提交后即全部过期，调用方不应在提交前继续使用它们
+        for start in range(0, len(ids), _BULK_CHUNK_SIZE):
+            chunk = ids[start : start + _BULK_CHUNK_SIZE]
+            deleted += model.query.filter(model.id.in_(chunk)).delete(
+                synchronize_session=False
             )
+        return deleted
 
-            if os.path.exists(work_dir):
-                import shutil
-
-                shutil.rmtree(work_dir, ignore_errors=True)
-
-        except Exception as e:
-            current_app.logger.warning(
-                f"Failed to cleanup files for task {task.id}: {e}"
-            )
+    @staticmethod
+    def _task_work_dir(task_id):
+        """获取语音克隆任务的工作目录"""
+        return os.path.join(
+            current_app.config["UPLOAD_FOLDER"], "temp", f"voice_clone_{task_id}"
+        )
 
     @staticmethod
     def cancel_user_tasks(user_id, task_type=None):
         """取消用户的所有进行中任务"""
         try:
-            cancelled_count = 0
-
-            # 取消语音克隆任务
-            if not task_type or task_type == "voice_clone":
-                vc_tasks = VoiceCloneTask.query.filter(
-                    VoiceCloneTask.user_id == user_id,
-                    VoiceCloneTask.status.in_(["pending", "processing"]),
-                ).all()
-
-                for task in vc_tasks:
-                    try:
-                        if task.celery_task_id:
-                            celery.control.revoke(task.celery_task_id, terminate=True)
-                        task.update_status("failed", error_message="Cancelled by user")
-                        cancelled_count += 1
-                    except Exception as e:
-                        current_app.logger.warning(
-                            f"Failed to cancel VC task {task.id}: {e}"
-                        )
+            # 只加载ID和Celery任务ID
+            active_tasks = {
+                model: model.query.with_entities(model.id, model.celery_task_id)
+                .filter(model.user_id == user_id, model.status.in_(_ACTIVE_STATUSES))
+                .all()
+                for name, model in _TASK_MODELS
+                if not task_type or task_type == name
+            }
 
-            # 取消TTS任务
-            if not task_type or task_type == "tts":
-                tts_tasks = TTSTask.query.filter(
-                    TTSTask.user_id == user_id,
-                    TTSTask.status.in_(["pending", "processing"]),
-                ).all()
-
-                for task in tts_tasks:
-                    try:
-                        if task.celery_task_id:
-                            celery.control.revoke(task.celery_task_id, terminate=True)
-                        task.update_status("failed", error_message="Cancelled by user")
-                        cancelled_count += 1
-                    except Exception as e:
-                        current_app.logger.warning(
-                            f"Failed to cancel TTS task {task.id}: {e}"
-                        )
+            # 一次广播撤销全部Celery任务，撤销失败时不修改任务状态
+            cancelled_count = 0
+            if TaskService._revoke_celery_tasks(
+                celery_task_id
+                for tasks in active_tasks.values()
+                for _, celery_task_id in tasks
+            ):
+                for model, tasks in active_tasks.items():
+                    cancelled_count += TaskService._bulk_cancel(
+                        model, [task_id for task_id, _ in tasks]
+                    )
 
+            # 两类任务在同一事务中提交
             db.session.commit()
 
             # 记录日志
             if cancelled_count > 0:
+                invalidate_task_stats_cache()
                 log_user_action(
                     user_id=user_id,
                     action="cancel_user_tasks",
@@ -299,30 +335,79 @@ class TaskService:
             raise TaskProcessingError(f"Failed to cancel user tasks: {str(e)}")
 
     @staticmethod
-    def get_task_queue_status():
-        """获取任务队列状态"""
+    def _revoke_celery_tasks(celery_task_ids):
+        """批量撤销Celery任务（单次控制广播）"""
+        celery_task_ids = [task_id for task_id in celery_task_ids if task_id]
+        if not celery_task_ids:
+            return True
+
         try:
-            # 获取Celery队列信息
-            inspect = celery.control.inspect()
+            celery.control.revoke(celery_task_ids, terminate=True)
+            return True
+        except Exception as e:
+            current_app.logger.warning(
+                f"Failed to revoke {len(celery_task_ids)} celery tasks: {e}"
+            )
+            return False
+
+    @staticmethod
+    def _bulk_cancel(model, ids):
+        """按ID批量将进行中任务标记为用户取消，由调用方提交事务"""
+        cancelled = 0
+        completed_at = datetime.utcnow()
+        for start in range(0, len(ids), _BULK_CHUNK_SIZE):
+            chunk = ids[start : start + _BULK_CHUNK_SIZE]
+            # 仍限定进行中状态，避免覆盖查询后刚完成的任务
+            cancelled += model.query.filter(
+                model.id.in_(chunk), model.status.in_(_ACTIVE_STATUSES)
+            ).update(
+                {
+                    model.status: "failed",
+                    model.error_message: "Cancelled by user",
+                    model.completed_at: completed_at,
+                },
+                synchronize_session=False,
+            )
+        return cancelled
 
-            # 获取活跃任务
-            active_tasks = inspect.active()
-            scheduled_tasks = inspect.scheduled()
-            reserved_tasks = inspect.reserved()
+    @staticmethod
+    def _inspect_celery_workers():
+        """并发查询Celery Worker状态，结果在进程内短时缓存"""
+        cached = _celery_inspect_cache.get("workers")
+        if cached is not None:
+            return cached
+
+        # 三次广播并发执行，并缩短等待Worker回复的超时时间
+        inspect = celery.control.inspect(timeout=CELERY_INSPECT_TIMEOUT)
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            result = tuple(
+                executor.map(
+                    lambda query: query(),
+                    (inspect.active, inspect.scheduled, inspect.reserved),
+                )
+            )
 
-            # 统计数据库中的任务状态
-            vc_pending = VoiceCloneTask.query.filter_by(status="pending").count()
-            vc_processing = VoiceCloneTask.query.filter_by(status="processing").count()
+        _celery_inspect_cache.set("workers", result)
+        return result
 
-            tts_pending = TTSTask.query.filter_by(status="pending").count()
-            tts_processing = TTSTask.query.filter_by(status="processing").count()
+    @staticmethod
+    def get_task_queue_status(active_stats=None):
+        """获取任务队列状态"""
+        try:
+            # 获取Celery队列信息（活跃、计划、预留任务）
+            active_tasks, scheduled_tasks, reserved_tasks = (
+                TaskService._inspect_celery_workers()
+            )
+
+            # 统计数据库中的任务状态
+            vc_stats, tts_stats = active_stats or TaskService._get_active_task_stats()
 
             return {
                 "database_status": {
-                    "voice_clone_pending": vc_pending,
-                    "voice_clone_processing": vc_processing,
-                    "tts_pending": tts_pending,
-                    "tts_processing": tts_processing,
+                    "voice_clone_pending": vc_stats["pending"],
+                    "voice_clone_processing": vc_stats["processing"],
+                    "tts_pending": tts_stats["pending"],
+                    "tts_processing": tts_stats["processing"],
                 },
                 "celery_status": {
                     "active_tasks": active_tasks,
@@ -369,14 +454,21 @@ class TaskService:
                 task.started_at = None
                 task.completed_at = None
 
+                # 预先分配Celery任务ID，重置状态与任务ID一次提交
+                celery_task_id = task.celery_task_id = generate_uuid()
                 db.session.commit()
+                invalidate_task_stats_cache()
 
-                # 重新启动任务
-                from app.services.voice_clone_service import start_voice_clone_task
+                # 重新启动任务（提交后再投递，Worker读取到的是已重置的状态）
+                from app.services.voice_clone_service import (
+                    clear_live_progress,
+                    start_voice_clone_task,
+                )
 
-                celery_task = start_voice_clone_task.delay(task.id)
-                task.celery_task_id = celery_task.id
-                db.session.commit()
+                clear_live_progress(task_id)
+                start_voice_clone_task.apply_async(
+                    args=[task_id], task_id=celery_task_id
+                )
 
                 return task.to_dict()
 
@@ -396,14 +488,15 @@ class TaskService:
                 task.audio_path = None
                 task.audio_url = None
 
+                # 预先分配Celery任务ID，重置状态与任务ID一次提交
+                celery_task_id = task.celery_task_id = generate_uuid()
                 db.session.commit()
+                invalidate_task_stats_cache()
 
-                # 重新启动任务
+                # 重新启动任务（提交后再投递，Worker读取到的是已重置的状态）
                 from app.services.tts_service import generate_speech_task
 
-                celery_task = generate_speech_task.delay(task.id)
-                task.celery_task_id = celery_task.id
-                db.session.commit()
+                generate_speech_task.apply_async(args=[task_id], task_id=celery_task_id)
 
                 return task.to_dict()
 
@@ -446,26 +539,12 @@ class TaskService:
                     "max_daily_tts": 50,
                 }
 
-            # 获取当前使用情况
-            current_vc = VoiceCloneTask.query.filter(
-                VoiceCloneTask.user_id == user_id,
-                VoiceCloneTask.status.in_(["pending", "processing"]),
-            ).count()
-
-            current_tts = TTSTask.query.filter(
-                TTSTask.user_id == user_id,
-                TTSTask.status.in_(["pending", "processing"]),
-            ).count()
-
-            # 今日任务数
+            # 获取当前使用情况（进行中任务数与今日任务数一次查询）
+            # 创建时间以UTC存储，今日零点按UTC计算并作为参数传入，可直接走索引范围扫描
             today = datetime.utcnow().date()
-            today_vc = VoiceCloneTask.query.filter(
-                VoiceCloneTask.user_id == user_id, VoiceCloneTask.created_at >= today
-            ).count()
-
-            today_tts = TTSTask.query.filter(
-                TTSTask.user_id == user_id, TTSTask.created_at >= today
-            ).count()
+            usage = TaskService._get_user_usage_counts(user_id, today)
+            current_vc, today_vc = usage["voice_clone"]
+            current_tts, today_tts = usage["tts"]
 
             return {
                 "limits": limits,
@@ -491,7 +570,12 @@ class TaskService:
 
     @staticmethod
     def get_system_load():
-        """获取系统负载情况"""
+        """获取系统负载情况（Redis短时缓存）"""
+        cache_key = _task_stats_cache_key("system_load")
+        cached = redis_cache_get(cache_key)
+        if cached is not None:
+            return json_loads(cached)
+
         try:
             # CPU和内存使用情况（如果可用）
             system_info = {}
@@ -505,13 +589,16 @@ class TaskService:
             except ImportError:
                 system_info["note"] = "psutil not available"
 
+            # 进行中任务统计只查询一次，供队列状态和活跃任务共用
+            active_stats = TaskService._get_active_task_stats()
+
             # 任务队列负载
-            queue_status = TaskService.get_task_queue_status()
+            queue_status = TaskService.get_task_queue_status(active_stats)
 
             # 活跃任务统计
-            active_tasks = TaskService.get_active_tasks_count()
+            active_tasks = TaskService.get_active_tasks_count(active_stats=active_stats)
 
-            return {
+            result = {
                 "system_info": system_info,
                 "queue_status": queue_status,
                 "active_tasks": active_tasks,
@@ -521,3 +608,43 @@ class TaskService:
         except Exception as e:
             current_app.logger.error(f"Get system load error: {e}")
             return {"error": str(e), "timestamp": datetime.utcnow().isoformat()}
+
+        redis_cache_set(cache_key, json_dumps_bytes(result), TASK_STATS_CACHE_TTL)
+        return result
+
+
+def _task_stats_cache_key(*parts):
+    """生成任务统计缓存键（带版本号，任务状态变化时递增版本）"""
+    version = get_cache_version(_TASK_STATS_VERSION_KEY)
+    if version is None:
+        return None
+    return ":".join(["task_stats", version, *map(str, parts)])
+
+
+def invalidate_task_stats_cache():
+    """使任务统计缓存失效"""
+    bump_cache_version(_TASK_STATS_VERSION_KEY)
+
+
+def _remove_file(file_path):
+    """删除文件，返回错误信息（成功或文件不存在时为None）"""
+    if not file_path:
+        return None
+    try:
+        os.remove(file_path)
+        return None
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        return str(e)
+
+
+def _remove_dir(dir_path):
+    """删除目录，返回错误信息（成功或目录不存在时为None）"""
+    try:
+        shutil.rmtree(dir_path)
+        return None
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        return str(e)
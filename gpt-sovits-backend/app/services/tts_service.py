@@ -1,20 +1,45 @@
 # ./gpt-sovits-backend/app/services/tts_service.py
 import os
-import torch
+import re
 import numpy as np
 from datetime import datetime
 from celery import current_task
-from app.extensions import celery, db
+from app.extensions import celery, db, unit_of_work
 from app.models.task import TTSTask
 from app.models.model import VoiceModel
 from app.utils.exceptions import TaskProcessingError
 from app.utils.helpers import log_user_action, generate_unique_filename
 from flask import current_app
 
+# 中文标点到英文标点的映射表
+_PUNCTUATION_TABLE = str.maketrans(
+    {
+        "，": ",",
+        "。": ".",
+        "！": "!",
+        "？": "?",
+        "；": ";",
+        "：": ":",
+        "（": "(",
+        "）": ")",
+        "【": "[",
+        "】": "]",
+    }
+)
+_NUMBER_RE = re.compile(r"\d+")
+_ENGLISH_WORD_RE = re.compile(r"[a-zA-Z]+")
+
+# 保存音频时每次写入的采样点数
+AUDIO_WRITE_CHUNK_SAMPLES = 1 << 20
+
+# 模拟音频噪声的随机数生成器
+_rng = np.random.default_rng()
+
 
 @celery.task(bind=True, name="app.services.tts_service.generate_speech_task")
 def generate_speech_task(self, task_id):
     """生成语音任务（Celery任务）"""
+    task = None
     try:
         # 获取任务信息
         task = TTSTask.query.get(task_id)
@@ -27,21 +52,23 @@ def generate_speech_task(self, task_id):
         # 执行语音生成
         result = process_speech_generation(task)
 
-        # 保存结果
-        task.set_result(
-            audio_path=result["audio_path"],
-            audio_url=result["audio_url"],
-            duration=result["duration"],
-        )
-
-        # 记录成功日志
-        log_user_action(
-            user_id=task.user_id,
-            action="speech_generation_completed",
-            resource_type="tts_task",
-            resource_id=task.id,
-            details=f'Speech generated successfully. Duration: {result["duration"]:.2f}s',
-        )
+        # 保存结果并记录成功日志，统一提交
+        with unit_of_work():
+            task.set_result(
+                audio_path=result["audio_path"],
+                audio_url=result["audio_url"],
+                duration=result["duration"],
+                file_size=result["file_size"],
+                commit=False,
+            )
+            log_user_action(
+                user_id=task.user_id,
+                action="speech_generation_completed",
+                resource_type="tts_task",
+                resource_id=task.id,
+                details=f'Speech generated successfully. Duration: {result["duration"]:.2f}s',
+                commit=False,
+            )
 
         return {
             "status": "completed",
@@ -51,19 +78,19 @@ def generate_speech_task(self, task_id):
         }
 
     except Exception as e:
-        # 任务失败
-        if task:
-            task.update_status("failed", error_message=str(e))
-
-        # 记录错误日志
+        # 任务失败，状态与错误日志统一提交
         if task:
-            log_user_action(
-                user_id=task.user_id,
-                action="speech_generation_failed",
-                resource_type="tts_task",
-                resource_id=task.id,
-                details=f"Speech generation failed: {str(e)}",
-            )
+            db.session.rollback()
+            with unit_of_work():
+                task.update_status("failed", error_message=str(e), commit=False)
+                log_user_action(
+                    user_id=task.user_id,
+                    action="speech_generation_failed",
+                    resource_type="tts_task",
+                    resource_id=task.id,
+                    details=f"Speech generation failed: {str(e)}",
+                    commit=False,
+                )
 
         current_app.logger.error(f"TTS task {task_id} failed: {e}")
         raise TaskProcessingError(f"Speech generation failed: {str(e)}")
@@ -136,40 +163,17 @@ def load_voice_model(model_id):
 def preprocess_text(text):
     """预处理文本"""
     try:
-        # 清理和标准化文本
-        processed_text = text.strip()
-
-        # 处理标点符号
-        import re
-
-        # 标准化标点符号
-        processed_text = re.sub(
-            r'[，。！？；：""' "（）【】]",
-            lambda m: {
-                "，": ",",
-                "。": ".",
-                "！": "!",
-                "？": "?",
-                "；": ";",
-                "：": ":",
-                '""': '"',
-                "''": "'",
-                "（": "(",
-                "）": ")",
-                "【": "[",
-                "】": "]",
-            }.get(m.group(), m.group()),
-            processed_text,
-        )
+        # 清理文本并标准化标点符号
+        processed_text = text.strip().translate(_PUNCTUATION_TABLE)
 
         # 处理数字（可以扩展为数字转文字）
-        processed_text = re.sub(
-            r"\d+", lambda m: convert_number_to_text(m.group()), processed_text
+        processed_text = _NUMBER_RE.sub(
+            lambda m: convert_number_to_text(m.group()), processed_text
         )
 
         # 处理英文单词（可以扩展为发音标注）
-        processed_text = re.sub(
-            r"[a-zA-Z]+", lambda m: process_english_word(m.group()), processed_text
+        processed_text = _ENGLISH_WORD_RE.sub(
+            lambda m: process_english_word(m.group()), processed_text
         )
 
         return processed_text
@@ -179,40 +183,34 @@ def preprocess_text(text):
         return text  # 返回原文本
 
 
+def _build_number_text_table():
+    """预先生成0-99的中文读法表"""
+    table = list(_CN_DIGITS)
+    for tens in range(1, 10):
+        table.append(_CN_DIGITS[tens] + "十")
+        table.extend(
+            _CN_DIGITS[tens] + "十" + _CN_DIGITS[ones] for ones in range(1, 10)
+        )
+    return tuple(table)
+
+
+_CN_DIGITS = "零一二三四五六七八九"
+_NUMBER_TEXT_TABLE = _build_number_text_table()
+
+
 def convert_number_to_text(number_str):
     """数字转文字（简化版）"""
     try:
         num = int(number_str)
+    except ValueError:
+        return number_str
 
-        # 简单的数字转换（可以扩展为完整的中文数字转换）
-        digit_map = {
-            "0": "零",
-            "1": "一",
-            "2": "二",
-            "3": "三",
-            "4": "四",
-            "5": "五",
-            "6": "六",
-            "7": "七",
-            "8": "八",
-            "9": "九",
-        }
+    # 简单的数字转换（可以扩展为完整的中文数字转换）
+    if num < len(_NUMBER_TEXT_TABLE):
+        return _NUMBER_TEXT_TABLE[num]
 
-        if num < 10:
-            return digit_map[str(num)]
-        elif num < 100:
-            tens = num // 10
-            ones = num % 10
-            if ones == 0:
-                return digit_map[str(tens)] + "十"
-            else:
-                return digit_map[str(tens)] + "十" + digit_map[str(ones)]
-        else:
-            # 更复杂的数字转换
-            return number_str  # 简化处理
-
-    except:
-        return number_str
+    # 更复杂的数字转换
+    return number_str  # 简化处理
 
 
 def process_english_word(word):
@@ -229,8 +227,6 @@ def generate_audio(text, model_info, emotion="neutral", speed=1.0):
         # 由于模型复杂性，这里提供框架代码
 
         # 模拟音频生成过程
-        import numpy as np
-
         # 计算音频长度（基于文本长度和语速）
         base_duration = len(text) * 0.15  # 每个字符大约0.15秒
         duration = base_duration / speed
@@ -240,7 +236,6 @@ def generate_audio(text, model_info, emotion="neutral", speed=1.0):
         samples = int(duration * sample_rate)
 
         # 创建简单的正弦波作为模拟音频
-        t = np.linspace(0, duration, samples)
         frequency = 440  # A4音符
 
         # 根据情感调整频率
@@ -259,17 +254,22 @@ def generate_audio(text, model_info, emotion="neutral", speed=1.0):
         freq_multiplier = emotion_freq_map.get(emotion, 1.0)
         frequency *= freq_multiplier
 
-        # 生成音频波形
-        audio = np.sin(2 * np.pi * frequency * t) * 0.3
+        # 生成音频波形（float32缓冲区上原地计算，不产生中间数组）
+        audio = np.linspace(0, duration, samples, dtype=np.float32)
+        audio *= 2 * np.pi * frequency
+        np.sin(audio, out=audio)
+        audio *= 0.3
 
         # 添加一些随机性使其更像语音
-        noise = np.random.normal(0, 0.05, samples)
+        noise = _rng.standard_normal(samples, dtype=np.float32)
+        noise *= 0.05
         audio += noise
 
         # 应用包络以避免突然开始/结束
         fade_samples = int(0.1 * sample_rate)  # 0.1秒淡入淡出
-        audio[:fade_samples] *= np.linspace(0, 1, fade_samples)
-        audio[-fade_samples:] *= np.linspace(1, 0, fade_samples)
+        fade_in = np.linspace(0, 1, fade_samples, dtype=np.float32)
+        audio[:fade_samples] *= fade_in
+        audio[-fade_samples:] *= fade_in[::-1]
 
         return {"audio_data": audio, "sample_rate": sample_rate, "duration": duration}
 
@@ -280,19 +280,22 @@ def generate_audio(text, model_info, emotion="neutral", speed=1.0):
 def post_process_audio(audio_info, speed=1.0):
     """后处理音频"""
     try:
-        import librosa
-
-        audio_data = audio_info["audio_data"]
+        # 全程使用float32，保存时再转换为PCM_16
+        audio_data = np.asarray(audio_info["audio_data"], dtype=np.float32)
         sample_rate = audio_info["sample_rate"]
 
         # 应用语速调整（如果需要）
         if speed != 1.0:
+            import librosa
+
             audio_data = librosa.effects.time_stretch(audio_data, rate=speed)
 
-        # 音频标准化
-        max_val = np.max(np.abs(audio_data))
-        if max_val > 0:
-            audio_data = audio_data / max_val * 0.8  # 标准化到80%音量
+        # 音频标准化（峰值取自最小/最大值，不生成abs临时数组；原地缩放）
+        if audio_data.size:
+            peak = max(-float(audio_data.min()), float(audio_data.max()))
+            if peak > 0:
+                # 标准化到80%音量
+                np.multiply(audio_data, np.float32(0.8 / peak), out=audio_data)
 
         # 更新音频信息
         audio_info["audio_data"] = audio_data
@@ -320,14 +323,18 @@ def save_generated_audio(audio_info, task):
         # 完整文件路径
         file_path = os.path.join(save_dir, filename)
 
-        # 保存音频文件
-        sf.write(
+        # 分块写入音频文件，避免一次性生成整段PCM转换缓冲区
+        audio_data = audio_info["audio_data"]
+        with sf.SoundFile(
             file_path,
-            audio_info["audio_data"],
-            audio_info["sample_rate"],
+            mode="w",
+            samplerate=audio_info["sample_rate"],
+            channels=1,
             format="WAV",
             subtype="PCM_16",
-        )
+        ) as audio_file:
+            for start in range(0, len(audio_data), AUDIO_WRITE_CHUNK_SAMPLES):
+                audio_file.write(audio_data[start : start + AUDIO_WRITE_CHUNK_SAMPLES])
 
         # 生成访问URL（简化处理）
         audio_url = f"/api/tts/tasks/{task.id}/download"
@@ -336,6 +343,7 @@ def save_generated_audio(audio_info, task):
             "audio_path": file_path,
             "audio_url": audio_url,
             "duration": audio_info["duration"],
+            "file_size": os.path.getsize(file_path),
         }
 
     except Exception as e:
@@ -345,10 +353,7 @@ def save_generated_audio(audio_info, task):
 def update_tts_task_status(task, message):
     """更新TTS任务状态"""
     try:
-        # 这里可以扩展为更详细的状态跟踪
-        db.session.commit()
-
-        # 更新Celery任务状态
+        # 进度只写入Celery结果后端，不提交数据库事务（各步骤不修改任务字段）
         if current_task:
             current_task.update_state(state="PROGRESS", meta={"message": message})
     except Exception as e:
@@ -393,8 +398,6 @@ def cancel_tts_task(task_id):
 
         # 取消Celery任务
         if task.celery_task_id:
-            from app.extensions import celery
-
             celery.control.revoke(task.celery_task_id, terminate=True)
 
         # 更新任务状态
@@ -1,20 +1,73 @@
 # ./gpt-sovits-backend/app/services/voice_clone_service.py
 import os
 import shutil
-import subprocess
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from functools import lru_cache
 from celery import current_task
-from app.extensions import celery, db
+from celery.signals import celeryd_after_setup, worker_process_init
+from app.extensions import celery, db, unit_of_work
 from app.models.task import VoiceCloneTask
 from app.models.model import VoiceModel
+from app.models.types import generate_uuid
 from app.utils.exceptions import TaskProcessingError
-from app.utils.helpers import log_user_action
+from app.utils.helpers import (
+    log_user_action,
+    fast_copy,
+    generate_content_id,
+    generate_content_ids,
+    link_or_copy,
+)
 from flask import current_app
 
+# 磁盘缓存版本号，预处理或特征提取逻辑变化时递增，使旧缓存失效
+_PREPROCESS_CACHE_VERSION = 1
+_FEATURES_CACHE_VERSION = 3
+
+# 磁盘缓存临时文件后缀，超过一小时仍存在的视为中断写入的残留
+_CACHE_TMP_SUFFIX = ".tmp"
+_CACHE_TMP_MAX_AGE = 3600
+
+# 缓存清理任务的调度标记，间隔内只调度一次
+_CACHE_PRUNE_SCHEDULED_KEY = "audio_cache:prune_scheduled"
+
+# 并行提取特征的线程数（librosa/soundfile的计算大多释放GIL）
+FEATURE_EXTRACTION_WORKERS = min(8, os.cpu_count() or 1)
+
+# 特征提取参数
+FEATURE_SAMPLE_RATE = 16000
+FEATURE_N_FFT = 2048
+FEATURE_HOP_LENGTH = 512
+
+# 清音判定：能量低于最大帧能量该分贝数、或过零率高于该值（摩擦音等噪声）的帧
+# 基频记为NaN，与pYIN输出的语义一致
+F0_SILENCE_DB = 40
+F0_UNVOICED_ZCR = 0.3
+
+# 保存的特征数组名、对应的单文件特征键及存储精度
+# 梅尔谱与MFCC以float16存储（训练网络会做归一化）；基频对精度敏感，保持float32
+_FEATURE_ARRAYS = (
+    ("mfcc", "mfcc", "float16"),
+    ("mel_spectrogram", "mel_spectrogram", "float16"),
+    ("f0", "f0", "float32"),
+    ("spectral_centroid", "centroid", "float32"),
+    ("spectral_rolloff", "rolloff", "float32"),
+    ("zero_crossing_rate", "zcr", "float32"),
+)
+
+# 训练工作目录的后台删除延迟（秒）
+WORK_DIR_CLEANUP_DELAY = 5
+
+# 训练进度在Redis中的保留时间（秒）
+TASK_PROGRESS_TTL = 3600
+
 
 @celery.task(bind=True, name="app.services.voice_clone_service.clone_voice_task")
 def start_voice_clone_task(self, task_id):
     """启动语音克隆任务（Celery任务）"""
+    task = None
     try:
         # 获取任务信息
         task = VoiceCloneTask.query.get(task_id)
@@ -27,19 +80,18 @@ def start_voice_clone_task(self, task_id):
         # 执行语音克隆
         result = process_voice_clone(task)
 
-        # 任务完成
-        task.update_status("completed", progress=100)
-        task.result_model_id = result["model_id"]
-        db.session.commit()
-
-        # 记录成功日志
-        log_user_action(
-            user_id=task.user_id,
-            action="voice_clone_completed",
-            resource_type="voice_clone_task",
-            resource_id=task.id,
-            details=f'Voice clone training completed successfully. Model ID: {result["model_id"]}',
-        )
+        # 任务完成并记录成功日志，统一提交
+        with unit_of_work():
+            task.update_status("completed", progress=100, commit=False)
+            task.result_model_id = result["model_id"]
+            log_user_action(
+                user_id=task.user_id,
+                action="voice_clone_completed",
+                resource_type="voice_clone_task",
+                resource_id=task.id,
+                details=f'Voice clone training completed successfully. Model ID: {result["model_id"]}',
+                commit=False,
+            )
 
         return {
             "status": "completed",
@@ -48,19 +100,19 @@ def start_voice_clone_task(self, task_id):
         }
 
     except Exception as e:
-        # 任务失败
+        # 任务失败，状态与错误日志统一提交
         if task:
-            task.update_status("failed", error_message=str(e))
-
-        # 记录错误日志
-        if task:
-            log_user_action(
-                user_id=task.user_id,
-                action="voice_clone_failed",
-                resource_type="voice_clone_task",
-                resource_id=task.id,
-                details=f"Voice clone training failed: {str(e)}",
-            )
+            db.session.rollback()
+            with unit_of_work():
+                task.update_status("failed", error_message=str(e), commit=False)
+                log_user_action(
+                    user_id=task.user_id,
+                    action="voice_clone_failed",
+                    resource_type="voice_clone_task",
+                    resource_id=task.id,
+                    details=f"Voice clone training failed: {str(e)}",
+                    commit=False,
+                )
 
         current_app.logger.error(f"Voice clone task {task_id} failed: {e}")
         raise TaskProcessingError(f"Voice clone training failed: {str(e)}")
@@ -78,11 +130,11 @@ def process_voice_clone(task):
 
         # 3. 提取音频特征
         update_task_progress(task, 30, "Extracting audio features...")
-        features = extract_audio_features(preprocessed_files, work_dir)
+        features_dir = extract_audio_features(preprocessed_files, work_dir)
 
         # 4. 训练语音模型
         update_task_progress(task, 50, "Training voice model...")
-        model_files = train_voice_model(features, work_dir, task)
+        model_files = train_voice_model(features_dir, work_dir, task)
 
         # 5. 验证模型质量
         update_task_progress(task, 80, "Validating model quality...")
@@ -137,19 +189,41 @@ def preprocess_audio_files(task, work_dir):
 
         audio_samples = task.get_audio_samples()
         preprocessed_files = []
+        target_sr = current_app.config["AUDIO_SAMPLE_RATE"]
 
+        samples = []
         for i, audio_path in enumerate(audio_samples):
             if not os.path.exists(audio_path):
                 current_app.logger.warning(f"Audio file not found: {audio_path}")
                 continue
+            samples.append((i, audio_path))
+
+        # 并行计算所有样本的内容指纹，用作缓存键
+        content_ids = generate_content_ids(audio_path for _, audio_path in samples)
 
+        for (i, audio_path), content_id in zip(samples, content_ids):
             # 输出文件路径
             output_path = os.path.join(work_dir, "processed", f"sample_{i}.wav")
 
-            # 加载音频
-            audio, sr = librosa.load(
-                audio_path, sr=current_app.config["AUDIO_SAMPLE_RATE"]
+            # 相同内容已预处理过时直接复用缓存结果
+            cache_path = _audio_cache_path(
+                "preprocessed",
+                content_id,
+                (_PREPROCESS_CACHE_VERSION, target_sr),
+                ".wav",
             )
+            # 缓存可能刚被清理任务删除，此时照常重新处理
+            try:
+                fast_copy(cache_path, output_path)
+            except FileNotFoundError:
+                pass
+            else:
+                _touch_cache_entry(cache_path)
+                preprocessed_files.append(output_path)
+                continue
+
+            # 加载音频
+            audio, sr = librosa.load(audio_path, sr=target_sr)
 
             # 移除静音
             audio = trim_silence(audio, sr)
@@ -159,6 +233,7 @@ def preprocess_audio_files(task, work_dir):
 
             # 保存处理后的音频
             sf.write(output_path, audio, sr, format="WAV", subtype="PCM_16")
+            _store_in_cache(output_path, cache_path)
             preprocessed_files.append(output_path)
 
         if not preprocessed_files:
@@ -173,142 +248,607 @@ def preprocess_audio_files(task, work_dir):
 def extract_audio_features(audio_files, work_dir):
     """提取音频特征"""
     try:
-        import librosa
         import numpy as np
 
+        gpu_transforms = _get_gpu_feature_transforms()
+        if gpu_transforms is not None:
+            # GPU可用时，未命中缓存的文件组成一个批次一次性计算频谱类特征
+            results = _load_features_batch_gpu(audio_files, gpu_transforms)
+        else:
+            # 各文件相互独立，并行提取；Celery的prefork子进程无法再派生进程，使用线程池
+            # 并行期间将BLAS线程数限制为1，避免线程过度订阅
+            app = current_app._get_current_object()
+            with _limit_blas_threads(), ThreadPoolExecutor(
+                max_workers=FEATURE_EXTRACTION_WORKERS
+            ) as executor:
+                results = list(
+                    executor.map(
+                        lambda audio_file: _load_file_features_in_app(app, audio_file),
+                        audio_files,
+                    )
+                )
+
+        # 按文件数与最大帧数一次性分配数组，短文件补零，帧数单独记录
+        max_frames = max(
+            file_features[key].shape[-1]
+            for file_features in results
+            for _, key, _ in _FEATURE_ARRAYS
+        )
         features = {
-            "mfcc": [],
-            "mel_spectrogram": [],
-            "f0": [],
-            "spectral_features": [],
+            "frame_counts": np.array(
+                [file_features["mfcc"].shape[-1] for file_features in results],
+                dtype=np.int32,
+            )
         }
+        for name, key, dtype in _FEATURE_ARRAYS:
+            leading_shape = results[0][key].shape[:-1]
+            buffer = np.zeros((len(results), *leading_shape, max_frames), dtype=dtype)
+            limit = np.finfo(dtype).max
+            for i, file_features in enumerate(results):
+                value = file_features[key]
+                # 限制在目标精度的取值范围内，避免float16溢出为inf
+                buffer[i, ..., : value.shape[-1]] = np.clip(value, -limit, limit)
+            features[name] = buffer
+
+        # 每个特征单独保存为.npy，训练时可用np.load(mmap_mode="r")按需读取
+        features_dir = os.path.join(work_dir, "features")
+        for name, array in features.items():
+            np.save(os.path.join(features_dir, f"{name}.npy"), array)
+
+        return features_dir
 
-        for audio_file in audio_files:
-            # 加载音频
-            audio, sr = librosa.load(audio_file, sr=16000)
+    except Exception as e:
+        raise TaskProcessingError(f"Failed to extract audio features: {str(e)}")
 
-            # 提取MFCC特征
-            mfcc = librosa.feature.mfcc(y=audio, sr=sr, n_mfcc=13)
-            features["mfcc"].append(mfcc)
 
-            # 提取梅尔频谱图
-            mel_spec = librosa.feature.melspectrogram(y=audio, sr=sr, n_mels=80)
-            features["mel_spectrogram"].append(mel_spec)
+def _load_file_features_in_app(app, audio_file):
+    """在工作线程中提取单个文件特征"""
+    with app.app_context():
+        return _load_file_features(audio_file)
 
-            # 提取基频
-            f0, voiced_flag, voiced_probs = librosa.pyin(
-                audio, fmin=librosa.note_to_hz("C2"), fmax=librosa.note_to_hz("C7")
-            )
-            features["f0"].append(f0)
 
-            # 提取频谱特征
-            spectral_centroids = librosa.feature.spectral_centroid(y=audio, sr=sr)
-            spectral_rolloff = librosa.feature.spectral_rolloff(y=audio, sr=sr)
-            zero_crossing_rate = librosa.feature.zero_crossing_rate(audio)
+def _limit_blas_threads():
+    """将BLAS/OpenMP线程数限制为1（未安装threadpoolctl时不做限制）"""
+    try:
+        from threadpoolctl import threadpool_limits
+    except ImportError:
+        from contextlib import nullcontext
 
-            spectral_features = {
-                "centroid": spectral_centroids,
-                "rolloff": spectral_rolloff,
-                "zcr": zero_crossing_rate,
-            }
-            features["spectral_features"].append(spectral_features)
+        return nullcontext()
+    return threadpool_limits(limits=1)
+
+
+def _load_file_features(audio_file):
+    """获取单个音频文件的特征（按内容指纹缓存到磁盘）"""
+    cache_path = _features_cache_path(generate_content_id(audio_file), "cpu")
+    file_features = _read_cached_features(cache_path)
+    if file_features is None:
+        file_features = _extract_file_features(audio_file)
+        _write_cached_features(cache_path, file_features)
+    return file_features
+
+
+def _load_features_batch_gpu(audio_files, transforms):
+    """批量获取音频文件的特征（未命中缓存的文件在GPU上批量计算）"""
+    cache_paths = [
+        _features_cache_path(content_id, "cuda")
+        for content_id in generate_content_ids(audio_files)
+    ]
+    results = [_read_cached_features(cache_path) for cache_path in cache_paths]
 
-        # 保存特征
-        feature_file = os.path.join(work_dir, "features", "extracted_features.npz")
-        np.savez(feature_file, **features)
+    missing = [i for i, file_features in enumerate(results) if file_features is None]
+    if missing:
+        computed = _extract_features_gpu([audio_files[i] for i in missing], transforms)
+        for i, file_features in zip(missing, computed):
+            _write_cached_features(cache_paths[i], file_features)
+            results[i] = file_features
 
-        return feature_file
+    return results
 
+
+def _features_cache_path(content_id, backend):
+    """特征缓存路径（不同计算后端的数值存在细微差异，分别缓存）"""
+    return _audio_cache_path(
+        "features", content_id, (_FEATURES_CACHE_VERSION, backend), ".npz"
+    )
+
+
+def _read_cached_features(cache_path):
+    """读取缓存的特征，不存在或损坏时返回None"""
+    import numpy as np
+
+    if not os.path.exists(cache_path):
+        return None
+    try:
+        with np.load(cache_path) as cached:
+            features = {name: cached[name] for name in cached.files}
     except Exception as e:
-        raise TaskProcessingError(f"Failed to extract audio features: {str(e)}")
+        current_app.logger.warning(f"Failed to load cached features: {e}")
+        return None
 
+    _touch_cache_entry(cache_path)
+    return features
 
-def train_voice_model(features_file, work_dir, task):
-    """训练语音模型"""
+
+def _write_cached_features(cache_path, file_features):
+    """写入特征缓存，失败时忽略"""
+    import numpy as np
+
+    # 先写临时文件再原子替换，避免并发任务读到不完整的缓存
+    tmp = None
+    try:
+        with _open_cache_tmp(cache_path) as tmp:
+            np.savez(tmp, **file_features)
+        os.replace(tmp.name, cache_path)
+    except OSError as e:
+        current_app.logger.warning(f"Failed to cache audio features: {e}")
+        if tmp is not None:
+            _remove_quietly(tmp.name)
+        return
+
+    _schedule_cache_prune()
+
+
+def _extract_file_features(audio_file):
+    """提取单个音频文件的特征"""
+    import librosa
+    import numpy as np
+    from app.utils.audio_utils import load_audio
+
+    _configure_fft_backend()
+
+    # 加载音频（每个文件只解码一次）
+    audio, sr = load_audio(audio_file, sr=FEATURE_SAMPLE_RATE)
+
+    # 共享一次STFT，各频谱特征基于同一幅度谱计算
+    magnitude = np.abs(
+        librosa.stft(audio, n_fft=FEATURE_N_FFT, hop_length=FEATURE_HOP_LENGTH)
+    )
+    power = magnitude**2
+
+    return {
+        # MFCC特征（与librosa默认一致，基于128维梅尔谱的对数能量）
+        "mfcc": librosa.feature.mfcc(
+            S=librosa.power_to_db(np.dot(_mel_basis(sr, FEATURE_N_FFT, 128), power)),
+            n_mfcc=13,
+        ),
+        # 梅尔频谱图（滤波器组按参数缓存，直接与功率谱相乘）
+        "mel_spectrogram": np.dot(_mel_basis(sr, FEATURE_N_FFT, 80), power),
+        # 基频与过零率
+        **_extract_time_domain_features(audio, sr),
+        # 频谱特征
+        "centroid": librosa.feature.spectral_centroid(S=magnitude, sr=sr),
+        "rolloff": librosa.feature.spectral_rolloff(S=magnitude, sr=sr),
+    }
+
+
+@lru_cache(maxsize=8)
+def _mel_basis(sr, n_fft, n_mels):
+    """梅尔滤波器组（与librosa.feature.melspectrogram默认参数一致，进程内复用）"""
+    import librosa
+
+    return librosa.filters.mel(sr=sr, n_fft=n_fft, n_mels=n_mels)
+
+
+@lru_cache(maxsize=1)
+def _configure_fft_backend():
+    """安装pyFFTW时切换librosa的FFT实现，并缓存各长度的FFTW计划"""
     try:
-        # 这里简化处理，实际应调用GPT-SoVITS训练脚本
-        # 由于GPT-SoVITS的复杂性，这里提供框架代码
+        import pyfftw
+    except ImportError:
+        return
+
+    import librosa
+
+    pyfftw.interfaces.cache.enable()
+    librosa.set_fftlib(pyfftw.interfaces.numpy_fft)
+
+
+def _extract_time_domain_features(audio, sr):
+    """提取基频与过零率（CPU计算）"""
+    import librosa
+    import numpy as np
+
+    # 基频（YIN为向量化实现，避免pYIN逐帧Viterbi解码的开销）
+    f0 = librosa.yin(
+        audio,
+        fmin=librosa.note_to_hz("C2"),
+        fmax=librosa.note_to_hz("C7"),
+        sr=sr,
+        frame_length=FEATURE_N_FFT,
+        hop_length=FEATURE_HOP_LENGTH,
+    )
+    zcr = librosa.feature.zero_crossing_rate(
+        audio, frame_length=FEATURE_N_FFT, hop_length=FEATURE_HOP_LENGTH
+    )
+
+    # YIN对每一帧都给出估计值，按能量与过零率屏蔽清音帧
+    rms = librosa.feature.rms(
+        y=audio, frame_length=FEATURE_N_FFT, hop_length=FEATURE_HOP_LENGTH
+    )[0]
+    rms_db = librosa.amplitude_to_db(rms, ref=np.max)
+    unvoiced = (rms_db < -F0_SILENCE_DB) | (zcr[0] > F0_UNVOICED_ZCR)
+    f0[unvoiced[: len(f0)]] = np.nan
+
+    return {"f0": f0, "zcr": zcr}
+
+
+@lru_cache(maxsize=1)
+def _get_gpu_feature_transforms():
+    """GPU批量特征提取所用的窗函数与变换矩阵（需要CUDA，进程内复用）"""
+    try:
+        import torch
+    except ImportError:
+        return None
 
-        model_dir = os.path.join(work_dir, "models")
-        config = task.get_config()
+    if not torch.cuda.is_available():
+        return None
 
-        # 模拟训练过程（实际应调用真实的训练脚本）
-        training_script = os.path.join(
-            current_app.config["SOVITS_MODEL_PATH"], "train.py"
+    import librosa
+    import numpy as np
+    from scipy.fft import dct
+
+    device = torch.device("cuda")
+    sr = FEATURE_SAMPLE_RATE
+
+    def to_device(array):
+        return torch.from_numpy(np.ascontiguousarray(array, dtype=np.float32)).to(
+            device
         )
 
-        if os.path.exists(training_script):
-            # 准备训练配置
-            train_config = {
-                "input_features": features_file,
-                "output_dir": model_dir,
-                "model_name": task.model_name,
-                "epochs": config.get("epochs", 100),
-                "batch_size": config.get("batch_size", 32),
-                "learning_rate": config.get("learning_rate", 0.0001),
+    return {
+        "device": device,
+        "window": torch.hann_window(FEATURE_N_FFT, device=device),
+        # 梅尔滤波器与CPU路径共用同一缓存，结果与librosa保持一致
+        "mel_128": to_device(_mel_basis(sr, FEATURE_N_FFT, 128)),
+        "mel_80": to_device(_mel_basis(sr, FEATURE_N_FFT, 80)),
+        # 与librosa.feature.mfcc一致的正交DCT-II矩阵（取前13维）
+        "dct": to_device(dct(np.eye(128), type=2, norm="ortho", axis=0)[:13]),
+        "freqs": to_device(librosa.fft_frequencies(sr=sr, n_fft=FEATURE_N_FFT)),
+    }
+
+
+def _extract_features_gpu(audio_files, transforms):
+    """在GPU上批量提取频谱类特征（基频与过零率仍在CPU上计算）"""
+    from app.utils.audio_utils import load_audio
+
+    with _limit_blas_threads(), ThreadPoolExecutor(
+        max_workers=FEATURE_EXTRACTION_WORKERS
+    ) as executor:
+        # 并行解码（soundfile读取时释放GIL）
+        audios = list(
+            executor.map(
+                lambda audio_file: load_audio(audio_file, sr=FEATURE_SAMPLE_RATE)[0],
+                audio_files,
+            )
+        )
+
+        # 基频与过零率在线程池中计算，与GPU上的频谱计算重叠进行
+        time_domain_futures = [
+            executor.submit(_extract_time_domain_features, audio, FEATURE_SAMPLE_RATE)
+            for audio in audios
+        ]
+        spectral_outputs = _compute_spectral_features_gpu(audios, transforms)
+        time_domain_features = [future.result() for future in time_domain_futures]
+
+    results = []
+    for i, audio in enumerate(audios):
+        n_frames = 1 + len(audio) // FEATURE_HOP_LENGTH
+        mfcc_i, mel_i, centroid_i, rolloff_i = (
+            output[i, :, :n_frames] for output in spectral_outputs
+        )
+        results.append(
+            {
+                "mfcc": mfcc_i,
+                "mel_spectrogram": mel_i,
+                **time_domain_features[i],
+                "centroid": centroid_i,
+                "rolloff": rolloff_i,
             }
+        )
 
-            # 执行训练命令
-            cmd = [
-                "python",
-                training_script,
-                "--features",
-                features_file,
-                "--output_dir",
-                model_dir,
-                "--model_name",
-                task.model_name,
-                "--epochs",
-                str(train_config["epochs"]),
-            ]
+    return results
 
-            # 更新进度
-            for progress in range(50, 80, 5):
-                update_task_progress(
-                    task, progress, f"Training in progress... {progress-50+1}/6"
-                )
 
-                # 模拟训练时间
-                import time
+def _compute_spectral_features_gpu(audios, transforms):
+    """整批计算MFCC、梅尔谱、频谱质心与滚降频率，返回补零对齐的numpy数组"""
+    import torch
 
-                time.sleep(2)
+    lengths = [len(audio) for audio in audios]
 
-            # 检查模型文件是否生成
-            model_files = {
-                "model_path": os.path.join(model_dir, f"{task.model_name}.pth"),
-                "config_path": os.path.join(
-                    model_dir, f"{task.model_name}_config.json"
-                ),
-                "index_path": os.path.join(model_dir, f"{task.model_name}.index"),
-            }
+    # 补零成[B, T]批次，各文件的有效帧数按原始长度截取
+    batch = torch.zeros(len(audios), max(lengths), dtype=torch.float32)
+    for i, audio in enumerate(audios):
+        batch[i, : lengths[i]] = torch.from_numpy(audio)
+
+    with torch.inference_mode():
+        batch = batch.to(transforms["device"], non_blocking=True)
+
+        # 整批只做一次STFT（与librosa默认一致：居中分帧、零填充、周期汉宁窗）
+        magnitude = torch.stft(
+            batch,
+            n_fft=FEATURE_N_FFT,
+            hop_length=FEATURE_HOP_LENGTH,
+            window=transforms["window"],
+            center=True,
+            pad_mode="constant",
+            return_complex=True,
+        ).abs()  # [B, F, frames]
+        power = magnitude.square()
+
+        # MFCC：对数梅尔能量按样本分别截断到最大值以下80dB，再做DCT
+        mel_db = 10.0 * torch.log10(
+            torch.matmul(transforms["mel_128"], power).clamp_min(1e-10)
+        )
+        mel_db = torch.maximum(mel_db, mel_db.amax(dim=(-2, -1), keepdim=True) - 80.0)
+        mfcc = torch.matmul(transforms["dct"], mel_db)
+        mel = torch.matmul(transforms["mel_80"], power)
+
+        # 频谱质心与滚降频率，复用同一幅度谱
+        freqs = transforms["freqs"]
+        weights = magnitude / magnitude.sum(dim=-2, keepdim=True).clamp_min(1e-10)
+        centroid = (freqs[:, None] * weights).sum(dim=-2, keepdim=True)
+        cumulative = magnitude.cumsum(dim=-2)
+        rolloff_index = (
+            (cumulative >= 0.85 * cumulative[:, -1:, :])
+            .int()
+            .argmax(dim=-2, keepdim=True)
+        )
+        rolloff = freqs[rolloff_index]
+
+        return [tensor.cpu().numpy() for tensor in (mfcc, mel, centroid, rolloff)]
+
+
+def _audio_cache_path(kind, content_id, params, ext):
+    """按文件内容指纹与处理参数生成缓存文件路径"""
+    cache_dir = os.path.join(current_app.config["AUDIO_CACHE_FOLDER"], kind)
+    os.makedirs(cache_dir, exist_ok=True)
+    key = "_".join([content_id, *map(str, params)])
+    return os.path.join(cache_dir, key + ext)
+
+
+def _store_in_cache(src_path, cache_path):
+    """复制文件到缓存（先写临时文件再原子替换），失败时忽略"""
+    tmp = None
+    try:
+        with _open_cache_tmp(cache_path) as tmp:
+            pass
+        fast_copy(src_path, tmp.name, preserve_metadata=False)
+        os.replace(tmp.name, cache_path)
+    except OSError as e:
+        current_app.logger.warning(f"Failed to cache {src_path}: {e}")
+        if tmp is not None:
+            _remove_quietly(tmp.name)
+        return
+
+    _schedule_cache_prune()
+
+
+def _open_cache_tmp(cache_path):
+    """在缓存目录中创建唯一命名的临时文件（线程与进程间互不冲突）"""
+    return tempfile.NamedTemporaryFile(
+        dir=os.path.dirname(cache_path),
+        prefix=".",
+        suffix=_CACHE_TMP_SUFFIX,
+        delete=False,
+    )
 
+
+def _touch_cache_entry(cache_path):
+    """命中缓存时刷新修改时间，清理时按最近使用时间淘汰"""
+    try:
+        os.utime(cache_path)
+    except OSError:
+        pass
+
+
+def _schedule_cache_prune():
+    """调度缓存清理任务（间隔内只调度一次），失败时忽略"""
+    from app.extensions import redis_client
+
+    try:
+        interval = current_app.config["AUDIO_CACHE_PRUNE_INTERVAL"]
+        if redis_client.set(_CACHE_PRUNE_SCHEDULED_KEY, 1, nx=True, ex=interval):
+            prune_audio_cache_task.apply_async(priority=9)
+    except Exception as e:
+        current_app.logger.warning(f"Failed to schedule audio cache prune: {e}")
+
+
+def prune_audio_cache():
+    """按存放时间与总大小清理音频磁盘缓存，返回删除的文件数"""
+    cache_root = current_app.config["AUDIO_CACHE_FOLDER"]
+    if not os.path.isdir(cache_root):
+        return 0
+
+    now = time.time()
+    entry_cutoff = now - current_app.config["AUDIO_CACHE_MAX_AGE_DAYS"] * 86400
+    tmp_cutoff = now - _CACHE_TMP_MAX_AGE
+    max_bytes = current_app.config["AUDIO_CACHE_MAX_BYTES"]
+
+    removed = 0
+    entries = []
+    with os.scandir(cache_root) as kinds:
+        for kind in kinds:
+            if not kind.is_dir():
+                continue
+            with os.scandir(kind.path) as files:
+                for entry in files:
+                    try:
+                        if not entry.is_file():
+                            continue
+                        stat = entry.stat()
+                    except OSError:
+                        continue
+
+                    is_tmp = entry.name.endswith(_CACHE_TMP_SUFFIX)
+                    if stat.st_mtime < (tmp_cutoff if is_tmp else entry_cutoff):
+                        _remove_quietly(entry.path)
+                        removed += 1
+                    elif not is_tmp:
+                        entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+    # 超出总大小上限时从最久未使用的开始删除
+    total = sum(size for _, size, _ in entries)
+    if total > max_bytes:
+        entries.sort()
+        for _, size, path in entries:
+            if total <= max_bytes:
+                break
+            _remove_quietly(path)
+            total -= size
+            removed += 1
+
+    return removed
+
+
+@celery.task(
+    name="app.services.voice_clone_service.prune_audio_cache_task", ignore_result=True
+)
+def prune_audio_cache_task():
+    """清理音频磁盘缓存（Celery任务）"""
+    removed = prune_audio_cache()
+    if removed:
+        current_app.logger.info(f"Pruned {removed} audio cache files")
+
+
+def _remove_quietly(path):
+    """删除文件，不存在或失败时忽略"""
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def train_voice_model(features_dir, work_dir, task):
+    """训练语音模型"""
+    try:
+        model_dir = os.path.join(work_dir, "models")
+        config = task.get_config()
+
+        # 准备训练配置
+        train_config = {
+            "input_features": features_dir,
+            "output_dir": model_dir,
+            "model_name": task.model_name,
+            "epochs": config.get("epochs", 100),
+            "batch_size": config.get("batch_size", 32),
+            "learning_rate": config.get("learning_rate", 0.0001),
+            # 训练器每步回调on_step(step, total)，由此上报真实进度
+            "on_step": _training_progress_callback(task),
+        }
+
+        model_files = {
+            "model_path": os.path.join(model_dir, f"{task.model_name}.pth"),
+            "config_path": os.path.join(model_dir, f"{task.model_name}_config.json"),
+            "index_path": os.path.join(model_dir, f"{task.model_name}.index"),
+        }
+
+        # 在常驻worker进程内直接调用训练入口，不再为每个任务启动新的Python/CUDA进程
+        train_run = _load_training_entry(current_app.config["SOVITS_TRAIN_MODULE"])
+        if train_run is not None:
+            train_run(train_config)
+
+            missing = [
+                path for path in model_files.values() if not os.path.exists(path)
+            ]
+            if missing:
+                raise TaskProcessingError(
+                    f"Training finished without output files: {', '.join(missing)}"
+                )
+            return model_files
+
+        # 训练入口不可用时，模拟训练过程
+        training_script = os.path.join(
+            current_app.config["SOVITS_MODEL_PATH"], "train.py"
+        )
+
+        if os.path.exists(training_script):
             # 创建模拟模型文件（实际训练中这些文件会自动生成）
             for file_path in model_files.values():
                 if not os.path.exists(file_path):
                     with open(file_path, "w") as f:
                         f.write("# Simulated model file\n")
-
-            return model_files
         else:
             # 如果没有训练脚本，创建模拟模型文件
-            model_files = {
-                "model_path": os.path.join(model_dir, f"{task.model_name}.pth"),
-                "config_path": os.path.join(
-                    model_dir, f"{task.model_name}_config.json"
-                ),
-                "index_path": os.path.join(model_dir, f"{task.model_name}.index"),
-            }
-
             for file_path in model_files.values():
                 with open(file_path, "w") as f:
                     f.write(f"# Simulated model file for {task.model_name}\n")
 
-            return model_files
+        return model_files
 
     except Exception as e:
         raise TaskProcessingError(f"Failed to train voice model: {str(e)}")
 
 
+def _training_progress_callback(task):
+    """生成训练步回调：训练进度映射到任务进度50-80%，不足1%的变化不上报"""
+    last_progress = 50
+
+    def on_step(step, total):
+        nonlocal last_progress
+        progress = 50 + int(30 * step / max(total, 1))
+        if progress > last_progress:
+            last_progress = progress
+            update_task_progress(
+                task, progress, f"Training in progress... {step}/{total}"
+            )
+
+    return on_step
+
+
+@lru_cache(maxsize=None)
+def _load_training_entry(module_name):
+    """导入训练入口函数（每个进程只导入一次），不可用时返回None"""
+    import importlib
+
+    try:
+        module = importlib.import_module(module_name)
+    except ImportError:
+        return None
+    return getattr(module, "train_run", None)
+
+
+# 训练任务所在队列，只有消费该队列的Worker才需要预热训练环境
+TRAINING_QUEUE = "voice_clone"
+_is_training_worker = False
+
+
+@celeryd_after_setup.connect
+def _detect_training_worker(sender, instance, **kwargs):
+    """Worker主进程启动时根据消费的队列判断是否为训练Worker"""
+    global _is_training_worker
+
+    # -Q指定的队列；未指定时消费默认队列
+    queues = instance.app.amqp.queues
+    consume_from = queues.consume_from or queues
+    _is_training_worker = TRAINING_QUEUE in consume_from
+
+    # solo池在主进程中执行任务，不会触发worker_process_init
+    pool_module = getattr(instance.pool_cls, "__module__", "")
+    if _is_training_worker and pool_module.endswith(".solo"):
+        _warm_up_training_environment()
+
+
+@worker_process_init.connect
+def _warm_up_training_worker(**kwargs):
+    """训练Worker子进程启动时预先导入torch与训练入口"""
+    if _is_training_worker:
+        _warm_up_training_environment()
+
+
+def _warm_up_training_environment():
+    """预先导入torch与训练入口，使每个任务复用已初始化的环境"""
+    try:
+        import torch
+
+        # 训练输入尺寸固定，cuDNN自动调优结果可在任务间复用
+        torch.backends.cudnn.benchmark = True
+    except ImportError:
+        pass
+
+    _load_training_entry(current_app.config["SOVITS_TRAIN_MODULE"])
+
+
 def validate_model_quality(model_files, audio_files):
     """验证模型质量"""
     try:
@@ -351,12 +891,12 @@ def save_trained_model(task, model_files, quality_score):
         )
         os.makedirs(model_storage_dir, exist_ok=True)
 
-        # 复制模型文件到存储目录
+        # 将模型文件放入存储目录（训练目录随后会被清理，可直接硬链接）
         stored_files = {}
         for file_type, src_path in model_files.items():
             if os.path.exists(src_path):
                 dst_path = os.path.join(model_storage_dir, os.path.basename(src_path))
-                shutil.copy2(src_path, dst_path)
+                link_or_copy(src_path, dst_path)
                 stored_files[file_type] = dst_path
 
         # 创建VoiceModel记录
@@ -391,30 +931,92 @@ def save_trained_model(task, model_files, quality_score):
 
 
 def cleanup_training_environment(work_dir):
-    """清理训练环境"""
+    """清理训练环境（目录先改名，删除交给后台任务）"""
     try:
-        if os.path.exists(work_dir):
-            shutil.rmtree(work_dir)
+        if not os.path.exists(work_dir):
+            return
+
+        # 改名为唯一路径，重试任务可立即重建同名工作目录而不会被误删
+        trash_dir = f"{work_dir}.deleted-{generate_uuid()}"
+        os.rename(work_dir, trash_dir)
     except Exception as e:
         current_app.logger.warning(f"Failed to cleanup training environment: {e}")
+        return
+
+    try:
+        remove_work_dir_task.apply_async(
+            (trash_dir,), countdown=WORK_DIR_CLEANUP_DELAY, priority=9
+        )
+    except Exception as e:
+        # 消息队列不可用时同步删除
+        current_app.logger.warning(f"Failed to enqueue work dir cleanup: {e}")
+        shutil.rmtree(trash_dir, ignore_errors=True)
+
+
+@celery.task(
+    name="app.services.voice_clone_service.remove_work_dir_task", ignore_result=True
+)
+def remove_work_dir_task(work_dir):
+    """删除训练工作目录（Celery任务）"""
+    shutil.rmtree(work_dir, ignore_errors=True)
 
 
 def update_task_progress(task, progress, message=None):
-    """更新任务进度"""
+    """更新任务进度（写入Redis与Celery状态，数据库只在状态变化时提交）"""
+    from app.extensions import redis_client
+
     try:
-        task.progress = progress
-        if message:
-            # 这里可以添加状态消息字段
-            pass
-        db.session.commit()
+        redis_client.setex(_progress_key(task.id), TASK_PROGRESS_TTL, progress)
+    except Exception as e:
+        current_app.logger.warning(f"Failed to update task progress: {e}")
 
+    try:
         # 更新Celery任务状态
         if current_task:
             current_task.update_state(
                 state="PROGRESS", meta={"progress": progress, "message": message}
             )
     except Exception as e:
-        current_app.logger.warning(f"Failed to update task progress: {e}")
+        current_app.logger.warning(f"Failed to update task state: {e}")
+
+
+def get_live_progress(tasks):
+    """批量获取处理中任务的实时进度，返回{task_id: progress}"""
+    from app.extensions import redis_client
+
+    progress = {task.id: task.progress for task in tasks}
+    processing_ids = [task.id for task in tasks if task.status == "processing"]
+    if not processing_ids:
+        return progress
+
+    # Redis不可用时退回数据库中的进度
+    try:
+        values = redis_client.mget(
+            [_progress_key(task_id) for task_id in processing_ids]
+        )
+    except Exception as e:
+        current_app.logger.warning(f"Failed to read task progress: {e}")
+        return progress
+
+    for task_id, value in zip(processing_ids, values):
+        if value is not None:
+            progress[task_id] = int(value)
+    return progress
+
+
+def clear_live_progress(task_id):
+    """清除任务的实时进度（重试前调用，避免读到上一次运行的进度）"""
+    from app.extensions import redis_client
+
+    try:
+        redis_client.delete(_progress_key(task_id))
+    except Exception as e:
+        current_app.logger.warning(f"Failed to clear task progress: {e}")
+
+
+def _progress_key(task_id):
+    """任务进度的Redis键"""
+    return f"voice_clone:progress:{task_id}"
 
 
 def get_task_status(task_id):
@@ -427,7 +1029,7 @@ def get_task_status(task_id):
         return {
             "task_id": task.id,
             "status": task.status,
-            "progress": task.progress,
+            "progress": get_live_progress([task])[task.id],
             "error_message": task.error_message,
             "created_at": task.created_at.isoformat(),
             "started_at": task.started_at.isoformat() if task.started_at else None,
@@ -1,16 +1,41 @@
 # ./gpt-sovits-backend/app/utils/audio_utils.py
+import hashlib
 import os
-import librosa
-import soundfile as sf
 import numpy as np
-from pydub import AudioSegment
 from flask import current_app
 from app.utils.exceptions import AudioProcessingError
 
+# 静音检测窗口长度（毫秒）
+SILENCE_WINDOW_MS = 100
+
+
+def load_audio(file_path, sr=16000):
+    """以float32单声道加载音频（soundfile直接解码，仅在需要时重采样）"""
+    import librosa
+    import soundfile as sf
+
+    try:
+        audio, orig_sr = sf.read(file_path, dtype="float32", always_2d=False)
+    except RuntimeError:
+        # libsndfile不支持的容器格式（如m4a）才退回librosa/audioread解码
+        return librosa.load(file_path, sr=sr, mono=True)
+
+    # 多声道混合为单声道
+    if audio.ndim > 1:
+        audio = librosa.to_mono(audio.T)
+
+    if sr is not None and orig_sr != sr:
+        audio = librosa.resample(audio, orig_sr=orig_sr, target_sr=sr)
+        return audio, sr
+
+    return audio, orig_sr
+
 
 def validate_audio_content(file_path):
     """验证音频内容"""
     try:
+        import librosa
+
         # 加载音频文件
         audio, sr = librosa.load(file_path, sr=None)
 
@@ -29,8 +54,8 @@ def validate_audio_content(file_path):
                 f"Audio too long. Maximum {max_duration} seconds allowed"
             )
 
-        # 检查音频是否有内容（非静音）
-        if np.max(np.abs(audio)) < 0.001:
+        # 检查音频是否有内容（非静音）；峰值取自最小/最大值，不生成abs临时数组
+        if max(-float(audio.min()), float(audio.max())) < 0.001:
             raise AudioProcessingError("Audio appears to be silent")
 
         # 检查采样率
@@ -53,14 +78,12 @@ def validate_audio_content(file_path):
 def convert_to_standard_format(input_path, output_path):
     """转换音频到标准格式"""
     try:
-        target_sr = current_app.config.get("AUDIO_SAMPLE_RATE", 16000)
+        import soundfile as sf
 
-        # 加载音频
-        audio, sr = librosa.load(input_path, sr=target_sr)
+        target_sr = current_app.config.get("AUDIO_SAMPLE_RATE", 16000)
 
-        # 确保单声道
-        if len(audio.shape) > 1:
-            audio = librosa.to_mono(audio)
+        # 加载为单声道并重采样（WAV/FLAC等直接由soundfile解码，不经过audioread）
+        audio, _ = load_audio(input_path, sr=target_sr)
 
         # 标准化音量
         audio = normalize_audio(audio)
@@ -75,27 +98,35 @@ def convert_to_standard_format(input_path, output_path):
 
 
 def normalize_audio(audio, target_db=-20):
-    """标准化音频音量"""
-    # 计算RMS
-    rms = np.sqrt(np.mean(audio**2))
+    """标准化音频音量（浮点数组原地缩放）"""
+    if audio.size == 0:
+        return audio
+
+    # 直接归约计算能量与峰值，不生成平方/绝对值临时数组
+    flat = audio.ravel()
+    rms = np.sqrt(np.dot(flat, flat) / flat.size)
+    peak = max(-float(flat.min()), float(flat.max()))
 
+    scale = 1.0
     if rms > 0:
         # 转换目标分贝到线性比例
-        target_rms = 10 ** (target_db / 20)
-        # 缩放音频
-        audio = audio * (target_rms / rms)
+        scale = (10 ** (target_db / 20)) / rms
 
-    # 防止削波
-    max_val = np.max(np.abs(audio))
-    if max_val > 1.0:
-        audio = audio / max_val
+    # 防止削波：与音量缩放合并为一次乘法
+    if peak * scale > 1.0:
+        scale = 1.0 / peak
 
-    return audio
+    # 调用方传入的都是刚加载的数组，原地缩放避免再分配一份；整数数组无法原地缩放
+    if np.issubdtype(audio.dtype, np.floating):
+        return np.multiply(audio, scale, out=audio)
+    return audio * scale
 
 
 def trim_silence(audio, sr, top_db=20):
     """移除音频首尾的静音部分"""
     try:
+        import librosa
+
         # 使用librosa的trim函数
         trimmed_audio, _ = librosa.effects.trim(audio, top_db=top_db)
         return trimmed_audio
@@ -107,6 +138,8 @@ def trim_silence(audio, sr, top_db=20):
 def extract_audio_features(file_path):
     """提取音频特征"""
     try:
+        import librosa
+
         audio, sr = librosa.load(file_path, sr=16000)
 
         # 基本特征
@@ -142,26 +175,24 @@ def extract_audio_features(file_path):
 def split_audio_by_silence(file_path, min_segment_length=2.0, silence_thresh=-40):
     """根据静音分割音频"""
     try:
+        from pydub import AudioSegment
+
         # 使用pydub加载音频
         audio = AudioSegment.from_file(file_path)
 
-        # 检测静音段
+        # 检测静音段：按100ms窗口向量化计算dBFS，不逐段构造AudioSegment
+        loud = _window_dbfs(audio, SILENCE_WINDOW_MS) >= silence_thresh
+
+        # 连续非静音窗口组成片段
+        edges = np.flatnonzero(np.diff(np.concatenate(([0], loud.view(np.int8), [0]))))
+        min_length_ms = min_segment_length * 1000  # 转换为毫秒
+
         chunks = []
-        current_chunk = AudioSegment.empty()
-
-        for i, chunk in enumerate(audio[::100]):  # 每100ms检查一次
-            if chunk.dBFS < silence_thresh:
-                # 静音段
-                if len(current_chunk) >= min_segment_length * 1000:  # 转换为毫秒
-                    chunks.append(current_chunk)
-                current_chunk = AudioSegment.empty()
-            else:
-                # 非静音段
-                current_chunk += audio[i * 100 : (i + 1) * 100]
-
-        # 添加最后一个片段
-        if len(current_chunk) >= min_segment_length * 1000:
-            chunks.append(current_chunk)
+        for start, end in zip(edges[::2], edges[1::2]):
+            start_ms = start * SILENCE_WINDOW_MS
+            end_ms = min(end * SILENCE_WINDOW_MS, len(audio))
+            if end_ms - start_ms >= min_length_ms:
+                chunks.append(audio[start_ms:end_ms])
 
         return chunks
 
@@ -169,36 +200,120 @@ def split_audio_by_silence(file_path, min_segment_length=2.0, silence_thresh=-40
         raise AudioProcessingError(f"Failed to split audio: {str(e)}")
 
 
+def _window_dbfs(audio, window_ms):
+    """计算AudioSegment每个窗口的dBFS"""
+    samples = np.asarray(audio.get_array_of_samples())
+    if samples.size == 0:
+        return np.empty(0)
+
+    # 窗口边界（按帧换算为交错采样点下标）
+    window_count = -(-len(audio) // window_ms)
+    starts = np.arange(window_count) * window_ms * audio.frame_rate // 1000
+    starts = starts[starts * audio.channels < samples.size] * audio.channels
+
+    energy = np.add.reduceat(np.square(samples, dtype=np.float64), starts)
+    counts = np.diff(np.append(starts, samples.size))
+    rms = np.sqrt(energy / counts)
+
+    with np.errstate(divide="ignore"):
+        return 20 * np.log10(rms / audio.max_possible_amplitude)
+
+
 def merge_audio_files(file_paths, output_path):
     """合并多个音频文件"""
     try:
-        combined = AudioSegment.empty()
-
-        for file_path in file_paths:
-            audio = AudioSegment.from_file(file_path)
-            combined += audio
-
-        # 导出合并后的音频
-        combined.export(output_path, format="wav")
+        # 格式一致的文件直接解码到预分配的缓冲区，否则逐个解码后一次性拼接
+        if not _merge_with_soundfile(file_paths, output_path):
+            _merge_with_pydub(file_paths, output_path)
         return output_path
 
     except Exception as e:
         raise AudioProcessingError(f"Failed to merge audio files: {str(e)}")
 
 
-def calculate_audio_hash(file_path):
-    """计算音频内容的哈希值"""
+def _merge_with_soundfile(file_paths, output_path):
+    """采样率、声道数与编码一致时，用soundfile读入预分配缓冲区并写出"""
+    import soundfile as sf
+
     try:
-        audio, sr = librosa.load(file_path, sr=16000)
+        infos = [sf.info(file_path) for file_path in file_paths]
+    except RuntimeError:
+        return False
+
+    formats = {(info.samplerate, info.channels, info.subtype) for info in infos}
+    if len(formats) != 1:
+        return False
+
+    channels = infos[0].channels
+    merged = np.empty((sum(info.frames for info in infos), channels), dtype=np.float32)
+
+    # WAV不支持的输入编码（如Vorbis、MP3）改为按float32数据写出
+    subtype = infos[0].subtype
+    if not sf.check_format("WAV", subtype):
+        subtype = "FLOAT"
+
+    # 解码或写出失败时交由pydub处理
+    try:
+        cursor = 0
+        for file_path, info in zip(file_paths, infos):
+            # 部分格式的帧数为估计值，按实际读取的帧数推进
+            data, _ = sf.read(
+                file_path,
+                dtype="float32",
+                always_2d=True,
+                out=merged[cursor : cursor + info.frames],
+            )
+            cursor += len(data)
+
+        sf.write(
+            output_path,
+            merged[:cursor],
+            infos[0].samplerate,
+            format="WAV",
+            subtype=subtype,
+        )
+    except (RuntimeError, TypeError, ValueError) as e:
+        current_app.logger.warning(f"soundfile merge failed, using pydub: {e}")
+        return False
+    return True
+
+
+def _merge_with_pydub(file_paths, output_path):
+    """用pydub解码后统一格式，一次性拼接原始数据（避免逐段+=的重复复制）"""
+    from pydub import AudioSegment
+
+    segments = [AudioSegment.from_file(file_path) for file_path in file_paths]
+    if not segments:
+        AudioSegment.empty().export(output_path, format="wav")
+        return
+
+    # 与pydub拼接时的规则一致：取最高的采样率、声道数与位深
+    frame_rate = max(segment.frame_rate for segment in segments)
+    channels = max(segment.channels for segment in segments)
+    sample_width = max(segment.sample_width for segment in segments)
+    data = b"".join(
+        segment.set_frame_rate(frame_rate)
+        .set_channels(channels)
+        .set_sample_width(sample_width)
+        .raw_data
+        for segment in segments
+    )
+
+    AudioSegment(
+        data=data, sample_width=sample_width, frame_rate=frame_rate, channels=channels
+    ).export(output_path, format="wav")
 
-        # 提取音频指纹特征
-        chroma = librosa.feature.chroma_stft(y=audio, sr=sr)
 
-        # 计算哈希
-        import hashlib
+def calculate_audio_hash(file_path):
+    """计算音频内容的哈希值（基于解码后的PCM，与容器格式和元数据无关）"""
+    try:
+        audio, sr = load_audio(file_path, sr=None)
 
-        audio_str = str(chroma.flatten())
-        return hashlib.sha256(audio_str.encode()).hexdigest()
+        # 直接对PCM缓冲区计算哈希，不做特征提取和字符串格式化
+        hasher = hashlib.blake2b(digest_size=32)
+        hasher.update(int(sr).to_bytes(4, "little"))
+        hasher.update(np.ascontiguousarray(audio, dtype="<f4"))
+        return hasher.hexdigest()
 
     except Exception as e:
         raise AudioProcessingError(f"Failed to calculate audio hash: {str(e)}")
@@ -207,6 +322,9 @@ def calculate_audio_hash(file_path):
 def get_audio_info(file_path):
     """获取音频文件信息"""
     try:
+        import librosa
+        from pydub import AudioSegment
+
         # 使用pydub获取基本信息
         audio = AudioSegment.from_file(file_path)
 
@@ -231,17 +349,12 @@ def get_audio_info(file_path):
 def detect_voice_activity(file_path, frame_length=2048, hop_length=512):
     """检测语音活动"""
     try:
-        audio, sr = librosa.load(file_path, sr=16000)
+        import librosa
 
-        # 计算能量
-        energy = librosa.feature.rms(
-            y=audio, frame_length=frame_length, hop_length=hop_length
-        )[0]
+        audio, sr = librosa.load(file_path, sr=16000)
 
-        # 计算过零率
-        zcr = librosa.feature.zero_crossing_rate(
-            audio, frame_length=frame_length, hop_length=hop_length
-        )[0]
+        # 计算能量与过零率（同一次分帧）
+        energy, zcr = _frame_energy_and_zcr(audio, frame_length, hop_length)
 
         # 简单的VAD算法
         energy_threshold = np.mean(energy) * 0.5
@@ -261,3 +374,23 @@ def detect_voice_activity(file_path, frame_length=2048, hop_length=512):
 
     except Exception as e:
         raise AudioProcessingError(f"Failed to detect voice activity: {str(e)}")
+
+
+def _frame_energy_and_zcr(audio, frame_length, hop_length):
+    """按帧计算RMS能量与过零率（居中分帧，与librosa的帧数一致）"""
+    # 前后补零后用前缀和求每帧的平方和与过零次数，不生成帧矩阵
+    audio = np.pad(audio, frame_length // 2)
+    starts = np.arange(1 + (len(audio) - frame_length) // hop_length) * hop_length
+
+    square_sums = np.concatenate(([0.0], np.cumsum(np.square(audio, dtype=np.float64))))
+    energy = np.sqrt(
+        (square_sums[starts + frame_length] - square_sums[starts]) / frame_length
+    )
+
+    signs = np.signbit(audio)
+    crossing_counts = np.concatenate(([0], np.cumsum(signs[1:] != signs[:-1])))
+    zcr = (
+        crossing_counts[starts + frame_length - 1] - crossing_counts[starts]
+    ) / frame_length
+
+    return energy, zcr
@@ -0,0 +1,101 @@
+# ./gpt-sovits-backend/app/utils/cache.py
+import threading
+import time
+from collections import OrderedDict
+
+_MISSING = object()
+
+
+class TTLCache:
+    """带过期时间的线程安全LRU缓存"""
+
+    def __init__(self, maxsize=1024, ttl=30):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """获取缓存值，过期或不存在时返回默认值"""
+        with self._lock:
+            item = self._data.get(key, _MISSING)
+            if item is _MISSING:
+                return default
+
+            value, expires_at = item
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return default
+
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        """写入缓存值"""
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key, default=None):
+        """移除缓存值"""
+        with self._lock:
+            item = self._data.pop(key, _MISSING)
+        return default if item is _MISSING else item[0]
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+def redis_cache_get(key):
+    """读取Redis缓存，Redis不可用时视为未命中"""
+    from app.extensions import redis_client
+
+    if key is None:
+        return None
+    try:
+        return redis_client.get(key)
+    except Exception:
+        return None
+
+
+def redis_cache_set(key, value, ttl):
+    """写入Redis缓存，失败时忽略"""
+    from flask import current_app
+    from app.extensions import redis_client
+
+    if key is None:
+        return
+    try:
+        redis_client.setex(key, ttl, value)
+    except Exception as e:
+        current_app.logger.warning(f"Failed to write cache {key}: {e}")
+
+
+def get_cache_version(version_key):
+    """读取缓存版本号，Redis不可用时返回None"""
+    from app.extensions import redis_client
+
+    try:
+        version = redis_client.get(version_key) or b"0"
+    except Exception:
+        return None
+    return version.decode() if isinstance(version, bytes) else version
+
+
+def bump_cache_version(version_key):
+    """递增缓存版本号，使旧版本的缓存键全部失效"""
+    from flask import current_app
+    from app.extensions import redis_client
+
+    try:
+        redis_client.incr(version_key)
+    except Exception as e:
+        current_app.logger.warning(f"Failed to invalidate cache {version_key}: {e}")
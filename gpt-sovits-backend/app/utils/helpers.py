@@ -1,11 +1,18 @@
 # ./gpt-sovits-backend/app/utils/helpers.py
 import os
+import mmap
+import time
 import uuid
+import base64
+import shutil
 import hashlib
 import secrets
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from flask import request, current_app
+from flask import g, request, current_app, stream_with_context
 from werkzeug.utils import secure_filename
+from app.utils.exceptions import ValidationError
+from app.utils.json_utils import json_dumps_bytes, json_loads
 
 
 def generate_unique_filename(original_filename, prefix=""):
@@ -25,8 +32,8 @@ def generate_unique_filename(original_filename, prefix=""):
     return filename
 
 
-def save_uploaded_file(file, upload_type="audio_samples", prefix=""):
-    """保存上传的文件"""
+def save_uploaded_file(file, upload_type="audio_samples", prefix="", with_sha256=False):
+    """保存上传的文件（写入时同步计算内容ID，可选计算SHA256）"""
     if not file or not file.filename:
         return None
 
@@ -39,41 +46,151 @@ def save_uploaded_file(file, upload_type="audio_samples", prefix=""):
 
     file_path = os.path.join(upload_dir, filename)
 
-    # 保存文件
-    file.save(file_path)
+    # 保存文件：一次读取同时完成写入、计数与哈希，无需事后stat或重读文件
+    content_hasher = new_content_hasher()
+    hash_sha256 = hashlib.sha256() if with_sha256 else None
+    size = 0
+    with open(file_path, "wb") as dst:
+        for chunk in iter(lambda: file.stream.read(HASH_CHUNK_SIZE), b""):
+            content_hasher.update(chunk)
+            if hash_sha256 is not None:
+                hash_sha256.update(chunk)
+            dst.write(chunk)
+            size += len(chunk)
 
     return {
         "filename": filename,
         "file_path": file_path,
         "relative_path": os.path.join(upload_type, filename),
-        "size": os.path.getsize(file_path),
+        "size": size,
+        "content_id": content_hasher.hexdigest(),
+        "file_hash": hash_sha256.hexdigest() if hash_sha256 is not None else None,
     }
 
 
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+# 文件读取块大小（1 MiB）
+HASH_CHUNK_SIZE = 1 << 20
+
+# 批量哈希的线程数（哈希计算与文件读取都会释放GIL）
+HASH_WORKERS = min(10, (os.cpu_count() or 1) * 2)
+
+# 临时文件并行删除的线程数（unlink系统调用期间释放GIL）
+TEMP_CLEANUP_WORKERS = 8
+
+
+def new_content_hasher():
+    """创建用于去重的非加密内容哈希（xxh3_128，未安装时回退到blake2b）"""
+    if xxhash is not None:
+        return xxhash.xxh3_128()
+    return hashlib.blake2b(digest_size=16)
+
+
+def generate_content_id(file_path):
+    """生成文件内容指纹（非加密，用于去重和缓存键）"""
+    return _hash_file(file_path, new_content_hasher)
+
+
+def generate_content_ids(file_paths):
+    """并行生成多个文件的内容指纹"""
+    return hash_files_parallel(file_paths, new_content_hasher)
+
+
 def generate_file_hash(file_path):
     """生成文件哈希值"""
-    hash_sha256 = hashlib.sha256()
     try:
-        with open(file_path, "rb") as f:
-            for chunk in iter(lambda: f.read(4096), b""):
-                hash_sha256.update(chunk)
-        return hash_sha256.hexdigest()
+        return _hash_file(file_path, "sha256")
     except Exception:
         return None
 
 
+def hash_files_parallel(file_paths, digest="sha256"):
+    """并行计算多个文件的哈希值，按输入顺序返回十六进制摘要"""
+    file_paths = list(file_paths)
+    if len(file_paths) <= 1:
+        return [_hash_file(file_path, digest) for file_path in file_paths]
+
+    with ThreadPoolExecutor(max_workers=min(HASH_WORKERS, len(file_paths))) as executor:
+        return list(
+            executor.map(lambda file_path: _hash_file(file_path, digest), file_paths)
+        )
+
+
+def _hash_file(file_path, digest):
+    """计算单个文件的哈希值"""
+    with open(file_path, "rb") as f:
+        return _digest_file(f, digest).hexdigest()
+
+
+def check_sha256_backend(app):
+    """检查SHA-256是否由OpenSSL实现（1.1.1+会按CPU自动使用SHA-NI/ARMv8加密指令）"""
+    if hashlib.sha256.__name__ != "openssl_sha256":
+        app.logger.warning(
+            "hashlib.sha256 is not backed by OpenSSL; file hashing will be slow"
+        )
+        return False
+
+    import ssl
+
+    if ssl.OPENSSL_VERSION_INFO < (1, 1, 1):
+        app.logger.warning(
+            f"{ssl.OPENSSL_VERSION} may not use SHA extensions; "
+            "OpenSSL 1.1.1+ recommended"
+        )
+        return False
+
+    return True
+
+
+def _digest_file(f, digest):
+    """计算文件哈希（digest为算法名或哈希对象构造函数）"""
+    # Python 3.11+ 在C层完成读取与哈希循环
+    if hasattr(hashlib, "file_digest"):
+        return hashlib.file_digest(f, digest)
+
+    hasher = hashlib.new(digest) if isinstance(digest, str) else digest()
+    try:
+        # 映射整个文件，一次update即可完成（期间释放GIL）
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            hasher.update(mapped)
+    except ValueError:
+        # 空文件无法映射，保持空输入的哈希值
+        pass
+    except OSError:
+        # 不支持映射的文件对象，按大块读取
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            hasher.update(chunk)
+    return hasher
+
+
 def get_client_ip():
-    """获取客户端IP地址"""
-    if request.environ.get("HTTP_X_FORWARDED_FOR") is None:
-        return request.environ["REMOTE_ADDR"]
-    else:
-        # 如果使用了代理，获取原始IP
-        return request.environ["HTTP_X_FORWARDED_FOR"].split(",")[0].strip()
+    """获取客户端IP地址（同一请求内只解析一次）"""
+    ip = g.get("_client_ip")
+    if ip is None:
+        forwarded_for = request.environ.get("HTTP_X_FORWARDED_FOR")
+        if forwarded_for is None:
+            ip = request.environ["REMOTE_ADDR"]
+        else:
+            # 如果使用了代理，获取原始IP
+            ip = forwarded_for.split(",", 1)[0].strip()
+        g._client_ip = ip
+    return ip
 
 
 def get_user_agent():
-    """获取用户代理字符串"""
-    return request.headers.get("User-Agent", "")
+    """获取用户代理字符串（同一请求内只读取一次）"""
+    user_agent = g.get("_user_agent")
+    if user_agent is None:
+        user_agent = g._user_agent = request.headers.get("User-Agent", "")
+    return user_agent
+
+
+_SIZE_UNITS = ("B", "KB", "MB", "GB", "TB")
+_SIZE_DIVISORS = (1, 1 << 10, 1 << 20, 1 << 30, 1 << 40)
 
 
 def format_file_size(size_bytes):
@@ -81,27 +198,23 @@ def format_file_size(size_bytes):
     if size_bytes == 0:
         return "0B"
 
-    size_names = ["B", "KB", "MB", "GB", "TB"]
-    i = 0
-    while size_bytes >= 1024 and i < len(size_names) - 1:
-        size_bytes /= 1024.0
-        i += 1
-
-    return f"{size_bytes:.1f}{size_names[i]}"
+    # 由位长直接得到单位下标（每1024为一级），只做一次除法
+    i = 0 if size_bytes < 1024 else min(4, (int(size_bytes).bit_length() - 1) // 10)
+    return f"{size_bytes / _SIZE_DIVISORS[i]:.1f}{_SIZE_UNITS[i]}"
 
 
 def format_duration(seconds):
     """格式化时长"""
     if seconds < 60:
         return f"{seconds:.1f}s"
-    elif seconds < 3600:
-        minutes = seconds // 60
-        remaining_seconds = seconds % 60
-        return f"{int(minutes)}m{int(remaining_seconds)}s"
-    else:
-        hours = seconds // 3600
-        minutes = (seconds % 3600) // 60
-        return f"{int(hours)}h{int(minutes)}m"
+
+    # 取整后用divmod一次得到商和余数
+    minutes, remaining_seconds = divmod(int(seconds), 60)
+    if minutes < 60:
+        return f"{minutes}m{remaining_seconds}s"
+
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}h{minutes}m"
 
 
 def paginate_query(query, page, per_page):
@@ -122,17 +235,121 @@ def paginate_query(query, page, per_page):
     }
 
 
+def encode_cursor(values):
+    """将排序键编码为不透明的分页游标"""
+    values = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    return base64.urlsafe_b64encode(json_dumps_bytes(values)).decode("ascii")
+
+
+def decode_cursor(cursor):
+    """解码分页游标"""
+    try:
+        values = json_loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except Exception:
+        raise ValidationError("Invalid pagination cursor", "after")
+
+    if not isinstance(values, list):
+        raise ValidationError("Invalid pagination cursor", "after")
+    return values
+
+
+def keyset_paginate(
+    query, sort_column, id_column, per_page, after=None, include_total=False
+):
+    """游标（keyset）分页：按(sort_column, id)降序，无OFFSET扫描"""
+    from sqlalchemy import DateTime, or_, and_
+
+    total = query.order_by(None).count() if include_total else None
+
+    # 可为空的排序列：NULL行统一排在最后（各数据库默认的NULL顺序不同，
+    # MySQL也不支持NULLS LAST语法，因此显式按IS NULL排序）
+    nullable = getattr(sort_column.expression, "nullable", True)
+    is_null = sort_column.is_(None)
+
+    if after:
+        values = decode_cursor(after)
+        if len(values) != 2:
+            raise ValidationError("Invalid pagination cursor", "after")
+        last_value, last_id = values
+        if isinstance(sort_column.type, DateTime) and last_value is not None:
+            try:
+                last_value = datetime.fromisoformat(last_value)
+            except (TypeError, ValueError):
+                raise ValidationError("Invalid pagination cursor", "after")
+
+        if last_value is None:
+            # 已进入NULL区段，只按id继续
+            condition = and_(is_null, id_column < last_id)
+        else:
+            condition = or_(
+                sort_column < last_value,
+                and_(sort_column == last_value, id_column < last_id),
+            )
+            if nullable:
+                condition = or_(condition, is_null)
+        query = query.filter(condition)
+
+    order_by = [sort_column.desc(), id_column.desc()]
+    if nullable:
+        order_by.insert(0, is_null)
+
+    # 多取一条判断是否还有下一页
+    rows = query.order_by(*order_by).limit(per_page + 1).all()
+    has_next = len(rows) > per_page
+    items = rows[:per_page]
+
+    next_cursor = None
+    if has_next and items:
+        last = items[-1]
+        next_cursor = encode_cursor(
+            [getattr(last, sort_column.key), getattr(last, id_column.key)]
+        )
+
+    return {
+        "items": items,
+        "per_page": per_page,
+        "has_next": has_next,
+        "next_cursor": next_cursor,
+        "total": total,
+    }
+
+
 def create_response(success=True, message="", data=None, **kwargs):
     """创建标准API响应"""
-    response = {"success": success, "message": message}
+    # 单个字典字面量一次构建，额外的响应字段直接展开
+    if data is None:
+        return {"success": success, "message": message, **kwargs}
+    return {"success": success, "message": message, "data": data, **kwargs}
 
-    if data is not None:
-        response["data"] = data
 
-    # 添加额外的响应字段
-    response.update(kwargs)
+def make_json_response(data_bytes, status=200):
+    """使用已序列化的JSON字节串创建响应"""
+    return current_app.response_class(
+        data_bytes, status=status, mimetype="application/json"
+    )
+
 
-    return response
+def stream_json_rows(query, chunk_size=500, **to_dict_kwargs):
+    """流式输出查询结果为JSON数组（分批拉取，内存占用恒定）"""
+
+    def generate():
+        yield b"["
+        first = True
+        for row in query.yield_per(chunk_size):
+            if not first:
+                yield b","
+            first = False
+            yield json_dumps_bytes(row.to_dict(**to_dict_kwargs))
+        yield b"]"
+
+    return current_app.response_class(
+        stream_with_context(generate()), mimetype="application/json"
+    )
+
+
+def jsonify_fast(obj, status=200):
+    """使用orjson序列化JSON响应"""
+    return make_json_response(json_dumps_bytes(obj), status)
 
 
 def safe_filename(filename):
@@ -146,6 +363,70 @@ def safe_filename(filename):
     return filename
 
 
+# Linux FICLONE ioctl（btrfs/xfs等写时复制克隆）
+_FICLONE = 0x40049409
+COPY_BUFFER_SIZE = 4 << 20
+
+
+def fast_copy(src, dst, preserve_metadata=True):
+    """快速复制文件：依次尝试reflink、内核态copy_file_range、大缓冲区复制"""
+    with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+        if not _try_reflink(fsrc, fdst) and not _try_copy_file_range(fsrc, fdst):
+            fsrc.seek(0)
+            fdst.seek(0)
+            fdst.truncate()
+            shutil.copyfileobj(fsrc, fdst, COPY_BUFFER_SIZE)
+
+    # 与shutil.copy2一致，保留文件元数据
+    if preserve_metadata:
+        shutil.copystat(src, dst)
+    return dst
+
+
+def link_or_copy(src, dst):
+    """同一文件系统上创建硬链接，失败时退回fast_copy（源文件之后不应再被修改）"""
+    tmp_path = f"{dst}.{os.getpid()}.tmp"
+    try:
+        # 先链接到临时名再原子替换，目标已存在时也能覆盖
+        os.link(src, tmp_path)
+        os.replace(tmp_path, dst)
+        return dst
+    except OSError:
+        if os.path.lexists(tmp_path):
+            os.remove(tmp_path)
+
+    # 跨设备或文件系统不支持硬链接；目标目录为新建的模型存储，无需保留元数据
+    return fast_copy(src, dst, preserve_metadata=False)
+
+
+def _try_reflink(fsrc, fdst):
+    """尝试写时复制克隆，文件系统不支持时返回False"""
+    try:
+        import fcntl
+
+        fcntl.ioctl(fdst.fileno(), _FICLONE, fsrc.fileno())
+        return True
+    except (ImportError, OSError):
+        return False
+
+
+def _try_copy_file_range(fsrc, fdst):
+    """尝试在内核态复制文件内容，不支持时返回False"""
+    if not hasattr(os, "copy_file_range"):
+        return False
+
+    remaining = os.fstat(fsrc.fileno()).st_size
+    try:
+        while remaining > 0:
+            copied = os.copy_file_range(fsrc.fileno(), fdst.fileno(), remaining)
+            if copied == 0:
+                break
+            remaining -= copied
+        return remaining == 0
+    except OSError:
+        return False
+
+
 def calculate_estimated_time(task_type, **kwargs):
     """计算预估完成时间"""
     base_times = {
@@ -169,65 +450,100 @@ def calculate_estimated_time(task_type, **kwargs):
     return datetime.utcnow() + timedelta(seconds=base_time)
 
 
+def _unlink_quietly(path):
+    """删除文件，失败时忽略并返回False"""
+    try:
+        os.unlink(path)
+        return True
+    except OSError:
+        return False
+
+
 def clean_temp_files(max_age_hours=24):
-    """清理临时文件"""
+    """清理临时文件，返回删除的文件数"""
     temp_dir = os.path.join(current_app.config["UPLOAD_FOLDER"], "temp")
     if not os.path.exists(temp_dir):
-        return
+        return 0
+
+    # 截止时间直接用时间戳比较，与st_mtime同为Unix时间，无需逐个转换datetime
+    cutoff_ts = time.time() - max_age_hours * 3600
+
+    # scandir的DirEntry复用目录读取结果，省去逐个拼接路径与额外stat
+    expired = []
+    with os.scandir(temp_dir) as entries:
+        for entry in entries:
+            try:
+                if entry.is_file() and entry.stat().st_mtime < cutoff_ts:
+                    expired.append(entry.path)
+            except OSError:
+                # 忽略无法读取状态的文件
+                pass
+
+    if len(expired) <= 1:
+        return sum(map(_unlink_quietly, expired))
 
-    cutoff_time = datetime.utcnow() - timedelta(hours=max_age_hours)
+    # 文件较多时并行删除，多个unlink可同时在文件系统上执行
+    workers = min(TEMP_CLEANUP_WORKERS, len(expired))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        deleted = sum(executor.map(_unlink_quietly, expired))
 
-    for filename in os.listdir(temp_dir):
-        file_path = os.path.join(temp_dir, filename)
-        try:
-            # 获取文件修改时间
-            file_mtime = datetime.fromtimestamp(os.path.getmtime(file_path))
-            if file_mtime < cutoff_time:
-                os.remove(file_path)
-        except Exception:
-            # 忽略删除失败的文件
-            pass
+    if deleted < len(expired):
+        current_app.logger.warning(
+            f"Failed to remove {len(expired) - deleted} temp files in {temp_dir}"
+        )
+    return deleted
 
 
 def validate_json_data(data, required_fields):
     """验证JSON数据包含必需字段"""
-    missing_fields = []
-    for field in required_fields:
-        if field not in data or data[field] is None:
-            missing_fields.append(field)
+    # 每个字段只查一次字典，缺失与值为None同样视为未提供
+    missing_fields = [field for field in required_fields if data.get(field) is None]
 
     if missing_fields:
-        from app.utils.exceptions import ValidationError
-
         raise ValidationError(f"Missing required fields: {', '.join(missing_fields)}")
 
     return True
 
 
+# API密钥前缀与随机字节数（与token_urlsafe(32)生成的密钥格式一致）
+_API_KEY_PREFIX = b"sk-"
+_API_KEY_BYTES = 32
+
+
 def generate_api_key():
     """生成API密钥"""
-    return f"sk-{secrets.token_urlsafe(32)}"
-
-
-def mask_sensitive_data(data, sensitive_fields):
-    """遮蔽敏感数据"""
-    if isinstance(data, dict):
-        masked_data = data.copy()
-        for field in sensitive_fields:
-            if field in masked_data:
-                if isinstance(masked_data[field], str) and len(masked_data[field]) > 4:
-                    masked_data[field] = (
-                        masked_data[field][:2]
-                        + "*" * (len(masked_data[field]) - 4)
-                        + masked_data[field][-2:]
-                    )
-                else:
-                    masked_data[field] = "***"
-        return masked_data
-    return data
-
-
-def log_user_action(user_id, action, resource_type, resource_id=None, details=None):
+    raw = secrets.token_bytes(_API_KEY_BYTES)
+    return (_API_KEY_PREFIX + base64.urlsafe_b64encode(raw).rstrip(b"=")).decode(
+        "ascii"
+    )
+
+
+# 常见长度的遮蔽星号串，避免每次重复构建
+_MASK_STARS = tuple("*" * n for n in range(65))
+
+
+def mask_sensitive_data(data, sensitive_fields, mutate=False):
+    """遮蔽敏感数据（mutate为True时直接修改传入的字典）"""
+    if not isinstance(data, dict) or data.keys().isdisjoint(sensitive_fields):
+        return data
+
+    masked_data = data if mutate else data.copy()
+    for field in sensitive_fields:
+        if field not in masked_data:
+            continue
+        value = masked_data[field]
+        if isinstance(value, str) and len(value) > 4:
+            n = len(value) - 4
+            stars = _MASK_STARS[n] if n < len(_MASK_STARS) else "*" * n
+            masked_data[field] = f"{value[:2]}{stars}{value[-2:]}"
+        else:
+            masked_data[field] = "***"
+    return masked_data
+
+
+def log_user_action(
+    user_id, action, resource_type, resource_id=None, details=None, commit=True
+):
     """记录用户操作日志"""
     from app.models.audit import AuditLog
 
@@ -239,4 +555,5 @@ def log_user_action(user_id, action, resource_type, resource_id=None, details=No
         description=details,
         ip_address=get_client_ip(),
         user_agent=get_user_agent(),
+        commit=commit,
     )
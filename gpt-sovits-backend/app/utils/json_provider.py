@@ -0,0 +1,35 @@
+# ./gpt-sovits-backend/app/utils/json_provider.py
+from datetime import date, datetime
+from flask.json.provider import DefaultJSONProvider
+from app.utils.json_utils import orjson
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """基于orjson的Flask JSON提供器（datetime直接在C层格式化为ISO字符串）"""
+
+    @staticmethod
+    def default(o):
+        # 未安装orjson时同样输出ISO字符串，而非HTTP日期格式
+        if isinstance(o, (datetime, date)):
+            return o.isoformat()
+        return DefaultJSONProvider.default(o)
+
+    def dumps(self, obj, **kwargs):
+        # 带自定义参数的调用交回标准库处理
+        if orjson is None or kwargs:
+            return super().dumps(obj, **kwargs)
+
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, default=self.default, option=option).decode("utf-8")
+
+    def loads(self, s, **kwargs):
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+
+def init_json_provider(app):
+    """为应用注册orjson JSON提供器"""
+    app.json = OrjsonProvider(app)
@@ -0,0 +1,36 @@
+# ./gpt-sovits-backend/app/utils/json_utils.py
+import json
+from datetime import date, datetime
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def json_dumps(obj):
+    """序列化为JSON字符串（用于Text列）"""
+    if orjson is not None:
+        return orjson.dumps(obj).decode("utf-8")
+    return json.dumps(obj)
+
+
+def _json_default(obj):
+    """标准库序列化的回退处理（与orjson一致，datetime输出ISO字符串）"""
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def json_dumps_bytes(obj):
+    """序列化为JSON字节串（用于直接返回响应体）"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(obj, ensure_ascii=False, default=_json_default).encode("utf-8")
+
+
+def json_loads(data):
+    """解析JSON字符串"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
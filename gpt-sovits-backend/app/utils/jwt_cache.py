@@ -0,0 +1,60 @@
+# ./gpt-sovits-backend/app/utils/jwt_cache.py
+import hashlib
+import time
+from app.extensions import jwt
+from app.utils.cache import TTLCache
+
+# 已验证令牌的声明缓存（按令牌摘要索引）
+_decode_cache = TTLCache(maxsize=10000, ttl=30)
+
+# 短时间内重复登录复用已签发的令牌
+_issued_tokens = TTLCache(maxsize=10000, ttl=5)
+
+
+def _token_key(encoded_token):
+    """计算令牌缓存键"""
+    if isinstance(encoded_token, str):
+        encoded_token = encoded_token.encode("utf-8")
+    return hashlib.blake2b(encoded_token, digest_size=16).digest()
+
+
+def init_jwt_cache(app):
+    """为flask_jwt_extended的令牌解码加上短时缓存"""
+    ttl = app.config.get("JWT_DECODE_CACHE_TTL", 30)
+    _issued_tokens.ttl = app.config.get("JWT_TOKEN_REUSE_SECONDS", 5)
+
+    if not ttl or getattr(jwt, "_decode_cache_installed", False):
+        return
+
+    _decode_cache.ttl = ttl
+    decode = jwt._decode_jwt_from_config
+
+    def cached_decode(encoded_token, csrf_value=None, allow_expired=False):
+        key = (_token_key(encoded_token), csrf_value, allow_expired)
+        claims = _decode_cache.get(key)
+        if claims is not None:
+            return dict(claims)
+
+        claims = decode(encoded_token, csrf_value, allow_expired)
+
+        # 缓存时间不超过令牌剩余有效期
+        exp = claims.get("exp")
+        remaining = ttl if exp is None else min(ttl, exp - time.time())
+        if remaining > 0:
+            _decode_cache.set(key, dict(claims), ttl=remaining)
+        return claims
+
+    jwt._decode_jwt_from_config = cached_decode
+    jwt._decode_cache_installed = True
+
+
+def get_or_issue_tokens(key, issue):
+    """获取短时间内已签发的令牌，不存在时调用issue签发"""
+    if not _issued_tokens.ttl:
+        return issue()
+
+    tokens = _issued_tokens.get(key)
+    if tokens is None:
+        tokens = issue()
+        _issued_tokens.set(key, tokens)
+    return tokens
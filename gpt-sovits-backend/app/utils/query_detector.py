@@ -0,0 +1,61 @@
+# ./gpt-sovits-backend/app/utils/query_detector.py
+import re
+from collections import Counter
+from flask import g, request, has_request_context
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# 去除SQL字面量，得到语句“形状”
+_LITERAL_RE = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+_listener_registered = False
+
+
+def _normalize_statement(statement):
+    """规范化SQL语句"""
+    statement = _LITERAL_RE.sub("?", statement)
+    return _WHITESPACE_RE.sub(" ", statement).strip()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    """记录当前请求执行的SQL语句"""
+    if not has_request_context():
+        return
+
+    queries = getattr(g, "_queries", None)
+    if queries is None:
+        queries = g._queries = Counter()
+    queries[_normalize_statement(statement)] += 1
+
+
+def get_request_query_count():
+    """获取当前请求执行的SQL数量"""
+    queries = getattr(g, "_queries", None)
+    return sum(queries.values()) if queries else 0
+
+
+def init_query_detector(app):
+    """初始化请求级N+1查询检测"""
+    global _listener_registered
+
+    if not app.config.get("QUERY_DETECTOR_ENABLED"):
+        return
+
+    if not _listener_registered:
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        _listener_registered = True
+
+    threshold = app.config.get("QUERY_DETECTOR_THRESHOLD", 3)
+
+    @app.after_request
+    def report_repeated_queries(response):
+        queries = getattr(g, "_queries", None)
+        if queries:
+            for statement, count in queries.items():
+                if count >= threshold:
+                    app.logger.warning(
+                        f"Possible N+1 query on {request.endpoint}: "
+                        f"{count}x {statement[:200]}"
+                    )
+        return response
@@ -1,15 +1,46 @@
 # ./gpt-sovits-backend/app/utils/validators.py
 import re
 import os
+import string
+from functools import lru_cache
 from werkzeug.utils import secure_filename
-from flask import current_app
+from flask import current_app, request
 from app.utils.exceptions import ValidationError
+from app.utils.json_utils import json_dumps
+
+# 预编译的校验正则
+_EMAIL_RE = re.compile(r"^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$")
+_MODEL_NAME_RE = re.compile(r"^[a-zA-Z0-9_\-\s\u4e00-\u9fff]+$")
+_UNSAFE_FILENAME_RE = re.compile(r"[^\w\s.-]")
+
+# 用户名与密码校验的字符集合
+_USERNAME_CHARS = frozenset(string.ascii_letters + string.digits + "_-")
+_UPPER_CHARS = frozenset(string.ascii_uppercase)
+_LOWER_CHARS = frozenset(string.ascii_lowercase)
+_DIGIT_CHARS = frozenset(string.digits)
+
+# 允许的情感参数（元组保留错误信息中的顺序）
+_EMOTIONS = (
+    "neutral",
+    "happy",
+    "sad",
+    "angry",
+    "surprised",
+    "disgusted",
+    "fearful",
+    "calm",
+    "excited",
+)
+_ALLOWED_EMOTIONS = frozenset(_EMOTIONS)
+_INVALID_EMOTION_MESSAGE = f'Invalid emotion. Allowed: {", ".join(_EMOTIONS)}'
+
+# 允许的用户角色：0普通用户，1审核员，2管理员
+_ALLOWED_ROLES = frozenset((0, 1, 2))
 
 
 def validate_email(email):
     """验证邮箱格式"""
-    pattern = r"^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$"
-    if not re.match(pattern, email):
+    if not _EMAIL_RE.match(email):
         raise ValidationError("Invalid email format", "email")
     return True
 
@@ -19,7 +50,7 @@ def validate_username(username):
     if not username or len(username) < 3 or len(username) > 50:
         raise ValidationError("Username must be 3-50 characters long", "username")
 
-    if not re.match(r"^[a-zA-Z0-9_-]+$", username):
+    if not _USERNAME_CHARS.issuperset(username):
         raise ValidationError(
             "Username can only contain letters, numbers, underscore and hyphen",
             "username",
@@ -33,17 +64,20 @@ def validate_password(password):
     if not password or len(password) < 8:
         raise ValidationError("Password must be at least 8 characters long", "password")
 
-    if not re.search(r"[A-Z]", password):
+    # 字符集合在C层一次构建，各类字符的判断只作用于去重后的字符
+    chars = frozenset(password)
+    if chars.isdisjoint(_UPPER_CHARS):
         raise ValidationError(
             "Password must contain at least one uppercase letter", "password"
         )
 
-    if not re.search(r"[a-z]", password):
+    if chars.isdisjoint(_LOWER_CHARS):
         raise ValidationError(
             "Password must contain at least one lowercase letter", "password"
         )
 
-    if not re.search(r"\d", password):
+    # 与正则\d一致，非ASCII的十进制数字同样计入
+    if chars.isdisjoint(_DIGIT_CHARS) and not any(ch.isdecimal() for ch in chars):
         raise ValidationError("Password must contain at least one number", "password")
 
     return True
@@ -64,34 +98,51 @@ def validate_text_length(text, min_length=1, max_length=200, field_name="text"):
     return True
 
 
+def _file_extension(filename, field_name):
+    """取安全文件名的小写扩展名"""
+    _, dot, ext = secure_filename(filename).rpartition(".")
+    if not dot:
+        raise ValidationError("File must have an extension", field_name)
+    return ext.lower()
+
+
+@lru_cache(maxsize=None)
+def _unsupported_format_message(kind, allowed):
+    """不支持格式的错误信息（按允许的扩展名集合缓存）"""
+    return f'Unsupported {kind} format. Allowed: {", ".join(sorted(allowed))}'
+
+
 def validate_audio_file(file):
     """验证音频文件"""
     if not file or not file.filename:
         raise ValidationError("No audio file provided", "audio_file")
 
-    # 检查文件扩展名
-    filename = secure_filename(file.filename)
-    if "." not in filename:
-        raise ValidationError("File must have an extension", "audio_file")
+    max_size = current_app.config["MAX_CONTENT_LENGTH"]
 
-    ext = filename.rsplit(".", 1)[1].lower()
-    if ext not in current_app.config["ALLOWED_AUDIO_EXTENSIONS"]:
-        raise ValidationError(
-            f'Unsupported audio format. Allowed: {", ".join(current_app.config["ALLOWED_AUDIO_EXTENSIONS"])}',
-            "audio_file",
-        )
+    # 客户端声明的长度不可信，只用于提前拒绝，不能据此放行
+    if (file.content_length or 0) > max_size:
+        raise ValidationError("File size exceeds 10MB limit", "audio_file")
+    if request.content_length is not None and request.content_length < 1024:
+        raise ValidationError("File is too small", "audio_file")
 
-    # 检查文件大小
+    # 测量实际大小
     file.seek(0, os.SEEK_END)
     file_size = file.tell()
     file.seek(0)
 
-    if file_size > current_app.config["MAX_CONTENT_LENGTH"]:
+    if file_size > max_size:
         raise ValidationError("File size exceeds 10MB limit", "audio_file")
 
     if file_size < 1024:  # 至少1KB
         raise ValidationError("File is too small", "audio_file")
 
+    # 检查文件扩展名
+    allowed = current_app.config["ALLOWED_AUDIO_EXTENSIONS"]
+    if _file_extension(file.filename, "audio_file") not in allowed:
+        raise ValidationError(
+            _unsupported_format_message("audio", frozenset(allowed)), "audio_file"
+        )
+
     return True
 
 
@@ -100,15 +151,10 @@ def validate_model_file(file):
     if not file or not file.filename:
         raise ValidationError("No model file provided", "model_file")
 
-    filename = secure_filename(file.filename)
-    if "." not in filename:
-        raise ValidationError("File must have an extension", "model_file")
-
-    ext = filename.rsplit(".", 1)[1].lower()
-    if ext not in current_app.config["ALLOWED_MODEL_EXTENSIONS"]:
+    allowed = current_app.config["ALLOWED_MODEL_EXTENSIONS"]
+    if _file_extension(file.filename, "model_file") not in allowed:
         raise ValidationError(
-            f'Unsupported model format. Allowed: {", ".join(current_app.config["ALLOWED_MODEL_EXTENSIONS"])}',
-            "model_file",
+            _unsupported_format_message("model", frozenset(allowed)), "model_file"
         )
 
     return True
@@ -116,21 +162,8 @@ def validate_model_file(file):
 
 def validate_emotion(emotion):
     """验证情感参数"""
-    allowed_emotions = [
-        "neutral",
-        "happy",
-        "sad",
-        "angry",
-        "surprised",
-        "disgusted",
-        "fearful",
-        "calm",
-        "excited",
-    ]
-    if emotion not in allowed_emotions:
-        raise ValidationError(
-            f'Invalid emotion. Allowed: {", ".join(allowed_emotions)}', "emotion"
-        )
+    if emotion not in _ALLOWED_EMOTIONS:
+        raise ValidationError(_INVALID_EMOTION_MESSAGE, "emotion")
     return True
 
 
@@ -147,7 +180,7 @@ def validate_speed(speed):
 
 def validate_role(role):
     """验证用户角色"""
-    if role not in [0, 1, 2]:
+    if role not in _ALLOWED_ROLES:
         raise ValidationError(
             "Invalid role. Must be 0 (user), 1 (auditor), or 2 (admin)", "role"
         )
@@ -163,7 +196,7 @@ def validate_model_name(name):
         raise ValidationError("Model name must not exceed 100 characters", "model_name")
 
     # 只允许字母、数字、下划线、连字符和空格
-    if not re.match(r"^[a-zA-Z0-9_\-\s\u4e00-\u9fff]+$", name):
+    if not _MODEL_NAME_RE.match(name):
         raise ValidationError("Model name contains invalid characters", "model_name")
 
     return True
@@ -188,10 +221,34 @@ def validate_pagination(page, per_page):
     return page, per_page
 
 
+def validate_string_list(value, field_name):
+    """验证字符串列表"""
+    if not isinstance(value, (list, tuple)) or not all(
+        isinstance(item, str) for item in value
+    ):
+        raise ValidationError(f"{field_name} must be a list of strings", field_name)
+    return list(value)
+
+
+def validate_json_object(value, field_name):
+    """验证可序列化的JSON对象"""
+    if not isinstance(value, dict):
+        raise ValidationError(f"{field_name} must be an object", field_name)
+
+    try:
+        json_dumps(value)
+    except TypeError:
+        raise ValidationError(
+            f"{field_name} contains values that cannot be serialized", field_name
+        )
+
+    return value
+
+
 def sanitize_filename(filename):
     """清理文件名"""
     # 移除不安全字符
-    filename = re.sub(r"[^\w\s.-]", "", filename.strip())
+    filename = _UNSAFE_FILENAME_RE.sub("", filename.strip())
     # 限制长度
     if len(filename) > 255:
         name, ext = os.path.splitext(filename)
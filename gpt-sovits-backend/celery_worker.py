@@ -1,16 +1,33 @@
 # ./gpt-sovits-backend/celery_worker.py
 import os
+from flask import has_app_context
 from app import create_app
+from celery.signals import worker_process_init
 from app.extensions import celery
 
 # 创建应用实例
 app = create_app()
 
-# 确保Celery在Flask应用上下文中运行
-app.app_context().push()
+# 确保Celery在Flask应用上下文中运行（模块被重复导入时不重复推入）
+if not has_app_context():
+    app.app_context().push()
+
+
+@worker_process_init.connect
+def preload_audio_modules(**kwargs):
+    """Worker子进程启动时预先导入音频处理库，任务中的延迟导入直接命中已加载模块"""
+    # 只为加载模块，导入的名称本身不使用
+    import librosa  # noqa: F401
+    import soundfile  # noqa: F401
+    from pydub import AudioSegment  # noqa: F401
+
 
 if __name__ == "__main__":
     # 启动Celery worker
     # 使用命令: python celery_worker.py
     # 或者: celery -A celery_worker.celery worker --loglevel=info
+    # GPU节点上的训练worker（单进程常驻，复用已加载的torch与CUDA上下文）:
+    # celery -A celery_worker.celery worker -Q voice_clone --pool=solo --concurrency=1
+    # 训练目录的后台清理（小并发即可）:
+    # celery -A celery_worker.celery worker -Q io_cleanup --concurrency=2
     celery.start()
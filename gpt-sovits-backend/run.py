@@ -2,6 +2,8 @@
 import os
 import sys
 import click
+from collections import Counter
+from pathlib import Path
 from flask.cli import with_appcontext
 from app import create_app
 from app.extensions import db
@@ -19,6 +21,9 @@ from app.models import (
 # 创建应用实例
 app = create_app()
 
+# list_users每批读取的用户数
+LIST_USERS_BATCH_SIZE = 500
+
 
 @app.shell_context_processor
 def make_shell_context():
@@ -121,23 +126,6 @@ def create_sample_models():
         {"name": "官方", "description": "官方提供的模型", "color": "#gold"},
     ]
 
-    created_tags = {}
-    for tag_data in sample_tags:
-        existing_tag = Tag.query.filter_by(name=tag_data["name"]).first()
-        if not existing_tag:
-            tag = Tag(
-                name=tag_data["name"],
-                description=tag_data["description"],
-                color=tag_data["color"],
-            )
-            db.session.add(tag)
-            created_tags[tag_data["name"]] = tag
-            click.echo(f'Created tag: {tag_data["name"]}')
-        else:
-            created_tags[tag_data["name"]] = existing_tag
-
-    db.session.commit()
-
     # 创建示例模型
     sample_models = [
         {
@@ -182,61 +170,240 @@ def create_sample_models():
         },
     ]
 
-    for model_data in sample_models:
-        existing_model = VoiceModel.query.filter_by(name=model_data["name"]).first()
-        if not existing_model:
-            # 创建模型文件路径（实际应用中应该是真实的模型文件）
-            model_dir = os.path.join(
-                app.config["UPLOAD_FOLDER"],
-                "models",
-                "official",
-                model_data["name"].lower().replace(" ", "_"),
-            )
-            os.makedirs(model_dir, exist_ok=True)
+    # 一次查询取出已存在的模型与标签，只插入缺失的部分
+    existing_models = {
+        name
+        for (name,) in db.session.query(VoiceModel.name).filter(
+            VoiceModel.name.in_([m["name"] for m in sample_models])
+        )
+    }
+    new_models = [m for m in sample_models if m["name"] not in existing_models]
 
-            model_path = os.path.join(
-                model_dir, f'{model_data["name"].lower().replace(" ", "_")}.pth'
-            )
-            config_path = os.path.join(
-                model_dir, f'{model_data["name"].lower().replace(" ", "_")}_config.json'
-            )
+    # 各标签将新增的使用次数
+    tag_usage = Counter(
+        tag_name for model_data in new_models for tag_name in model_data["tags"]
+    )
 
-            # 创建模拟文件
-            with open(model_path, "w") as f:
-                f.write(f'# Simulated model file for {model_data["name"]}\n')
-            with open(config_path, "w") as f:
-                f.write(f'{{"model_name": "{model_data["name"]}", "version": "1.0"}}\n')
-
-            model = VoiceModel(
-                name=model_data["name"],
-                description=model_data["description"],
-                model_type=model_data["model_type"],
-                model_path=model_path,
-                config_path=config_path,
-                voice_characteristics=model_data["voice_characteristics"],
-                quality_score=model_data["quality_score"],
-                status="active",
-                is_public=True,
-                is_featured=True,
-                review_status="approved",
+    created_tags = {
+        tag.name: tag
+        for tag in Tag.query.filter(Tag.name.in_([t["name"] for t in sample_tags]))
+    }
+    # 已存在的标签按累计次数一次原子自增
+    for tag_name, count in tag_usage.items():
+        if tag_name in created_tags:
+            Tag.query.filter_by(id=created_tags[tag_name].id).update(
+                {Tag.usage_count: Tag.usage_count + count}, synchronize_session=False
             )
 
-            model.set_supported_emotions(["neutral", "happy", "sad", "calm", "excited"])
-            model.set_supported_languages(["zh-CN", "en-US"])
+    new_tags = []
+    for tag_data in sample_tags:
+        if tag_data["name"] in created_tags:
+            continue
+        tag = Tag(
+            name=tag_data["name"],
+            description=tag_data["description"],
+            color=tag_data["color"],
+            usage_count=tag_usage[tag_data["name"]],
+        )
+        new_tags.append(tag)
+        created_tags[tag.name] = tag
+        click.echo(f'Created tag: {tag_data["name"]}')
+    db.session.add_all(new_tags)
+
+    models = []
+    for model_data in new_models:
+        # 创建模型文件路径（实际应用中应该是真实的模型文件）
+        slug = model_data["name"].lower().replace(" ", "_")
+        model_dir = Path(app.config["UPLOAD_FOLDER"], "models", "official", slug)
+        model_dir.mkdir(parents=True, exist_ok=True)
+
+        model_path = model_dir / f"{slug}.pth"
+        config_path = model_dir / f"{slug}_config.json"
+
+        # 创建模拟文件
+        model_path.write_text(f'# Simulated model file for {model_data["name"]}\n')
+        config_path.write_text(
+            f'{{"model_name": "{model_data["name"]}", "version": "1.0"}}\n'
+        )
 
-            # 添加标签
-            for tag_name in model_data["tags"]:
-                if tag_name in created_tags:
-                    model.tags.append(created_tags[tag_name])
-                    created_tags[tag_name].increment_usage()
+        model = VoiceModel(
+            name=model_data["name"],
+            description=model_data["description"],
+            model_type=model_data["model_type"],
+            model_path=str(model_path),
+            config_path=str(config_path),
+            voice_characteristics=model_data["voice_characteristics"],
+            quality_score=model_data["quality_score"],
+            status="active",
+            is_public=True,
+            is_featured=True,
+            review_status="approved",
+        )
 
-            db.session.add(model)
-            click.echo(f'Created model: {model_data["name"]}')
+        model.set_supported_emotions(["neutral", "happy", "sad", "calm", "excited"])
+        model.set_supported_languages(["zh-CN", "en-US"])
 
+        # 添加标签
+        model.tags.extend(
+            created_tags[tag_name]
+            for tag_name in model_data["tags"]
+            if tag_name in created_tags
+        )
+
+        models.append(model)
+        click.echo(f'Created model: {model_data["name"]}')
+
+    db.session.add_all(models)
     db.session.commit()
     click.echo("Sample models and tags created successfully.")
 
 
+@app.cli.command()
+def backfill_text_length():
+    """为旧的TTS任务回填文本长度"""
+    # SQLite的LENGTH按字符计数；MySQL的LENGTH按字节计数，需用CHAR_LENGTH
+    dialect = db.session.get_bind().dialect.name
+    length_func = db.func.length if dialect == "sqlite" else db.func.char_length
+
+    updated = TTSTask.query.filter(TTSTask.text_length.is_(None)).update(
+        {TTSTask.text_length: db.func.coalesce(length_func(TTSTask.text), 0)},
+        synchronize_session=False,
+    )
+    db.session.commit()
+    click.echo(f"Backfilled text length for {updated} TTS tasks.")
+
+
+@app.cli.command()
+def convert_uuid_columns():
+    """将旧的VARCHAR(36)主键/外键列转换为GUID列类型"""
+    from sqlalchemy import MetaData, Table, inspect
+    from sqlalchemy.schema import AddConstraint, DropConstraint
+    from app.models.types import GUID
+
+    with db.engine.begin() as conn:
+        dialect = conn.dialect.name
+        if dialect not in ("mysql", "postgresql"):
+            # 其他数据库仍使用CHAR(36)，存储内容不变
+            click.echo(f"No conversion needed for {dialect}.")
+            return
+
+        inspector = inspect(conn)
+        tables = [t for t in db.metadata.sorted_tables if inspector.has_table(t.name)]
+        pending = []
+        for table in tables:
+            current = {
+                column["name"]: str(column["type"]).upper()
+                for column in inspector.get_columns(table.name)
+            }
+            for column in table.columns:
+                if isinstance(column.type, GUID) and current.get(
+                    column.name, ""
+                ).startswith(("VARCHAR", "CHAR")):
+                    pending.append((table, column))
+
+        if not pending:
+            click.echo("UUID columns are already up to date.")
+            return
+
+        # 外键两端类型必须一致，先删除外键，全部转换后再重建
+        reflected = MetaData()
+        foreign_keys = [
+            fk
+            for table in tables
+            for fk in Table(
+                table.name, reflected, autoload_with=conn
+            ).foreign_key_constraints
+        ]
+        for fk in foreign_keys:
+            conn.execute(DropConstraint(fk))
+
+        quote = conn.dialect.identifier_preparer.quote
+        for table, column in pending:
+            name, col = quote(table.name), quote(column.name)
+            if dialect == "postgresql":
+                conn.execute(
+                    db.text(
+                        f"ALTER TABLE {name} ALTER COLUMN {col} TYPE UUID "
+                        f"USING {col}::uuid"
+                    )
+                )
+            else:
+                # 先转为二进制字符串保留原内容，再把十六进制解码为16字节
+                nullable = "NULL" if column.nullable else "NOT NULL"
+                conn.execute(
+                    db.text(f"ALTER TABLE {name} MODIFY {col} VARBINARY(36) {nullable}")
+                )
+                conn.execute(
+                    db.text(
+                        f"UPDATE {name} SET {col} = UNHEX(REPLACE({col}, '-', '')) "
+                        f"WHERE {col} IS NOT NULL"
+                    )
+                )
+                conn.execute(
+                    db.text(f"ALTER TABLE {name} MODIFY {col} BINARY(16) {nullable}")
+                )
+            click.echo(f"Converted {table.name}.{column.name}")
+
+        for fk in foreign_keys:
+            conn.execute(AddConstraint(fk))
+
+    click.echo(f"Converted {len(pending)} UUID columns.")
+
+
+@app.cli.command()
+def convert_json_columns():
+    """将旧的TEXT格式JSON列转换为原生JSON列类型"""
+    from sqlalchemy import JSON, inspect
+
+    with db.engine.begin() as conn:
+        dialect = conn.dialect.name
+        if dialect not in ("mysql", "postgresql"):
+            # SQLite的JSON列本身以文本存储，无需转换
+            click.echo(f"No conversion needed for {dialect}.")
+            return
+
+        inspector = inspect(conn)
+        quote = conn.dialect.identifier_preparer.quote
+        converted = 0
+        for table in db.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+
+            current = {
+                column["name"]: str(column["type"]).upper()
+                for column in inspector.get_columns(table.name)
+            }
+            for column in table.columns:
+                # JSONType带有PostgreSQL变体，旧版SQLAlchemy中被包装在impl里
+                json_type = getattr(column.type, "impl", column.type)
+                if not isinstance(json_type, JSON) or "TEXT" not in current.get(
+                    column.name, ""
+                ):
+                    continue
+
+                name, col = quote(table.name), quote(column.name)
+                if dialect == "postgresql":
+                    conn.execute(
+                        db.text(
+                            f"ALTER TABLE {name} ALTER COLUMN {col} TYPE JSONB "
+                            f"USING NULLIF({col}, '')::jsonb"
+                        )
+                    )
+                else:
+                    # 空字符串不是合法JSON，先置为NULL
+                    nullable = "NULL" if column.nullable else "NOT NULL"
+                    conn.execute(
+                        db.text(f"UPDATE {name} SET {col} = NULL WHERE {col} = ''")
+                    )
+                    conn.execute(
+                        db.text(f"ALTER TABLE {name} MODIFY {col} JSON {nullable}")
+                    )
+                converted += 1
+                click.echo(f"Converted {table.name}.{column.name}")
+
+    click.echo(f"Converted {converted} JSON columns.")
+
+
 @app.cli.command()
 @click.option("--hours", default=24, help="Age threshold in hours")
 def cleanup_temp_files(hours):
@@ -244,8 +411,8 @@ def cleanup_temp_files(hours):
     from app.utils.helpers import clean_temp_files
 
     click.echo(f"Cleaning temporary files older than {hours} hours...")
-    clean_temp_files(max_age_hours=hours)
-    click.echo("Temporary files cleaned.")
+    count = clean_temp_files(max_age_hours=hours)
+    click.echo(f"Removed {count} temporary files.")
 
 
 @app.cli.command()
@@ -432,7 +599,7 @@ def set_user_role(username, role):
 @app.cli.command()
 def list_users():
     """列出所有用户"""
-    users = User.query.order_by(User.created_at.desc()).all()
+    from app.utils.helpers import keyset_paginate
 
     click.echo("Users:")
     click.echo("-" * 80)
@@ -443,12 +610,23 @@ def list_users():
 
     role_names = {0: "User", 1: "Auditor", 2: "Admin"}
 
-    for user in users:
-        status = "Active" if user.is_active else "Inactive"
-        created = user.created_at.strftime("%Y-%m-%d %H:%M")
-        click.echo(
-            f"{user.username:<20} {user.email:<30} {role_names[user.role]:<10} {status:<10} {created:<20}"
+    # 按游标分批读取，用户量大时不一次性加载全部记录
+    after = None
+    while True:
+        pagination = keyset_paginate(
+            User.query, User.created_at, User.id, LIST_USERS_BATCH_SIZE, after=after
         )
+        for user in pagination["items"]:
+            status = "Active" if user.is_active else "Inactive"
+            created = user.created_at.strftime("%Y-%m-%d %H:%M")
+            click.echo(
+                f"{user.username:<20} {user.email:<30} {role_names[user.role]:<10} {status:<10} {created:<20}"
+            )
+
+        if not pagination["has_next"]:
+            break
+        after = pagination["next_cursor"]
+        db.session.expunge_all()
 
 
 if __name__ == "__main__":